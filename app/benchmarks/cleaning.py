@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Benchmarks the cleaning of the digest model's output (clean_digest_output),
+over the model output in app/tests/fixtures/digests: the single pass over
+the lines against the cleaning rules applied one after the other, each to
+the whole text.
+
+Usage: python -m app.benchmarks.cleaning [--repeat N]
+"""
+
+import argparse
+import timeit
+
+from app.core.news import digest
+from app.core.utilities import PROJECT_ROOT
+
+FIXTURES_DIR = PROJECT_ROOT / "app" / "tests" / "fixtures" / "digests"
+
+
+def passes(text):
+    return digest._clean_passes(digest.remove_think_tags(text)).strip()
+
+
+def time_cleaning(clean, text, repeat):
+    """Returns the cleaned text and the best time (in µs) to clean it"""
+    number = 100
+    best = min(timeit.repeat(lambda: clean(text), number=number, repeat=repeat)) / number
+    return clean(text), best * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="number of timed runs per variant (default: 20)")
+    args = parser.parse_args()
+
+    print(f"{'fixture':<18}{'chars':>8}{'passes µs':>12}{'lines µs':>12}{'speedup':>10}  output")
+    for path in sorted(FIXTURES_DIR.glob("*.md")):
+        if path.name.endswith(".cleaned.md"):
+            continue
+        text = path.read_text()
+        baseline_text, baseline_us = time_cleaning(passes, text, args.repeat)
+        cleaned, us = time_cleaning(digest.clean_digest_output, text, args.repeat)
+        status = "identical" if cleaned == baseline_text else "DIFFERS"
+        print(f"{path.stem:<18}{len(text):>8}{baseline_us:>12.1f}{us:>12.1f}{baseline_us / us:>9.1f}x  {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmarks digest generation (create_news_digest) end to end, offline,
+against the stand-in model server (see app.benchmarks.model_server): in a
+single call, and by map-reduce. The response cache is off, so every run
+makes every model call.
+
+The news is read from a day's news file (``data/<date>/<date>_news.json``,
+as saved by a run), or else made up.
+
+Usage: python -m app.benchmarks.digest [NEWS_JSON] [--articles N] [--repeat N]
+           [--latency S] [--tokens-per-second N] [--failure-rate P] [--disconnect-rate P]
+"""
+
+import argparse
+import json
+import logging
+import tempfile
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from unittest.mock import patch
+
+from together import Together
+
+from app.benchmarks.model_server import Behaviour, serving
+from app.core import llm_cache
+from app.core.news import digest
+from app.core.utilities import today_iso_fmt
+
+
+def make_news(articles):
+    """Returns ``articles`` synthetic news items, each a distinct story of a few hundred words"""
+    return [
+        {
+            "source": f"Source {i % 6}",
+            "url": f"https://benchmark.invalid/{i}",
+            "title": f"Article {i}",
+            "content": " ".join(f"story{i}-word{w}" for w in range(300)),
+            "category": "",
+        }
+        for i in range(articles)
+    ]
+
+
+def run(news, server, map_reduce, repeat):
+    mode = "map-reduce" if map_reduce else "single call"
+    with tempfile.TemporaryDirectory() as tmp, ExitStack() as stack:
+        stack.enter_context(patch.object(digest, "client", Together(api_key="stand-in", base_url=server.url)))
+        stack.enter_context(patch.object(digest, "DIGEST_MAP_REDUCE", map_reduce))
+        stack.enter_context(patch.object(digest, "DATA_DIR", tmp))
+        stack.enter_context(patch.object(llm_cache, "LLM_CACHE_ENABLED", False))
+
+        for n in range(1, repeat + 1):
+            requests = server.requests
+            start = time.perf_counter()
+            try:
+                result = digest.create_news_digest(news, f"{tmp}/digest.md", today_iso_fmt)
+                status = f"{len(result['content']):>7} chars"
+            except (Exception, SystemExit) as err:
+                status = f"  failed ({type(err).__name__})"
+            elapsed = time.perf_counter() - start
+            calls = server.requests - requests
+            print(f"{mode:<12} run {n:<4}{elapsed * 1000:>10.1f} ms{calls:>6} model calls  {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("news", type=Path, nargs="?", help="a day's news file (default: made-up articles)")
+    parser.add_argument("--articles", type=int, default=120, help="number of made-up articles (default: 120)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of each mode (default: 3)")
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds before the first token (default: 0.5)")
+    parser.add_argument("--tokens-per-second", type=float, default=80.0, help="the token rate (default: 80)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="the share of requests failing with a 503")
+    parser.add_argument("--disconnect-rate", type=float, default=0.0, help="the share of streams broken off")
+    args = parser.parse_args()
+
+    # the digest logs its progress; only problems are of interest here
+    logging.basicConfig(level=logging.ERROR)
+
+    news = json.loads(args.news.read_text()) if args.news else make_news(args.articles)
+    behaviour = Behaviour(args.latency, args.tokens_per_second, args.failure_rate, args.disconnect_rate)
+    print(f"{len(news)} articles, {behaviour}\n")
+
+    with serving(behaviour, seed=0) as server:
+        run(news, server, map_reduce=False, repeat=args.repeat)
+        run(news, server, map_reduce=True, repeat=args.repeat)
+
+
+if __name__ == "__main__":
+    main()
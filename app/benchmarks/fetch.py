@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmarks the fetch stage (get_latest_news) end to end, offline, by replaying
+the HTTP exchanges of a recorded run (see app.core.recording).
+
+Record a run (this needs the network):
+    python -m app.benchmarks.fetch --record data/recordings/run.zip
+
+Then replay it, as many times as you like, anywhere:
+    python -m app.benchmarks.fetch data/recordings/run.zip [--repeat N]
+
+Every run starts from an empty page cache, feed state and host health, so
+replays are repeatable and a recording made today can be replayed tomorrow.
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import patch
+
+from app.core import http_client, recording
+from app.core.cache import DiskCache
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.news import other
+from app.core.news.fetch import get_latest_news
+from app.core.utilities import (
+    CIRCUIT_BREAKER_COOLDOWN,
+    CIRCUIT_BREAKER_THRESHOLD,
+    HTTP_CACHE_MAX_BYTES,
+    HTTP_CACHE_TTL,
+    today_iso_fmt,
+)
+
+
+@contextmanager
+def isolated_state():
+    """Runs the fetch stage against a fresh page cache, feed state and host health, in a temporary directory"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        page_cache = DiskCache(tmp / "http", max_bytes=HTTP_CACHE_MAX_BYTES, ttl=HTTP_CACHE_TTL)
+        breaker = CircuitBreaker(
+            tmp / "host_health.json", threshold=CIRCUIT_BREAKER_THRESHOLD, cooldown=CIRCUIT_BREAKER_COOLDOWN
+        )
+        with (
+            patch.object(other, "FEED_STATE_FILE", tmp / "feed_state.json"),
+            patch.object(http_client, "page_cache", page_cache),
+            patch.object(http_client, "breaker", breaker),
+        ):
+            yield
+
+
+def record(path):
+    """Fetches today's news from the live sources, recording every HTTP exchange to ``path``"""
+    archive = recording.HttpArchive({"date": today_iso_fmt})
+    http_client.use_archive(archive, recording.RECORD)
+    try:
+        with isolated_state():
+            start = time.perf_counter()
+            news = get_latest_news()
+            elapsed = time.perf_counter() - start
+    finally:
+        http_client.use_archive(None)
+
+    archive.save(path)
+    print(f"Recorded {len(archive)} exchanges ({len(news)} articles in {elapsed:.2f}s) to {path}")
+
+
+def replay(path, repeat):
+    """Replays a recorded run ``repeat`` times, reporting the throughput and checking that every run agrees"""
+    archive = recording.HttpArchive.load(path)
+    date = archive.meta["date"]
+    print(f"Replaying {len(archive)} exchanges recorded on {date}\n")
+
+    http_client.use_archive(archive, recording.REPLAY)
+    try:
+        baseline = None
+        timings = []
+        for run in range(1, repeat + 1):
+            archive.rewind()
+            with isolated_state():
+                start = time.perf_counter()
+                news = get_latest_news(date)
+                elapsed = time.perf_counter() - start
+            timings.append(elapsed)
+
+            baseline = baseline if baseline is not None else news
+            status = "identical" if news == baseline else "DIFFERS"
+            rate = len(news) / elapsed
+            print(f"run {run:<4}{len(news):>5} articles{elapsed * 1000:>10.1f} ms{rate:>10.1f} articles/s  {status}")
+    finally:
+        http_client.use_archive(None)
+
+    best = min(timings)
+    print(f"\nbest: {best * 1000:.1f} ms ({len(archive) / best:.1f} exchanges/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("archive", type=Path, help="the recording to replay (or to write, with --record)")
+    parser.add_argument("--record", action="store_true", help="record a live run instead of replaying one")
+    parser.add_argument("--repeat", type=int, default=5, help="number of replays (default: 5)")
+    args = parser.parse_args()
+
+    # the fetch stage logs every article; only problems are of interest here
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.record:
+        record(args.archive)
+    else:
+        replay(args.archive, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
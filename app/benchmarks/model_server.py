@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+A local stand-in for the model API, to time and load-test the pipeline
+offline.
+
+It speaks the chat-completions protocol the ``together`` client uses (plain
+and streamed responses), answering each prompt with text of the right shape
+(a digest with the canonical sections, notes on a group of stories, or a
+short summary) at a configurable latency and token rate. Requests can be
+made to fail (with a 503) or, for streams, to break off midway.
+
+Serve it:
+    python -m app.benchmarks.model_server [--port 8765] [--latency 0.5] [--tokens-per-second 80]
+
+and point the pipeline at it, say replaying a recorded fetch (see
+app.benchmarks.fetch) into a throwaway SQLite database:
+    TOGETHER_BASE_URL=http://127.0.0.1:8765/v1 LLM_CACHE=0 HTTP_REPLAY=data/recordings/run.zip \\
+        DATABASE_BACKEND=sqlite DATABASE_PATH=/tmp/bench.sqlite3 python -m app.core.backfill 2026-10-17
+
+where 2026-10-17 is the date the archive was recorded on (which replay
+logs). The daily run (app.core.run) only picks out today's news, so it
+finds articles in an archive on the day it was recorded only; the backfill
+fetches the same listings and feeds, for any date.
+
+``StandInModelServer`` also runs in-process (see app.benchmarks.digest).
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+
+from app.core.news.prompt import count_tokens
+
+DEFAULT_PORT = 8765
+
+# a story, as numbered in the digest prompts
+_STORY = re.compile(r"^\s*(\d+)\. (.+?) (\(source: [^\n]*\))$", re.MULTILINE)
+_TOKEN = re.compile(r"\S+\s*")
+
+
+class Behaviour(NamedTuple):
+    # seconds before the first token
+    latency: float = 0.5
+    tokens_per_second: float = 80.0
+    # the share of requests answered with a 503
+    failure_rate: float = 0.0
+    # the share of streams broken off halfway through
+    disconnect_rate: float = 0.0
+
+
+DEFAULT_BEHAVIOUR = Behaviour()
+
+
+def respond(prompt: str) -> str:
+    """Returns a response of the shape the pipeline expects for ``prompt``"""
+    stories = _STORY.findall(prompt)
+    if "## Main Stories" in prompt:
+        main, other = stories[: (len(stories) + 1) // 2], stories[(len(stories) + 1) // 2 :]
+        return "\n".join(
+            [
+                f"Today's stand-in digest covers {len(stories)} stories, with the main ones first.",
+                "",
+                "## Main Stories",
+                *(
+                    f"{n}. {title}\n   A stand-in summary of story {number}."
+                    for n, (number, title, _) in enumerate(main, 1)
+                ),
+                "",
+                "## Other Notable Stories",
+                "**General:**",
+                *(f"* {title}: a stand-in detail." for _, title, _ in other),
+                "",
+                "## Key Takeaways & Watchpoints",
+                "* A stand-in watchpoint.",
+                "* Another stand-in watchpoint.",
+            ]
+        )
+    if stories:
+        return "\n".join(
+            f"{number}. {title} {credit}\nStand-in notes on story {number}." for number, title, credit in stories
+        )
+    return f"A stand-in response to a prompt of {count_tokens(prompt)} tokens."
+
+
+class StandInModelServer(ThreadingHTTPServer):
+    """A chat-completions server, answering with ``respond``'s text at the pace set by ``behaviour``"""
+
+    daemon_threads = True
+
+    def __init__(
+        self, address: tuple[str, int] = ("127.0.0.1", 0), behaviour: Behaviour = DEFAULT_BEHAVIOUR, seed=None
+    ):
+        super().__init__(address, _Handler)
+        self.behaviour = behaviour
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        """The base URL to give the client"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def roll(self, rate: float) -> bool:
+        with self._lock:
+            return self._rng.random() < rate
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+
+@contextmanager
+def serving(behaviour: Behaviour = DEFAULT_BEHAVIOUR, seed=None):
+    """Runs a stand-in server on a free local port, in a background thread, and yields it"""
+    server = StandInModelServer(behaviour=behaviour, seed=seed)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), name="model-server", daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StandInModelServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: HTTPStatus, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": {"message": f"No stand-in for {self.path}"}})
+            return
+
+        self.server.count_request()
+        behaviour = self.server.behaviour
+        if self.server.roll(behaviour.failure_rate):
+            time.sleep(behaviour.latency)
+            self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": {"message": "Service unavailable (stand-in)"}})
+            return
+
+        prompt = "\n".join(message.get("content") or "" for message in body.get("messages", []))
+        tokens = _TOKEN.findall(respond(prompt))[: body.get("max_tokens") or None]
+        completion = {
+            "id": f"stand-in-{uuid.uuid4().hex}",
+            "created": int(time.time()),
+            "model": body.get("model", "stand-in"),
+        }
+        if body.get("stream"):
+            self._stream(completion, tokens, behaviour)
+            return
+
+        time.sleep(behaviour.latency + len(tokens) / behaviour.tokens_per_second)
+        usage = {"prompt_tokens": count_tokens(prompt), "completion_tokens": len(tokens)}
+        message = {"role": "assistant", "content": "".join(tokens)}
+        self._send_json(
+            HTTPStatus.OK,
+            {
+                **completion,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+                "usage": {**usage, "total_tokens": sum(usage.values())},
+            },
+        )
+
+    def _stream(self, completion: dict, tokens: list[str], behaviour: Behaviour):
+        events = [
+            {
+                **completion,
+                "object": "chat.completion.chunk",
+                "choices": [
+                    {
+                        "index": 0,
+                        "delta": {"role": "assistant", "content": token},
+                        "finish_reason": "stop" if n == len(tokens) else None,
+                    }
+                ],
+            }
+            for n, token in enumerate(tokens, start=1)
+        ]
+        payloads = [f"data: {json.dumps(event)}\n\n".encode() for event in events] + [b"data: [DONE]\n\n"]
+
+        # the length of the whole stream is announced, so that one broken off is a protocol error, as it would be
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(sum(len(payload) for payload in payloads)))
+        self.end_headers()
+
+        if self.server.roll(behaviour.disconnect_rate):
+            payloads = payloads[: len(payloads) // 2]
+        time.sleep(behaviour.latency)
+        for payload in payloads:
+            self.wfile.write(payload)
+            self.wfile.flush()
+            time.sleep(1 / behaviour.tokens_per_second)
+        self.close_connection = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1", help="the address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"the port (default: {DEFAULT_PORT})")
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds before the first token (default: 0.5)")
+    parser.add_argument("--tokens-per-second", type=float, default=80.0, help="the token rate (default: 80)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="the share of requests failing with a 503")
+    parser.add_argument("--disconnect-rate", type=float, default=0.0, help="the share of streams broken off")
+    parser.add_argument("--seed", type=int, help="seed the failures, for repeatable runs")
+    args = parser.parse_args()
+
+    behaviour = Behaviour(args.latency, args.tokens_per_second, args.failure_rate, args.disconnect_rate)
+    server = StandInModelServer((args.host, args.port), behaviour, args.seed)
+    print(f"Serving a stand-in model API at {server.url} ({behaviour})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\nServed {server.requests} requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmarks the HTML parsing backends used by the article extractors, over a
+page of each source.
+
+By default the pages are those in app/tests/fixtures/html. These are
+synthetic: each one follows the markup its extractor expects (guessed, not
+saved from the site), with filler text, so the timings only compare the
+backends with each other. For real pages, record a run (this needs the
+network, see app.benchmarks.fetch) and benchmark its article pages:
+    python -m app.benchmarks.fetch --record data/recordings/run.zip
+    python -m app.benchmarks.parsing --archive data/recordings/run.zip
+
+--save-fixtures writes a trimmed copy of those real pages (without their
+scripts, styles and comments) over the fixtures.
+
+Usage: python -m app.benchmarks.parsing [--repeat N] [--archive PATH [--save-fixtures]]
+"""
+
+import argparse
+import timeit
+
+from bs4 import BeautifulSoup, Comment
+
+from app.core.news import other, znbc
+from app.core.news.parsing import lxml
+from app.core.recording import HttpArchive
+from app.core.utilities import PROJECT_ROOT
+
+FIXTURES_DIR = PROJECT_ROOT / "app" / "tests" / "fixtures" / "html"
+
+# fixture name -> (strainer, extractor)
+SOURCES = {
+    "daily_mail": (other.DAILY_MAIL_STRAINER, other.extract_daily_mail_article),
+    "times_of_zambia": (other.TIMES_OF_ZAMBIA_STRAINER, other.extract_times_of_zambia_article),
+    "mwebantu": (other.MWEBANTU_STRAINER, other.extract_mwebantu_article),
+    "muvitv": (other.MUVITV_STRAINER, other.extract_muvitv_article),
+    "diggers": (other.DIGGERS_STRAINER, other.extract_diggers_article),
+    "znbc": (znbc.ARTICLE_STRAINER, znbc.extract_article),
+}
+
+# fixture name -> the host of its source's pages
+HOSTS = {
+    "daily_mail": "daily-mail.co.zm",
+    "times_of_zambia": "times.co.zm",
+    "mwebantu": "mwebantu.com",
+    "muvitv": "muvitv.com",
+    "diggers": "diggers.news",
+    "znbc": "znbc.co.zm",
+}
+
+# elements of a page that no extractor reads
+UNREAD_TAGS = ["script", "style", "noscript", "svg", "iframe", "link"]
+
+
+def recorded_pages(path):
+    """
+    Returns the first article page of each source in a recorded run (a page
+    of the source's host that its extractor gets text from), by fixture name
+    """
+    pages = {}
+    for url, body in HttpArchive.load(path).pages():
+        for name, host in HOSTS.items():
+            if name not in pages and host in url:
+                html = body.decode("utf-8", errors="replace")
+                _, extract = SOURCES[name]
+                try:
+                    if extract(BeautifulSoup(html, "html.parser")):
+                        pages[name] = html
+                except Exception:
+                    pass  # a feed, listing or other page the extractor doesn't handle
+    return pages
+
+
+def trim(html):
+    """Returns a copy of the page without the elements and comments no extractor reads"""
+    soup = BeautifulSoup(html, "html.parser")
+    for element in soup.find_all(UNREAD_TAGS):
+        element.decompose()
+    for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
+        comment.extract()
+    return str(soup)
+
+
+def variants():
+    """The (label, parser, strained) combinations to compare against the full html.parser tree"""
+    yield "html.parser", "html.parser", False
+    yield "html.parser + strainer", "html.parser", True
+    if lxml:
+        yield "lxml", "lxml", False
+        yield "lxml + strainer", "lxml", True
+
+
+def time_extraction(html, parser, strainer, extract, repeat):
+    """Returns the extracted text and the best time (in ms) to parse and extract the page"""
+
+    def run():
+        return extract(BeautifulSoup(html, parser, parse_only=strainer))
+
+    best = min(timeit.repeat(run, number=1, repeat=repeat))
+    return run(), best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="number of timed runs per variant (default: 20)")
+    parser.add_argument("--archive", help="a recorded run, whose real article pages to benchmark")
+    parser.add_argument(
+        "--save-fixtures", action="store_true", help="write trimmed copies of the archive's pages over the fixtures"
+    )
+    args = parser.parse_args()
+
+    if args.archive:
+        pages = recorded_pages(args.archive)
+        for name in SOURCES.keys() - pages.keys():
+            print(f"No article page of {name} in {args.archive}")
+        if args.save_fixtures:
+            for name, html in pages.items():
+                (FIXTURES_DIR / f"{name}.html").write_text(trim(html))
+                print(f"Saved a trimmed copy of the {name} page to {FIXTURES_DIR / name}.html")
+    else:
+        pages = {name: (FIXTURES_DIR / f"{name}.html").read_text() for name in SOURCES}
+
+    if not lxml:
+        print("lxml is not installed, only html.parser will be benchmarked\n")
+
+    print(f"{'source':<18}{'variant':<26}{'ms/page':>10}{'speedup':>10}  output")
+    for name, html in pages.items():
+        strainer, extract = SOURCES[name]
+        baseline_text, baseline_ms = None, None
+        for label, backend, strained in variants():
+            text, ms = time_extraction(html, backend, strainer if strained else None, extract, args.repeat)
+            if baseline_ms is None:
+                baseline_text, baseline_ms = text, ms
+            status = "identical" if text == baseline_text else "DIFFERS"
+            print(f"{name:<18}{label:<26}{ms:>10.2f}{baseline_ms / ms:>9.1f}x  {status}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
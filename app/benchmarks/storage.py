@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmarks storing articles: row-by-row inserts (one statement and one
+transaction per article) against save_news_to_db's batched upserts, of new
+articles, of the same articles again, and of the articles with changed content.
+
+Runs on a temporary SQLite file (in WAL mode, as with DATABASE_BACKEND=sqlite)
+unless --postgres is given, in which case the configured PostgreSQL database
+is used and the synthetic articles are deleted afterwards.
+
+Usage: python -m app.benchmarks.storage [--rows N] [--postgres]
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from app.core.db.config import create_database
+from app.core.db.models import Article, Episode, Mp3
+from app.core.news.fetch import save_news_to_db
+
+MODELS = [Mp3, Episode, Article]
+
+# the synthetic articles' URLs, so that they can be told apart (and removed)
+URL_PREFIX = "https://benchmark.invalid/"
+
+
+def make_news(rows, prefix):
+    """Returns ``rows`` synthetic news items, of roughly the size of a real article"""
+    paragraph = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 8
+    return [
+        {
+            "source": f"Source {i % 6}",
+            "url": f"{URL_PREFIX}{prefix}/{i}",
+            "title": f"Article {i}",
+            "content": "\n".join([paragraph] * 10),
+            "category": "",
+        }
+        for i in range(rows)
+    ]
+
+
+def timed(label, rows, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28}{elapsed * 1000:>10.1f} ms{rows / elapsed:>12.0f} rows/s")
+
+
+def run(database, rows):
+    with database.bind_ctx(MODELS):
+        database.create_tables(MODELS, safe=True)
+        try:
+            timed("row by row", rows, lambda: [Article.create(**item) for item in make_news(rows, "create")])
+
+            news = make_news(rows, "upsert")
+            timed("save_news_to_db (insert)", rows, lambda: save_news_to_db(news))
+            timed("save_news_to_db (unchanged)", rows, lambda: save_news_to_db(news))
+            changed = [{**item, "content": item["content"] + " Updated."} for item in news]
+            timed("save_news_to_db (update)", rows, lambda: save_news_to_db(changed))
+        finally:
+            Article.delete().where(Article.url.startswith(URL_PREFIX)).execute()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000, help="number of articles to store (default: 2000)")
+    parser.add_argument("--postgres", action="store_true", help="use the configured PostgreSQL database")
+    args = parser.parse_args()
+
+    # save_news_to_db logs every call
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.postgres:
+        database = create_database("postgres", pool_size=0)
+        print(f"PostgreSQL, {args.rows} articles\n")
+        run(database, args.rows)
+        database.close()
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            database = create_database("sqlite", path=Path(tmp) / "benchmark.sqlite3")
+            print(f"SQLite ({database.journal_mode} journal), {args.rows} articles\n")
+            run(database, args.rows)
+            database.close()
+
+
+if __name__ == "__main__":
+    main()
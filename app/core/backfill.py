@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Rebuilds the digests of past dates, say after the daily run missed a week.
+
+The ZNBC listing and the feeds of the other sources are fetched once, and
+each date's news is then picked out of them, along with the articles
+already stored for that date. The dates' articles are fetched one date
+after the other (each date's concurrently, within the per-host limits),
+and the dates are then processed (stored, digested and rendered, as by the
+daily run) concurrently. Only what the sources still list can be fetched
+again, so the further back a date is, the more its digest relies on the
+stored articles.
+
+Usage: python -m app.core.backfill START [END]
+"""
+
+import argparse
+import datetime
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from colorama import init
+from dotenv import load_dotenv
+
+from app.core.db.config import check_database, close_database, connection, initialize_database
+from app.core.db.repository import articles_between
+from app.core.news.fetch import Listings, fetch_listings, get_latest_news, save_news_to_file
+from app.core.run import process_news, raw_news_file
+from app.core.utilities import BACKFILL_MAX_WORKERS, configure_logging
+
+
+def dates_between(start: datetime.date, end: datetime.date) -> list[str]:
+    """Returns the ISO dates from ``start`` to ``end`` (inclusive)"""
+    return [(start + datetime.timedelta(days=n)).isoformat() for n in range((end - start).days + 1)]
+
+
+def news_of(date: str, listings: Listings) -> list[dict[str, str]]:
+    """
+    Returns ``date``'s news: the articles the sources still list for it, and
+    those already stored for it (a fetched copy of an article wins)
+    """
+    day = datetime.date.fromisoformat(date)
+    news = {
+        article.url: {
+            "source": article.source,
+            "url": article.url,
+            "title": article.title,
+            "content": article.content,
+            "category": article.category or "",
+        }
+        for article in articles_between(day, day)
+    }
+    news.update((item["url"], item) for item in get_latest_news(date, listings))
+    # stored under the date they are for, rather than today's
+    return [{**item, "date": date} for item in news.values()]
+
+
+def backfill_date(date: str, news: list[dict[str, str]]) -> bool:
+    """Rebuilds ``date``'s digest from its news, and returns whether it was produced"""
+    start_time = time.time()
+    try:
+        save_news_to_file(news, raw_news_file(date))
+        with connection():
+            return process_news(news, date, start_time)
+    except (Exception, SystemExit) as err:
+        # (create_news_digest exits when the model returns nothing)
+        logging.error(f"Failed to rebuild the digest for {date}: {err!r}")
+        return False
+
+
+def backfill(dates: list[str], max_workers: int = BACKFILL_MAX_WORKERS) -> dict[str, bool]:
+    """Rebuilds the digests of ``dates``, and returns whether each was produced"""
+    logging.info("Fetching the listings of all sources...")
+    listings = fetch_listings()
+    news = {}
+    for date in dates:
+        logging.info(f"Fetching the news of {date}...")
+        news[date] = news_of(date, listings)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="backfill") as executor:
+        results = executor.map(lambda date: backfill_date(date, news[date]), dates)
+        return dict(zip(dates, results, strict=True))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("start", type=datetime.date.fromisoformat, help="the first date to rebuild (YYYY-MM-DD)")
+    parser.add_argument("end", type=datetime.date.fromisoformat, nargs="?", help="the last date (default: start)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=BACKFILL_MAX_WORKERS,
+        help=f"dates processed at once (default: {BACKFILL_MAX_WORKERS})",
+    )
+    args = parser.parse_args()
+
+    dates = dates_between(args.start, args.end or args.start)
+    if not dates:
+        parser.error("the end date is before the start date")
+
+    start_time = time.time()
+    init()
+    configure_logging()
+    load_dotenv()
+
+    if not check_database():
+        sys.exit(1)
+    initialize_database()
+    try:
+        results = backfill(dates, args.workers)
+    finally:
+        close_database()
+
+    failed = [date for date, produced in results.items() if not produced]
+    logging.info(
+        f"Rebuilt {len(dates) - len(failed)} of {len(dates)} digests in {time.time() - start_time:.2f} seconds"
+        + (f" (none for {', '.join(failed)})" if failed else "")
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+A small on-disk cache, used to avoid repeating expensive network calls across runs.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    """
+    A size-bounded, content-addressed cache of byte strings on disk.
+
+    Entries are stored under the SHA-256 of their key. A file's modification
+    time records when it was written (for the TTL) and its access time is
+    bumped on every hit, so that the least recently used entries are evicted
+    first once the cache grows beyond ``max_bytes``.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, ttl: float):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._size: int | None = None
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return self.directory / digest[:2] / digest
+
+    def _entries(self) -> list[tuple[Path, os.stat_result]]:
+        return [(path, path.stat()) for path in self.directory.glob("*/*") if path.is_file()]
+
+    def get(self, key: str) -> bytes | None:
+        """Returns the value stored for a key, or None if it is missing or has expired"""
+        path = self._path(key)
+        try:
+            stat = path.stat()
+            now = time.time()
+            if now - stat.st_mtime > self.ttl:
+                self.delete(key)
+                return None
+            value = path.read_bytes()
+            os.utime(path, (now, stat.st_mtime))
+            return value
+        except FileNotFoundError:
+            return None
+
+    def set(self, key: str, value: bytes):
+        """Stores a value, evicting the least recently used entries if the cache is full"""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            previous = path.stat().st_size if path.exists() else 0
+            fd, tmp = tempfile.mkstemp(dir=path.parent)
+            with os.fdopen(fd, "wb") as f:
+                f.write(value)
+            os.replace(tmp, path)
+
+            if self._size is None:
+                self._size = sum(stat.st_size for _, stat in self._entries())
+            else:
+                self._size += len(value) - previous
+
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def delete(self, key: str):
+        """Removes a key from the cache, if present"""
+        with self._lock:
+            try:
+                size = self._path(key).stat().st_size
+                self._path(key).unlink()
+                if self._size is not None:
+                    self._size -= size
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        """Removes every entry from the cache"""
+        with self._lock:
+            for path, _ in self._entries():
+                path.unlink(missing_ok=True)
+            self._size = 0
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda entry: entry[1].st_atime)
+        self._size = sum(stat.st_size for _, stat in entries)
+        evicted = 0
+        for path, stat in entries:
+            if self._size <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            self._size -= stat.st_size
+            evicted += 1
+        logger.debug(f"Evicted {evicted} entries from {self.directory}")
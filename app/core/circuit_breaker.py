@@ -0,0 +1,161 @@
+"""
+Per-host circuit breaker for the fetch stage.
+
+When a news site is down, every request to it would otherwise wait for its own
+timeout. Once a host has failed ``threshold`` times in a row its circuit
+opens, and further requests to it fail immediately with ``CircuitOpenError``
+until ``cooldown`` seconds have passed. A single probe request is then let
+through: if it succeeds the circuit closes again, otherwise it re-opens.
+
+Host health is kept across runs, so a host that was down at the end of the
+previous run starts out half-open and costs one (fast) probe rather than a
+round of hung connections. The failures of a host whose circuit wasn't open
+are not carried over: a circuit only opens after ``threshold`` consecutive
+failures within a run.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(requests.RequestException):
+    """Requests to the host are being short-circuited after repeated failures"""
+
+
+@dataclass
+class HostHealth:
+    """The failure record of a host"""
+
+    # consecutive failures, reset by any success
+    failures: int = 0
+    # wall-clock time at which the circuit last opened, if it is open
+    opened_at: float | None = None
+
+
+class CircuitBreaker:
+    """Tracks consecutive failures per host, and short-circuits requests to hosts that keep failing"""
+
+    def __init__(self, state_file: Path, threshold: int, cooldown: float):
+        self.state_file = Path(state_file)
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self._condition = threading.Condition()
+        self._hosts: dict[str, HostHealth] | None = None
+        # hosts that currently have a probe request in flight, and the thread sending it
+        self._probing: dict[str, int] = {}
+
+    def _load(self) -> dict[str, HostHealth]:
+        try:
+            with open(self.state_file) as f:
+                stored = json.load(f)
+            hosts = {host: HostHealth(**health) for host, health in stored.items()}
+        except (FileNotFoundError, json.JSONDecodeError, TypeError):
+            return {}
+
+        # hosts that were down on the previous run are probed straight away; others start afresh
+        for health in hosts.values():
+            if health.opened_at is not None:
+                health.opened_at = 0.0
+            else:
+                health.failures = 0
+        return hosts
+
+    def _health(self, host: str) -> HostHealth:
+        if self._hosts is None:
+            self._hosts = self._load()
+        return self._hosts.setdefault(host, HostHealth())
+
+    def _end_probe(self, host: str) -> bool:
+        """Ends the host's probe if the current thread is sending it, and returns whether it was"""
+        if self._probing.get(host) != threading.get_ident():
+            return False
+        del self._probing[host]
+        return True
+
+    def _state(self, health: HostHealth) -> str:
+        if health.opened_at is None:
+            return CLOSED
+        if time.time() - health.opened_at < self.cooldown:
+            return OPEN
+        return HALF_OPEN
+
+    def state(self, host: str) -> str:
+        """Returns the state of a host's circuit: ``CLOSED``, ``OPEN`` or ``HALF_OPEN``"""
+        with self._condition:
+            return self._state(self._health(host))
+
+    def before_request(self, host: str) -> bool:
+        """
+        Called before each request to a host. Raises ``CircuitOpenError`` if the
+        circuit is open, and returns whether the request is the probe of a
+        half-open circuit. While a probe is in flight, other requests to the
+        host wait for its outcome, which only the thread sending the probe
+        reports.
+        """
+        with self._condition:
+            while True:
+                health = self._health(host)
+                state = self._state(health)
+                if state == CLOSED:
+                    return False
+                if state == OPEN:
+                    raise CircuitOpenError(f"{host} is failing, not sending requests to it")
+                if host not in self._probing:
+                    self._probing[host] = threading.get_ident()
+                    return True
+                self._condition.wait()
+
+    def record_success(self, host: str):
+        """Closes the host's circuit"""
+        with self._condition:
+            health = self._health(host)
+            if health.opened_at is not None:
+                logger.info(f"{host} is responding again")
+            health.failures = 0
+            health.opened_at = None
+            self._end_probe(host)
+            self._condition.notify_all()
+
+    def record_failure(self, host: str):
+        """Counts a failure against the host, opening its circuit once the threshold is reached"""
+        with self._condition:
+            health = self._health(host)
+            health.failures += 1
+            probe = self._end_probe(host)
+            if probe or (health.opened_at is None and health.failures >= self.threshold):
+                health.opened_at = time.time()
+                logger.warning(f"{host} failed {health.failures} times in a row, skipping it for {self.cooldown}s")
+            self._condition.notify_all()
+
+    def release(self, host: str):
+        """Gives up the current thread's probe without an outcome (say, the request raised an unrelated error)"""
+        with self._condition:
+            if self._end_probe(host):
+                self._condition.notify_all()
+
+    def save(self):
+        """Persists the health of the hosts that are failing, replacing the previous file atomically"""
+        # (the lock is held throughout, as runs fetching several dates at once save from each of their threads)
+        with self._condition:
+            if self._hosts is None:
+                return
+            failing = {host: asdict(health) for host, health in self._hosts.items() if health.failures}
+
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.state_file.with_suffix(".tmp")
+            with open(tmp_file, "w") as f:
+                json.dump(failing, f, indent=2)
+            os.replace(tmp_file, self.state_file)
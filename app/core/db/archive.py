@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Cold storage for old articles.
+
+Articles older than ``ARTICLE_ARCHIVE_AFTER_DAYS`` have their content moved,
+zstd-compressed, to the ``article_archive`` table, leaving the article table
+(and its indexes) small however large the archive grows. Their rows stay
+where they are, with an empty ``content`` and ``archived`` set, so listings,
+lookups by URL and content hashes are unaffected; ``article_content`` and
+``load_archived_content`` bring the text back (``articles_between`` does so
+for its callers). Full-text search keeps matching their content, and
+highlights it in the results (see app.core.db.search). An archived article
+whose content changes is stored in the article table again, and its copy
+here is dropped (see app.core.news.fetch.save_news_to_db).
+
+The daily JSON copies of the news in the data directory (each run's, in
+``<date>/``) are compressed alongside, as ``<date>_news.json.zst``. Nothing
+reads them back: the digests of past dates are rebuilt from the database
+(see app.core.backfill).
+
+Usage: python -m app.core.db.archive [--days N]
+"""
+
+import argparse
+import datetime
+import logging
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+import zstandard
+from peewee import chunked
+
+from app.core.db.config import close_database, initialize_database
+from app.core.db.models import Article, ArticleArchive
+from app.core.utilities import ARTICLE_ARCHIVE_AFTER_DAYS, DATA_DIR, configure_logging, today
+
+# zstd level: well into diminishing returns, while archiving stays quick
+COMPRESSION_LEVEL = 12
+
+# articles moved per transaction
+ARCHIVE_BATCH_SIZE = 200
+
+
+def compress(text: str) -> bytes:
+    return zstandard.compress(text.encode(), COMPRESSION_LEVEL)
+
+
+def decompress(data: bytes) -> str:
+    return zstandard.decompress(bytes(data)).decode()
+
+
+def archive_articles(before: datetime.date, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Moves the content of the articles dated before ``before`` to cold storage, and returns how many were moved"""
+    moved = 0
+    while True:
+        with Article._meta.database.atomic():
+            batch = list(
+                Article.select(Article.id, Article.content)
+                .where((Article.date < before) & (Article.archived == False))  # noqa: E712
+                .order_by(Article.id)
+                .limit(batch_size)
+            )
+            if not batch:
+                return moved
+
+            rows = [{"article_id": article.id, "content": compress(article.content)} for article in batch]
+            ArticleArchive.insert_many(rows).on_conflict(
+                conflict_target=[ArticleArchive.article_id], preserve=[ArticleArchive.content]
+            ).execute()
+            ids = [article.id for article in batch]
+            Article.update(content="", archived=True).where(Article.id.in_(ids)).execute()
+        moved += len(batch)
+
+
+def article_content(article: Article) -> str:
+    """Returns the content of an article, from cold storage if it has been archived"""
+    if not article.archived:
+        return article.content
+    return decompress(ArticleArchive.get_by_id(article.id).content)
+
+
+def load_archived_content(articles: Iterable[Article], batch_size: int = ARCHIVE_BATCH_SIZE):
+    """Fills in the content of the archived ones among ``articles``, in place"""
+    archived = {article.id: article for article in articles if article.archived}
+    for ids in chunked(archived, batch_size):
+        for article_id, content in (
+            ArticleArchive.select(ArticleArchive.article_id, ArticleArchive.content)
+            .where(ArticleArchive.article_id.in_(ids))
+            .tuples()
+        ):
+            archived[article_id].content = decompress(content)
+
+
+def compress_news_files(before: datetime.date, data_dir: Path = DATA_DIR) -> int:
+    """Compresses the daily news JSON files dated before ``before``, and returns how many were compressed"""
+    compressed = 0
+    # (those of failed runs are left at the top of the data directory)
+    paths = [*Path(data_dir).glob("*/*_news.json"), *Path(data_dir).glob("*_news.json")]
+    for path in sorted(paths):
+        try:
+            date = datetime.date.fromisoformat(path.name.removesuffix("_news.json"))
+        except ValueError:
+            continue
+        if date >= before:
+            continue
+        target = path.with_name(path.name + ".zst")
+        target.write_bytes(zstandard.compress(path.read_bytes(), COMPRESSION_LEVEL))
+        path.unlink()
+        compressed += 1
+    return compressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=ARTICLE_ARCHIVE_AFTER_DAYS,
+        help=f"archive articles older than this many days (default: {ARTICLE_ARCHIVE_AFTER_DAYS})",
+    )
+    args = parser.parse_args()
+
+    configure_logging()
+    start_time = time.time()
+    before = today - datetime.timedelta(days=args.days)
+
+    initialize_database()
+    try:
+        moved = archive_articles(before)
+    finally:
+        close_database()
+    files = compress_news_files(before)
+
+    logging.info(
+        f"Archived {moved} articles and compressed {files} news files dated before {before.isoformat()} "
+        f"in {time.time() - start_time:.2f} seconds"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,204 @@
-from peewee import PostgresqlDatabase
+import logging
+from pathlib import Path
 
-from app.core.utilities import DATABASE_HOST, DATABASE_NAME, DATABASE_PASSWORD, DATABASE_USER
+from peewee import Database, DatabaseError, PostgresqlDatabase, SqliteDatabase, fn
+from playhouse.migrate import SchemaMigrator, migrate
+from playhouse.pool import PooledDatabase, PooledPostgresqlDatabase
 
-database = PostgresqlDatabase(
+from app.core.utilities import (
+    DATABASE_BACKEND,
+    DATABASE_CONNECT_TIMEOUT,
+    DATABASE_HOST,
     DATABASE_NAME,
-    **{"host": DATABASE_HOST, "user": DATABASE_USER, "password": DATABASE_PASSWORD},
+    DATABASE_PARTITIONED,
+    DATABASE_PASSWORD,
+    DATABASE_PATH,
+    DATABASE_POOL_SIZE,
+    DATABASE_USER,
 )
 
+# seconds after which an idle pooled connection is discarded rather than reused
+POOL_STALE_TIMEOUT = 300
+
+# WAL lets readers carry on while another thread writes; with it, NORMAL sync is still safe from corruption
+SQLITE_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "foreign_keys": 1,
+    "cache_size": -64 * 1024,  # KiB
+}
+
+
+def create_database(
+    backend: str = DATABASE_BACKEND, pool_size: int = DATABASE_POOL_SIZE, path: Path = DATABASE_PATH
+) -> Database:
+    """
+    Returns the database: PostgreSQL, pooled unless ``pool_size`` is 0, or a
+    SQLite file at ``path`` if ``backend`` is "sqlite". Nothing connects until
+    the first query (or ``connect()``); each thread then gets a connection of
+    its own, from the pool if there is one.
+    """
+    if backend == "sqlite":
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        return SqliteDatabase(path, pragmas=SQLITE_PRAGMAS, timeout=DATABASE_CONNECT_TIMEOUT)
+    if backend != "postgres":
+        raise ValueError(f"Unknown database backend {backend!r}, expected 'postgres' or 'sqlite'")
+
+    params = {
+        "host": DATABASE_HOST,
+        "user": DATABASE_USER,
+        "password": DATABASE_PASSWORD,
+        "connect_timeout": DATABASE_CONNECT_TIMEOUT,
+    }
+    if pool_size:
+        return PooledPostgresqlDatabase(
+            DATABASE_NAME, max_connections=pool_size, stale_timeout=POOL_STALE_TIMEOUT, **params
+        )
+    return PostgresqlDatabase(DATABASE_NAME, **params)
+
+
+database = create_database()
+
+
+def check_database() -> bool:
+    """
+    Cheaply checks that the database is reachable (so that a run can give up
+    before doing any work that would need it), logging the error if it isn't.
+    """
+    try:
+        with database.connection_context():
+            database.execute_sql("SELECT 1")
+        return True
+    except DatabaseError as err:
+        logging.error(f"The database is unreachable: {err}")
+        return False
+
+
+def connection():
+    """
+    Returns a context manager (also usable as a decorator) that gives the
+    current thread a connection for its duration, and then hands it back to
+    the pool. Background workers should wrap their database work in it.
+    """
+    return database.connection_context()
+
+
+def _merged_duplicates(Article) -> dict[int, dict]:
+    """
+    Returns the summary and episode to give the first copy of each duplicated
+    article (by its id) that only a later copy has
+    """
+    duplicated = Article.select(Article.url).group_by(Article.url).having(fn.COUNT(Article.id) > 1)
+    copies = (
+        Article.select(Article.id, Article.url, Article.summary, Article.episode)
+        .where(Article.url.in_(duplicated))
+        .order_by(Article.url, Article.id)
+        .tuples()
+    )
+    first_copies = {}
+    updates = {}
+    for article_id, url, summary, episode_id in copies:
+        if url not in first_copies:
+            first_copies[url] = (article_id, summary, episode_id)
+            continue
+        first_id, first_summary, first_episode_id = first_copies[url]
+        update = updates.setdefault(first_id, {})
+        if first_summary is None and summary is not None and Article.summary not in update:
+            update[Article.summary] = summary
+        if first_episode_id is None and episode_id is not None and Article.episode not in update:
+            update[Article.episode] = episode_id
+    return {article_id: update for article_id, update in updates.items() if update}
+
+
+def _deduplicate_articles():
+    """
+    Removes the duplicate articles stored before ``Article.url`` was made
+    unique, so that the unique index can be created: the first copy of each is
+    kept, and given the summary and episode only a later copy had. This is a
+    one-off migration, and a no-op once the index exists.
+    """
+    from app.core.db.models import Article
+
+    table = Article._meta.table_name
+    if not database.table_exists(table):
+        return
+    if any(index.unique and index.columns == ["url"] for index in database.get_indexes(table)):
+        return
+
+    with database.atomic():
+        merged = _merged_duplicates(Article)
+        for article_id, update in merged.items():
+            Article.update(update).where(Article.id == article_id).execute()
+        first_copies = Article.select(fn.MIN(Article.id)).group_by(Article.url)
+        deleted = Article.delete().where(Article.id.not_in(first_copies)).execute()
+    if deleted:
+        logging.warning(
+            f"Removed {deleted} duplicate articles before adding the unique index on their URL "
+            f"(the summaries or episodes of {len(merged)} were merged into their first copy)"
+        )
+
+
+def _add_missing_columns(models):
+    """
+    Adds the columns of fields added to the models since their tables were
+    created (``create_tables`` only creates missing tables). Their indexes
+    are then created along with the other missing ones.
+    """
+    for model in models:
+        table = model._meta.table_name
+        if not database.table_exists(table):
+            continue
+        columns = {column.name for column in database.get_columns(table)}
+        missing = [field for field in model._meta.sorted_fields if field.column_name not in columns]
+        if missing:
+            logging.info(f"Adding columns {', '.join(f.column_name for f in missing)} to {table}")
+            migrator = SchemaMigrator.from_database(database)
+            with database.atomic():
+                migrate(*(migrator.add_column(table, field.column_name, field) for field in missing))
+
+
+def _partition_articles():
+    """
+    Partitions a new article table if DATABASE_PARTITIONED is set, and keeps
+    a partitioned one's partitions and indexes up to date
+    """
+    from app.core.db import partitions
+    from app.core.db.models import Article
+
+    if not partitions.is_partitioned(database):
+        if not DATABASE_PARTITIONED:
+            return
+        if Article.select().exists():
+            logging.warning("The article table isn't partitioned: run `python -m app.core.db.partitions --convert`")
+            return
+        partitions.convert_to_partitioned(database)
+
+    partitions.create_partition_indexes(database)
+    if created := partitions.create_upcoming_partitions(database):
+        logging.info(f"Created article partitions {', '.join(created)}")
+
 
 def initialize_database():
-    from app.core.db.models import Article, Episode, Mp3
+    from app.core.db.models import Article, ArticleArchive, Episode, Mp3
+    from app.core.db.partitions import is_partitioned
+    from app.core.db.search import create_search_index
+
+    models = [Mp3, Episode, Article, ArticleArchive]
 
     database.connect()
-    database.create_tables([Mp3, Episode, Article], safe=True)
+    # (a partitioned article table has a unique index on (url, date) instead, which create_tables can't handle)
+    partitioned = is_partitioned(database)
+    if not partitioned:
+        _deduplicate_articles()
+    _add_missing_columns(models)
+    database.create_tables([model for model in models if not (partitioned and model is Article)], safe=True)
+    if isinstance(database, PostgresqlDatabase):
+        create_search_index(database)
+        _partition_articles()
 
 
 def close_database():
     if not database.is_closed():
         database.close()
+    if isinstance(database, PooledDatabase):
+        database.close_idle()
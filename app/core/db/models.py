@@ -1,4 +1,14 @@
-from peewee import AutoField, BooleanField, CharField, DateField, ForeignKeyField, IntegerField, Model, TextField
+from peewee import (
+    AutoField,
+    BlobField,
+    BooleanField,
+    CharField,
+    DateField,
+    ForeignKeyField,
+    IntegerField,
+    Model,
+    TextField,
+)
 
 from app.core.db.config import database
 from app.core.utilities import today
@@ -28,7 +38,7 @@ class Episode(BaseModel):
 
     number = AutoField()
     live = BooleanField(default=False)
-    date = DateField(default=today)
+    date = DateField(default=today, index=True)
     title = CharField(max_length=255)
     description = CharField(max_length=255)
     presenter = CharField(max_length=255)
@@ -50,18 +60,37 @@ class Article(BaseModel):
 
     # core fields based on fetched data
     source = CharField(max_length=255)
-    url = CharField(max_length=2047)
+    # the natural key: an article is stored once, however often it is fetched
+    url = CharField(max_length=2047, unique=True)
     title = CharField(max_length=511)
     content = TextField()
     category = CharField(max_length=255, null=True)
+    # SHA-256 of the normalized content (see app.core.utilities.content_hash), to tell when it changes
+    content_hash = CharField(max_length=64, null=True, index=True)
+    # whether the content has moved to cold storage, in ArticleArchive (see app.core.db.archive)
+    archived = BooleanField(default=False)
 
     # additional fields
-    date = DateField(default=today)
+    date = DateField(default=today, index=True)
     summary = TextField(null=True)
     episode = ForeignKeyField(column_name="episode_id", field="number", model=Episode, null=True, backref="articles")
 
     class Meta:
         table_name = "article"
+        # for a source's articles over a range of dates (see app.core.db.repository)
+        indexes = ((("source", "date"), False),)
 
     def __str__(self):
         return self.title
+
+
+class ArticleArchive(BaseModel):
+    """The compressed content of an archived article"""
+
+    # the article's id; not a foreign key, as a partitioned article table (see app.core.db.partitions) can't have one
+    article_id = IntegerField(primary_key=True)
+    # zstd-compressed UTF-8 text
+    content = BlobField()
+
+    class Meta:
+        table_name = "article_archive"
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Monthly range partitioning of the article table, on PostgreSQL.
+
+With ``DATABASE_PARTITIONED=1``, the article table is partitioned by month
+on ``date`` (``article_p2026_10`` holds October 2026), with a default
+partition for dates no month covers. A day's inserts, and queries over a
+range of dates, then only touch the partitions they need, however long the
+history gets.
+
+PostgreSQL requires the unique constraints of a partitioned table to include
+the partition key, so the primary key becomes ``(id, date)`` and URLs are
+unique per date, rather than overall: ``save_news_to_db`` upserts an
+article that is already stored under the date it was first stored with.
+
+A new database is partitioned on creation. An existing article table is
+converted (copied into a partitioned one) with ``--convert``. Each run
+creates the partitions for the next ``PARTITION_MONTHS_AHEAD`` months, so
+that daily inserts never fall into the default partition. Old months can be
+detached, which leaves them as standalone tables (to be dumped, or queried),
+or dropped outright.
+
+Usage: python -m app.core.db.partitions [--convert] [--detach-before YYYY-MM [--drop]]
+"""
+
+import argparse
+import datetime
+import functools
+import logging
+import re
+
+from peewee import PostgresqlDatabase
+
+from app.core.db.config import close_database, database, initialize_database
+from app.core.db.models import Article, ArticleArchive, Episode
+from app.core.db.search import create_search_index
+from app.core.utilities import configure_logging, today
+
+# months for which partitions are created in advance
+PARTITION_MONTHS_AHEAD = 3
+
+DEFAULT_PARTITION = f"{Article._meta.table_name}_p_default"
+
+_PARTITION_NAME = re.compile(rf"^{Article._meta.table_name}_p(\d{{4}})_(\d{{2}})$")
+
+
+def partition_name(month: datetime.date) -> str:
+    return f"{Article._meta.table_name}_p{month.year:04}_{month.month:02}"
+
+
+def _month(date: datetime.date) -> datetime.date:
+    return date.replace(day=1)
+
+
+def _next_month(month: datetime.date) -> datetime.date:
+    return (month.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+
+
+def is_partitioned(db=None) -> bool:
+    """Whether the article table (in ``db``, the models' database by default) is partitioned"""
+    return _is_partitioned(db or Article._meta.database)
+
+
+@functools.cache
+def _is_partitioned(db) -> bool:
+    if not isinstance(db, PostgresqlDatabase):
+        return False
+    cursor = db.execute_sql(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", (Article._meta.table_name,)
+    )
+    return cursor.fetchone() is not None
+
+
+def partitions(db=database) -> list[str]:
+    """Returns the names of the article table's partitions"""
+    cursor = db.execute_sql(
+        "SELECT child.relname FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = to_regclass(%s) ORDER BY child.relname",
+        (Article._meta.table_name,),
+    )
+    return [name for (name,) in cursor.fetchall()]
+
+
+def create_partitions(start: datetime.date, end: datetime.date, db=database) -> list[str]:
+    """Creates the missing partitions for the months from ``start`` to ``end``, and returns their names"""
+    table = Article._meta.table_name
+    existing = set(partitions(db))
+    created = []
+    month = _month(start)
+    while month <= end:
+        name = partition_name(month)
+        if name not in existing:
+            db.execute_sql(
+                f"CREATE TABLE {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+            )
+            created.append(name)
+        month = _next_month(month)
+    if DEFAULT_PARTITION not in existing:
+        db.execute_sql(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {table} DEFAULT")
+        created.append(DEFAULT_PARTITION)
+    return created
+
+
+def create_upcoming_partitions(db=database) -> list[str]:
+    """Creates the partitions for this month and the next ``PARTITION_MONTHS_AHEAD``"""
+    end = _month(today)
+    for _ in range(PARTITION_MONTHS_AHEAD):
+        end = _next_month(end)
+    return create_partitions(today, end, db)
+
+
+def create_partition_indexes(db=database):
+    """
+    Creates the article table's indexes, apart from the unique one on ``url``
+    (replaced by one on ``(url, date)``), which ``create_tables`` can't create
+    on a partitioned table
+    """
+    table = Article._meta.table_name
+    db.execute_sql(f"CREATE UNIQUE INDEX IF NOT EXISTS {table}_url_date ON {table} (url, date)")
+    for index in Article._meta.fields_to_index():
+        if not index._unique:
+            db.execute(Article._schema._create_index(index, safe=True))
+
+
+def convert_to_partitioned(db=database):
+    """
+    Replaces the article table by a partitioned copy, in a single
+    transaction, with partitions for every month from its first article's
+    up to ``PARTITION_MONTHS_AHEAD`` months from now
+    """
+    table = Article._meta.table_name
+    legacy = f"{table}_unpartitioned"
+    columns = [field.column_name for field in Article._meta.sorted_fields]
+    # the search vectors are copied too: those of archived articles can't be rebuilt from the table alone
+    columns = ", ".join(columns + [column.name for column in db.get_columns(table) if column.name == "search_vector"])
+
+    with db.atomic():
+        (sequence,) = db.execute_sql("SELECT pg_get_serial_sequence(%s, 'id')", (table,)).fetchone()
+        (first,) = db.execute_sql(f"SELECT MIN(date) FROM {table}").fetchone()
+
+        db.execute_sql(f"ALTER TABLE {table} RENAME TO {legacy}")
+        db.execute_sql(
+            f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING GENERATED) PARTITION BY RANGE (date)"
+        )
+        db.execute_sql(f"ALTER TABLE {table} ADD PRIMARY KEY (id, date)")
+        db.execute_sql(
+            f"ALTER TABLE {table} ADD FOREIGN KEY (episode_id) REFERENCES {Episode._meta.table_name} (number)"
+        )
+        # the id sequence would otherwise be dropped along with the old table
+        db.execute_sql(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+
+        create_partitions(first or today, today, db)
+        create_upcoming_partitions(db)
+        db.execute_sql(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {legacy}")
+        # (also drops the constraints of other tables referencing it)
+        db.execute_sql(f"DROP TABLE {legacy} CASCADE")
+        create_partition_indexes(db)
+        create_search_index(db)
+
+    _is_partitioned.cache_clear()
+
+
+def detach_partitions(before: datetime.date, drop: bool = False, db=database) -> list[str]:
+    """
+    Detaches the partitions of the months before ``before``'s (dropping them,
+    and their articles' archived content, if ``drop``), and returns their names
+    """
+    table = Article._meta.table_name
+    detached = []
+    for name in partitions(db):
+        if not (match := _PARTITION_NAME.match(name)):
+            continue
+        if datetime.date(int(match[1]), int(match[2]), 1) >= _month(before):
+            continue
+        with db.atomic():
+            db.execute_sql(f"ALTER TABLE {table} DETACH PARTITION {name}")
+            if drop:
+                archive = ArticleArchive._meta.table_name
+                db.execute_sql(f"DELETE FROM {archive} WHERE article_id IN (SELECT id FROM {name})")
+                db.execute_sql(f"DROP TABLE {name}")
+        detached.append(name)
+    return detached
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--convert", action="store_true", help="partition an existing, unpartitioned article table")
+    parser.add_argument(
+        "--detach-before",
+        type=lambda value: datetime.date.fromisoformat(f"{value}-01"),
+        metavar="YYYY-MM",
+        help="detach the partitions of the months before this one",
+    )
+    parser.add_argument("--drop", action="store_true", help="drop the detached partitions, rather than keep them")
+    args = parser.parse_args()
+
+    configure_logging()
+    if not isinstance(database, PostgresqlDatabase):
+        parser.error("partitioning is only supported on PostgreSQL")
+
+    initialize_database()
+    try:
+        if args.convert and not is_partitioned(database):
+            convert_to_partitioned(database)
+            logging.info("Converted the article table to a partitioned one")
+        if not is_partitioned(database):
+            parser.error("the article table isn't partitioned (see --convert)")
+
+        if created := create_upcoming_partitions(database):
+            logging.info(f"Created partitions {', '.join(created)}")
+        if args.detach_before:
+            detached = detach_partitions(args.detach_before, args.drop, database)
+            logging.info(f"{'Dropped' if args.drop else 'Detached'} {len(detached)} partitions: {', '.join(detached)}")
+    finally:
+        close_database()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Queries over the archived articles and episodes.
+
+Each of these is served by one of the indexes declared on the models: the
+unique index on ``Article.url``, the index on ``Article.date`` and the
+composite index on ``(Article.source, Article.date)``.
+"""
+
+import datetime
+from collections.abc import Iterable
+
+from peewee import chunked, fn
+
+from app.core.db.archive import load_archived_content
+from app.core.db.models import Article, Episode
+
+# URLs per "already seen?" query, to keep within the database's parameter limits
+LOOKUP_BATCH_SIZE = 500
+
+
+def articles_between(
+    start: datetime.date, end: datetime.date, source: str | None = None, with_content: bool = True
+) -> list[Article]:
+    """
+    Returns the articles dated from ``start`` to ``end`` (inclusive), oldest
+    first, optionally only those from ``source``. Listings that don't need the
+    article text can leave out ``content``, by far the largest column;
+    otherwise that of archived articles is brought back from cold storage.
+    """
+    fields = [] if with_content else [Article.id, Article.source, Article.url, Article.title, Article.date]
+    query = Article.select(*fields).where(Article.date.between(start, end))
+    if source is not None:
+        query = query.where(Article.source == source)
+    articles = list(query.order_by(Article.date, Article.id))
+    if with_content:
+        load_archived_content(articles)
+    return articles
+
+
+def daily_counts_by_source(start: datetime.date, end: datetime.date) -> dict[datetime.date, dict[str, int]]:
+    """Returns the number of articles per source, for each day from ``start`` to ``end`` that has any"""
+    query = (
+        Article.select(Article.date, Article.source, fn.COUNT(Article.id).alias("count"))
+        .where(Article.date.between(start, end))
+        .group_by(Article.date, Article.source)
+        .order_by(Article.date, Article.source)
+        .tuples()
+    )
+    counts: dict[datetime.date, dict[str, int]] = {}
+    for date, source, count in query:
+        counts.setdefault(date, {})[source] = count
+    return counts
+
+
+def seen_urls(urls: Iterable[str]) -> set[str]:
+    """Returns those of ``urls`` that are already stored"""
+    seen = set()
+    for batch in chunked(set(urls), LOOKUP_BATCH_SIZE):
+        seen.update(url for (url,) in Article.select(Article.url).where(Article.url.in_(batch)).tuples())
+    return seen
+
+
+def is_seen(url: str) -> bool:
+    """Returns whether an article with this URL is already stored"""
+    return Article.select().where(Article.url == url).exists()
+
+
+def episode_for(date: datetime.date) -> Episode | None:
+    """Returns the episode of a given day, if there is one"""
+    return Episode.select().where(Episode.date == date).order_by(Episode.number.desc()).first()
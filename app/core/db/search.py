@@ -0,0 +1,203 @@
+"""
+PostgreSQL full-text search over the archived articles.
+
+Articles get a ``search_vector`` column, weighting words in the title
+above those in the content, with a GIN index on it. A trigger fills it in
+whenever an article's title or content is written; when the content moves
+to cold storage (see app.core.db.archive), its words are kept, so archived
+articles are found by their content as well. Searches only rank the
+articles that match, and only the results that are returned get
+highlighted, so they stay fast however many years of articles there are.
+
+The column is managed here rather than declared on ``Article``, so that
+ordinary queries don't select it (and so that the model still works on
+databases other than PostgreSQL).
+"""
+
+import datetime
+import logging
+
+from peewee import SQL, Expression, chunked, fn
+
+from app.core.db.archive import decompress
+from app.core.db.models import Article, ArticleArchive
+
+# text search configuration used to build the vectors and parse queries
+SEARCH_CONFIG = "english"
+
+# ts_headline options: the whole title, and up to two fragments of the content, with the matches marked up
+TITLE_HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, HighlightAll=true"
+HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=30, MinWords=10"
+
+SEARCH_VECTOR = SQL("search_vector")
+
+
+# archived articles whose vectors are rebuilt per transaction
+INDEX_BATCH_SIZE = 200
+
+
+def _vector(title: str, content: str) -> str:
+    """The SQL expression of the search vector of an article's ``title`` and ``content`` (SQL expressions too)"""
+    return (
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({title}, '')), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({content}, '')), 'B')"
+    )
+
+
+def create_search_index(database):
+    """
+    Adds the search vector column, the trigger filling it in and its GIN
+    index to the article table, if they don't exist yet; the vectors of the
+    articles already stored are filled in (or, for a column generated from
+    the content, as made by earlier versions, those of archived articles are
+    rebuilt from cold storage)
+    """
+    table = Article._meta.table_name
+    cursor = database.execute_sql(
+        "SELECT is_generated FROM information_schema.columns WHERE table_name = %s AND column_name = 'search_vector'",
+        (table,),
+    )
+    column = cursor.fetchone()
+
+    with database.atomic():
+        if column is None:
+            database.execute_sql(f"ALTER TABLE {table} ADD COLUMN search_vector tsvector")
+        elif column[0] == "ALWAYS":
+            database.execute_sql(f"ALTER TABLE {table} ALTER COLUMN search_vector DROP EXPRESSION")
+        database.execute_sql(
+            f"CREATE OR REPLACE FUNCTION {table}_search_vector() RETURNS trigger AS $$ BEGIN "
+            # archiving empties the content: the vector keeps its words
+            f"IF TG_OP = 'UPDATE' AND NEW.archived THEN "
+            f"NEW.search_vector := CASE WHEN OLD.archived THEN OLD.search_vector "
+            f"ELSE {_vector('NEW.title', 'OLD.content')} END; "
+            f"ELSE NEW.search_vector := {_vector('NEW.title', 'NEW.content')}; "
+            f"END IF; RETURN NEW; END $$ LANGUAGE plpgsql"
+        )
+        database.execute_sql(f"DROP TRIGGER IF EXISTS {table}_search_vector ON {table}")
+        database.execute_sql(
+            f"CREATE TRIGGER {table}_search_vector BEFORE INSERT OR UPDATE OF title, content, archived ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION {table}_search_vector()"
+        )
+        if column is None:
+            database.execute_sql(f"UPDATE {table} SET search_vector = {_vector('title', 'content')} WHERE NOT archived")
+    if column is None or column[0] == "ALWAYS":
+        if indexed := index_archived_articles(database):
+            logging.info(f"Rebuilt the search vectors of {indexed} archived articles")
+
+    database.execute_sql(f"CREATE INDEX IF NOT EXISTS {table}_search_vector ON {table} USING GIN (search_vector)")
+
+
+def index_archived_articles(database, batch_size: int = INDEX_BATCH_SIZE) -> int:
+    """
+    Rebuilds the search vectors of the archived articles from their content
+    in cold storage, and returns how many were rebuilt
+    """
+    table = Article._meta.table_name
+    archived = Article.select(Article.id).where(Article.archived == True).tuples()  # noqa: E712
+    indexed = 0
+    for ids in chunked((article_id for (article_id,) in archived.iterator()), batch_size):
+        with database.atomic():
+            for article_id, content in (
+                ArticleArchive.select(ArticleArchive.article_id, ArticleArchive.content)
+                .where(ArticleArchive.article_id.in_(ids))
+                .tuples()
+            ):
+                database.execute_sql(
+                    f"UPDATE {table} SET search_vector = {_vector('title', '%s')} WHERE id = %s",
+                    (decompress(content), article_id),
+                )
+                indexed += 1
+    return indexed
+
+
+def search_query(
+    text: str,
+    start: datetime.date | None = None,
+    end: datetime.date | None = None,
+    source: str | None = None,
+    limit: int = 20,
+    offset: int = 0,
+):
+    """Builds the query behind ``search_articles``"""
+    tsquery = fn.websearch_to_tsquery(SEARCH_CONFIG, text)
+    rank = fn.ts_rank_cd(SEARCH_VECTOR, tsquery)
+
+    matches = Article.select(
+        Article.id,
+        Article.source,
+        Article.url,
+        Article.title,
+        Article.content,
+        Article.date,
+        Article.archived,
+        rank.alias("rank"),
+    ).where(Expression(SEARCH_VECTOR, "@@", tsquery))
+    if start is not None:
+        matches = matches.where(Article.date >= start)
+    if end is not None:
+        matches = matches.where(Article.date <= end)
+    if source is not None:
+        matches = matches.where(Article.source == source)
+    top = matches.order_by(SQL("rank").desc(), Article.date.desc()).limit(limit).offset(offset).alias("top")
+
+    return top.select_from(
+        top.c.id,
+        top.c.source,
+        top.c.url,
+        top.c.date,
+        top.c.archived,
+        top.c.rank,
+        fn.ts_headline(SEARCH_CONFIG, top.c.title, tsquery, TITLE_HEADLINE_OPTIONS).alias("title"),
+        fn.ts_headline(SEARCH_CONFIG, top.c.content, tsquery, HEADLINE_OPTIONS).alias("headline"),
+    ).order_by(SQL("rank").desc(), top.c.date.desc())
+
+
+def search_articles(
+    text: str,
+    start: datetime.date | None = None,
+    end: datetime.date | None = None,
+    source: str | None = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> list:
+    """
+    Searches the articles for ``text``, which may use web search syntax
+    (``"quoted phrases"``, ``or``, ``-excluded``), optionally only among those
+    dated from ``start`` to ``end`` (inclusive) or from ``source``.
+
+    Returns up to ``limit`` results, best first, each with the article's
+    ``id``, ``source``, ``url``, ``date``, whether it is ``archived``, its
+    ``rank``, its ``title`` with the matches marked up, and a marked-up
+    ``headline`` from its content (from cold storage, for archived articles).
+    """
+    results = list(search_query(text, start, end, source, limit, offset).namedtuples())
+    archived = [result.id for result in results if result.archived]
+    if not archived:
+        return results
+
+    headlines = archived_headlines(text, archived)
+    return [result._replace(headline=headlines.get(result.id, "")) if result.archived else result for result in results]
+
+
+def archived_headlines(text: str, article_ids: list[int]) -> dict[int, str]:
+    """
+    Returns the marked-up headlines of the archived articles ``article_ids``
+    for a search for ``text``, by article id, highlighting their content
+    brought back from cold storage
+    """
+    contents = {
+        article_id: decompress(content)
+        for article_id, content in ArticleArchive.select(ArticleArchive.article_id, ArticleArchive.content)
+        .where(ArticleArchive.article_id.in_(article_ids))
+        .tuples()
+    }
+    if not contents:
+        return {}
+
+    ids = list(contents)
+    cursor = Article._meta.database.execute_sql(
+        "SELECT ts_headline(%s, content, websearch_to_tsquery(%s, %s), %s) "
+        "FROM unnest(%s::text[]) WITH ORDINALITY AS archived(content, n) ORDER BY n",
+        (SEARCH_CONFIG, SEARCH_CONFIG, text, HEADLINE_OPTIONS, [contents[article_id] for article_id in ids]),
+    )
+    return {article_id: headline for article_id, (headline,) in zip(ids, cursor.fetchall(), strict=True)}
@@ -15,6 +15,7 @@ import pandas as pd
 import requests
 from fake_useragent import UserAgent
 
+from app.core import http_client
 from app.core.utilities import timezone
 
 ua = UserAgent(
@@ -61,7 +62,7 @@ class FXDataProcessor:
             api_url = "https://www.boz.zm/jsonapi/node/historical_average_exchange_rate?sort=-created&page[limit]=1"
             headers = {"User-Agent": ua.chrome}
             logger.info("Fetching latest file metadata...")
-            meta_resp = requests.get(api_url, headers=headers, timeout=30)
+            meta_resp = http_client.get(api_url, headers=headers, timeout=30)
             meta_resp.raise_for_status()
             meta_data = meta_resp.json()
 
@@ -72,7 +73,7 @@ class FXDataProcessor:
 
             # 2. Fetch file URL using the node_id
             file_meta_url = f"https://www.boz.zm/jsonapi/node/historical_average_exchange_rate/{node_id}/field_average_historical_file"
-            file_meta_resp = requests.get(file_meta_url, headers=headers, timeout=30)
+            file_meta_resp = http_client.get(file_meta_url, headers=headers, timeout=30)
             file_meta_resp.raise_for_status()
             file_meta_data = file_meta_resp.json()
 
@@ -84,7 +85,7 @@ class FXDataProcessor:
 
             # 3. Download the actual Spreadsheet
             logger.info(f"Downloading FX data from {download_url}...")
-            response = requests.get(download_url, headers=headers, timeout=30)
+            response = http_client.get(download_url, headers=headers, timeout=30)
             response.raise_for_status()
 
             # Save raw file for backup
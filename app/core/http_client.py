@@ -0,0 +1,334 @@
+"""
+Shared HTTP client for everything that talks to the web.
+
+All scrapers go through the pooled sessions defined here, so that TCP/TLS
+connections (and the Cloudflare clearance obtained by cloudscraper) are reused
+across requests instead of being set up afresh for every article. Failed
+requests are retried with jittered backoff, and hosts that keep failing are
+short-circuited (see ``app.core.circuit_breaker``). The sessions' exchanges
+can also be recorded to, or replayed from, an archive (see ``app.core.recording``).
+"""
+
+import atexit
+import json
+import logging
+import random
+import threading
+import time
+from http import HTTPStatus
+from urllib.parse import urlparse, urlunparse
+
+import cloudscraper
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.request import ACCEPT_ENCODING
+
+from app.core import recording
+from app.core.cache import DiskCache
+from app.core.circuit_breaker import CLOSED, CircuitBreaker
+from app.core.utilities import (
+    CIRCUIT_BREAKER_COOLDOWN,
+    CIRCUIT_BREAKER_THRESHOLD,
+    FETCH_BACKOFF_BASE,
+    FETCH_BACKOFF_MAX,
+    FETCH_MAX_BYTES,
+    FETCH_PER_HOST_LIMIT,
+    FETCH_RETRIES,
+    HOST_HEALTH_FILE,
+    HTTP_CACHE_DIR,
+    HTTP_CACHE_ENABLED,
+    HTTP_CACHE_MAX_BYTES,
+    HTTP_CACHE_TTL,
+    HTTP_RECORD,
+    HTTP_REPLAY,
+    host_of,
+    today_iso_fmt,
+)
+
+logger = logging.getLogger(__name__)
+
+# (connect, read) timeouts in seconds, used unless a caller asks otherwise
+DEFAULT_TIMEOUT = (10, 30)
+# timeouts for the probe request sent to a host that was failing
+PROBE_TIMEOUT = (5, 10)
+
+# responses that are worth retrying, and that count against the host's health
+RETRY_STATUSES = frozenset(
+    {
+        HTTPStatus.TOO_MANY_REQUESTS,
+        HTTPStatus.INTERNAL_SERVER_ERROR,
+        HTTPStatus.BAD_GATEWAY,
+        HTTPStatus.SERVICE_UNAVAILABLE,
+        HTTPStatus.GATEWAY_TIMEOUT,
+        # Cloudflare: origin unreachable or timing out
+        *range(520, 525),
+    }
+)
+
+# number of hosts to keep connection pools for, and connections kept per host
+POOL_CONNECTIONS = 16
+POOL_MAXSIZE = max(FETCH_PER_HOST_LIMIT, 10)
+
+# article pages are read in chunks of this many bytes
+CHUNK_SIZE = 64 * 1024
+# content types that article pages may be served as (a missing Content-Type is let through)
+PAGE_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+
+class UnexpectedContentTypeError(requests.RequestException):
+    """The server responded with something other than an HTML page"""
+
+
+class PageTooLargeError(requests.RequestException):
+    """The page is larger than we are willing to download"""
+
+
+_lock = threading.Lock()
+_session: requests.Session | None = None
+_scraper: cloudscraper.CloudScraper | None = None
+# archive the sessions record to or replay from, if any (see use_archive)
+_archive: recording.HttpArchive | None = None
+_archive_mode: str | None = None
+
+# published articles don't change, so their pages are kept across runs
+page_cache = DiskCache(HTTP_CACHE_DIR, max_bytes=HTTP_CACHE_MAX_BYTES, ttl=HTTP_CACHE_TTL)
+
+# host health is kept across runs, see save_host_health()
+breaker = CircuitBreaker(HOST_HEALTH_FILE, threshold=CIRCUIT_BREAKER_THRESHOLD, cooldown=CIRCUIT_BREAKER_COOLDOWN)
+
+
+def _create_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    # urllib3 advertises br/zstd only when the brotli/zstandard packages are installed
+    session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    if _archive is not None:
+        recording.install(session, _archive, _archive_mode)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Returns the shared, keep-alive session"""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = _create_session()
+        return _session
+
+
+def get_scraper() -> cloudscraper.CloudScraper:
+    """
+    Returns the shared cloudscraper session, so that the Cloudflare challenge is
+    only solved once per run rather than once per article
+    """
+    global _scraper
+    with _lock:
+        if _scraper is None:
+            _scraper = cloudscraper.create_scraper(browser="chrome")
+            if _archive is not None:
+                recording.install(_scraper, _archive, _archive_mode)
+        return _scraper
+
+
+def use_archive(archive: recording.HttpArchive | None, mode: str = recording.REPLAY):
+    """
+    Records every exchange of the shared sessions to ``archive`` (if ``mode`` is
+    ``recording.RECORD``), or serves them from it instead of the network (if
+    ``mode`` is ``recording.REPLAY``). Pass None to go back to the network.
+    """
+    global _archive, _archive_mode
+    close()
+    with _lock:
+        _archive, _archive_mode = archive, mode
+
+
+def backoff(attempt: int) -> float:
+    """Returns how long to wait before retry number ``attempt`` (from 0): exponential, with full jitter"""
+    return random.uniform(0, min(FETCH_BACKOFF_MAX, FETCH_BACKOFF_BASE * 2**attempt))
+
+
+def get(
+    url: str, *, scraper: bool = False, timeout=DEFAULT_TIMEOUT, retries: int = FETCH_RETRIES, **kwargs
+) -> requests.Response:
+    """
+    Sends a GET request through the shared session (or the cloudscraper session
+    if ``scraper`` is set), with a default timeout.
+
+    Connection errors, timeouts and the responses in ``RETRY_STATUSES`` are
+    retried up to ``retries`` times, and count against the host's circuit
+    breaker. Requests to a host whose circuit is open raise
+    ``CircuitOpenError`` without touching the network.
+    """
+    session = get_scraper() if scraper else get_session()
+    host = host_of(url)
+
+    attempt = 0
+    while True:
+        probe = breaker.before_request(host)
+        try:
+            response = session.get(url, timeout=PROBE_TIMEOUT if probe else timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as err:
+            breaker.record_failure(host)
+            # a failed probe, or a failure that opened the circuit, isn't retried
+            if probe or attempt >= retries or breaker.state(host) != CLOSED:
+                raise
+            logger.debug(f"Retrying {url} after {err!r}")
+        except Exception:
+            breaker.release(host)
+            raise
+        else:
+            if response.status_code not in RETRY_STATUSES:
+                breaker.record_success(host)
+                return response
+            breaker.record_failure(host)
+            if probe or attempt >= retries or breaker.state(host) != CLOSED:
+                return response
+            logger.debug(f"Retrying {url} after HTTP {response.status_code}")
+            response.close()
+
+        time.sleep(backoff(attempt))
+        attempt += 1
+
+
+def strip_query(url: str) -> str:
+    """Returns the URL without its query string (tracking parameters and the like)"""
+    return urlunparse(urlparse(url)._replace(query=""))
+
+
+def cache_key(url: str) -> str:
+    """
+    Normalizes a URL for use as a cache key: the scheme and host are
+    lower-cased and the fragment is dropped. The query string is kept, since
+    fetchers strip it (see ``strip_query``) for sources where it doesn't
+    identify the article.
+    """
+    parsed = urlparse(url)
+    return urlunparse(parsed._replace(scheme=parsed.scheme.lower(), netloc=parsed.netloc.lower(), fragment=""))
+
+
+def _serialize(response: requests.Response) -> bytes:
+    meta = {
+        "status": response.status_code,
+        "encoding": response.encoding,
+        "headers": {k: v for k, v in response.headers.items() if k.lower() == "content-type"},
+    }
+    return json.dumps(meta).encode() + b"\n" + response.content
+
+
+def _deserialize(url: str, data: bytes) -> requests.Response:
+    meta, _, content = data.partition(b"\n")
+    meta = json.loads(meta)
+    response = requests.Response()
+    response.url = url
+    response.status_code = meta["status"]
+    response.encoding = meta["encoding"]
+    response.headers = CaseInsensitiveDict(meta["headers"])
+    response._content = content
+    return response
+
+
+def _read_body(response: requests.Response, max_bytes: int) -> bytes:
+    """
+    Reads a streamed response body in chunks, and raises ``PageTooLargeError``
+    once more than ``max_bytes`` have been read
+    """
+    body = bytearray()
+    for chunk in response.iter_content(CHUNK_SIZE):
+        body += chunk
+        if len(body) > max_bytes:
+            raise PageTooLargeError(f"{response.url} is larger than {max_bytes} bytes", response=response)
+    return bytes(body)
+
+
+def _download_page(url: str, scraper: bool, max_bytes: int, **kwargs) -> requests.Response:
+    """
+    Streams an article page, checking its content type and size before and
+    while reading it.
+    """
+    response = get(url, scraper=scraper, stream=True, **kwargs)
+    complete = False
+    try:
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type and content_type not in PAGE_CONTENT_TYPES:
+            raise UnexpectedContentTypeError(f"{url} is {content_type}, not an HTML page", response=response)
+
+        content_length = response.headers.get("Content-Length", "")
+        if content_length.isdigit() and int(content_length) > max_bytes:
+            raise PageTooLargeError(f"{url} is {content_length} bytes, more than {max_bytes}", response=response)
+
+        response._content = _read_body(response, max_bytes)
+        response._content_consumed = True
+        complete = True
+    finally:
+        # A connection with part of a body still unread can't be reused, so it
+        # is dropped; otherwise it goes back to the pool
+        if not complete:
+            response.raw.close()
+        response.close()
+    return response
+
+
+def fetch_page(
+    url: str,
+    *,
+    scraper: bool = False,
+    max_bytes: int = FETCH_MAX_BYTES,
+    **kwargs,
+) -> requests.Response:
+    """
+    Fetches an article page, serving it from the on-disk page cache when it
+    was downloaded on an earlier run. Only successful responses are cached.
+
+    The page is streamed: responses that aren't HTML raise
+    ``UnexpectedContentTypeError``, and pages over ``max_bytes`` raise
+    ``PageTooLargeError``.
+    """
+    key = cache_key(url)
+    if HTTP_CACHE_ENABLED and (cached := page_cache.get(key)) is not None:
+        logger.debug(f"Serving {url} from the page cache")
+        return _deserialize(url, cached)
+
+    response = _download_page(url, scraper, max_bytes, **kwargs)
+
+    if HTTP_CACHE_ENABLED and response.status_code == HTTPStatus.OK:
+        try:
+            page_cache.set(key, _serialize(response))
+        except OSError as err:
+            logger.warning(f"Failed to cache {url}: {err}")
+
+    return response
+
+
+def _use_archive_from_environment():
+    if HTTP_REPLAY:
+        archive = recording.HttpArchive.load(HTTP_REPLAY)
+        logger.info(
+            f"Replaying HTTP exchanges from {HTTP_REPLAY} (recorded on {archive.meta.get('date', 'an unknown date')})"
+        )
+        use_archive(archive, recording.REPLAY)
+    elif HTTP_RECORD:
+        logger.info(f"Recording HTTP exchanges to {HTTP_RECORD}")
+        archive = recording.HttpArchive({"date": today_iso_fmt})
+        use_archive(archive, recording.RECORD)
+        atexit.register(archive.save, HTTP_RECORD)
+
+
+def save_host_health():
+    """Persists the health of the hosts fetched from, for the next run"""
+    breaker.save()
+
+
+def close():
+    """Closes the shared sessions and their connection pools"""
+    global _session, _scraper
+    with _lock:
+        for session in (_session, _scraper):
+            if session is not None:
+                session.close()
+        _session = _scraper = None
+
+
+_use_archive_from_environment()
@@ -0,0 +1,76 @@
+"""
+A cache of model responses, shared by every LLM call of the pipeline.
+
+A response is stored under the model, the parameters of the call and the
+SHA-256 of its prompt, so that re-running the pipeline (after a late-stage
+failure, say, or while working on a later step) gets the responses to
+unchanged prompts back instantly, instead of paying for every call again.
+Only complete, non-empty responses are kept (a response cut off midway, a
+stream that broke, say, is returned but not stored), and they expire after
+``LLM_CACHE_TTL``.
+
+``LLM_CACHE=0`` bypasses the cache: every call goes to the model, and
+nothing is stored.
+"""
+
+import hashlib
+import json
+import logging
+from collections.abc import Callable
+from typing import Any
+
+from app.core.cache import DiskCache
+from app.core.utilities import LLM_CACHE_DIR, LLM_CACHE_ENABLED, LLM_CACHE_MAX_BYTES, LLM_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+response_cache = DiskCache(LLM_CACHE_DIR, max_bytes=LLM_CACHE_MAX_BYTES, ttl=LLM_CACHE_TTL)
+
+
+class ModelResponse(str):
+    """
+    A model's response, with the reason it ended: ``finish_reason`` is "stop"
+    for a complete response, and None for one that was cut off
+    """
+
+    finish_reason: str | None
+
+    def __new__(cls, text: str, finish_reason: str | None):
+        response = super().__new__(cls, text)
+        response.finish_reason = finish_reason
+        return response
+
+
+def response_key(model: str, prompt: Any, **params) -> str:
+    """
+    Identifies a model call by its model, parameters and prompt (a string,
+    or the messages of a chat completion)
+    """
+    prompt_hash = hashlib.sha256(json.dumps(prompt, sort_keys=True).encode()).hexdigest()
+    return json.dumps([model, params, prompt_hash], sort_keys=True, default=str)
+
+
+def cached_response(generate: Callable[[], str], model: str, prompt: Any, **params) -> str:
+    """
+    Returns the response cached for this call, or calls ``generate`` for it
+    (and caches the response, unless it is empty, or a ``ModelResponse`` that
+    did not end with finish_reason "stop"; a plain string, from an API that
+    gives no finish reason, counts as complete)
+    """
+    if not LLM_CACHE_ENABLED:
+        return generate()
+
+    key = response_key(model, prompt, **params)
+    if (cached := response_cache.get(key)) is not None:
+        logger.info(f"Reusing the cached response of {model} to an unchanged prompt")
+        return cached.decode()
+
+    response = generate()
+    if (finish_reason := getattr(response, "finish_reason", "stop")) != "stop":
+        logger.warning(f"Not caching the response of {model}, which ended with finish_reason={finish_reason}")
+    elif response and response.strip():
+        try:
+            response_cache.set(key, response.encode())
+        except OSError as err:
+            logger.warning(f"Failed to cache the response of {model}: {err}")
+    return response
@@ -0,0 +1,98 @@
+"""
+Near-duplicate clustering of the fetched articles.
+
+The same story is often carried by several outlets, usually rewritten only
+lightly from the same press release. Articles are compared by the word
+shingles of their text: each gets a MinHash signature, and locality-sensitive
+hashing (banding the signatures) finds the pairs worth comparing, so the
+whole set is clustered in roughly linear time rather than pair by pair.
+"""
+
+import hashlib
+import re
+
+import numpy as np
+
+# words per shingle
+SHINGLE_SIZE = 3
+
+# MinHash permutations, split into LSH bands of BAND_ROWS rows each: pairs that
+# agree on a whole band become candidates (likely from a similarity of ~0.4 up)
+NUM_PERM = 128
+BAND_ROWS = 4
+
+# estimated Jaccard similarity from which candidates count as the same story
+SIMILARITY_THRESHOLD = 0.5
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# fixed, so that the same articles always cluster the same way
+_rng = np.random.default_rng(2718)
+_A = _rng.integers(1, _MAX_HASH, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, _MAX_HASH, NUM_PERM, dtype=np.uint64)
+
+_WORD = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set[str]:
+    """Returns the lower-cased word ``size``-grams of a text (the whole text, if it is shorter)"""
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash(features: set[str]) -> np.ndarray:
+    """Returns the MinHash signature of a (non-empty) set of shingles"""
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(f.encode(), digest_size=4).digest()) for f in features),
+        dtype=np.uint64,
+        count=len(features),
+    )
+    # (a * x + b) mod p can't overflow: a, b and x are all below 2**32
+    return (((np.outer(hashes, _A) + _B) % _MERSENNE_PRIME) & _MAX_HASH).min(axis=0)
+
+
+def _find(parents: list[int], i: int) -> int:
+    while parents[i] != i:
+        parents[i] = parents[parents[i]]
+        i = parents[i]
+    return i
+
+
+def cluster_articles(articles: list[dict[str, str]], threshold: float = SIMILARITY_THRESHOLD) -> list[list[int]]:
+    """
+    Groups near-duplicate articles, by the similarity of their titles and content.
+
+    Returns the clusters as lists of indices into ``articles``, in the order
+    of their first article. Each cluster starts with its representative, the
+    article with the longest content; articles without any text are never
+    grouped.
+    """
+    signatures = {}
+    for i, article in enumerate(articles):
+        if features := shingles(f"{article['title']} {article['content']}"):
+            signatures[i] = minhash(features)
+
+    buckets: dict[tuple[int, bytes], list[int]] = {}
+    for i, signature in signatures.items():
+        for band in range(0, NUM_PERM, BAND_ROWS):
+            buckets.setdefault((band, signature[band : band + BAND_ROWS].tobytes()), []).append(i)
+
+    parents = list(range(len(articles)))
+    for members in buckets.values():
+        for n, i in enumerate(members):
+            for j in members[n + 1 :]:
+                a, b = _find(parents, i), _find(parents, j)
+                if a != b and np.mean(signatures[i] == signatures[j]) >= threshold:
+                    parents[max(a, b)] = min(a, b)
+
+    clusters: dict[int, list[int]] = {}
+    for i in range(len(articles)):
+        clusters.setdefault(_find(parents, i), []).append(i)
+
+    return [
+        sorted(members, key=lambda i: (-len(articles[i]["content"]), i))
+        for members in sorted(clusters.values(), key=lambda members: members[0])
+    ]
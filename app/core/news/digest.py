@@ -1,33 +1,151 @@
 import logging
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
+from app.core.llm_cache import ModelResponse, cached_response
+from app.core.news.clustering import cluster_articles
+from app.core.news.prompt import Prompt, Story, build_prompt, count_tokens, group_stories
 from app.core.summarization.backends.together import client
-from app.core.utilities import DATA_DIR, today_human_readable, today_iso_fmt
+from app.core.utilities import (
+    DATA_DIR,
+    DIGEST_MAP_GROUP_TOKENS,
+    DIGEST_MAP_MAX_WORKERS,
+    DIGEST_MAP_REDUCE,
+    DIGEST_TOKEN_BUDGET,
+    human_readable,
+    today_iso_fmt,
+)
 
 logger = logging.getLogger(__name__)
 
+# The digest model's context window, in tokens: the prompt and the response must fit in it together
+MODEL_CONTEXT_TOKENS = 262144
+
+# The digest prompt; {digest_content} is replaced with the numbered article excerpts
+DIGEST_PROMPT = """
+    You are a patriotic Zambian news editor with a watchdog streak, creating a daily news digest in Markdown for your fellow citizens. You love this country enough to hold it to a high standard — professional and engaging, but with sharp critical scrutiny: question motives, call out spin/gaps/contradictions in the reporting itself, and press on accountability wherever officials or institutions are involved.
+
+    <sections>
+    - ## Main Stories
+    - ## Other Notable Stories
+    - ## Key Takeaways & Watchpoints
+    </sections>
+
+    <requirements>
+    - Adopt a patriotic but critical perspective. Explain not just WHAT happened, but WHY it matters for Zambia and its people — and don't let claims (especially from officials/institutions) pass unexamined. If the input contains a promise, statistic, or defence without evidence, flag it as such (e.g., "unverified", "no timeline given", "contradicts earlier statements"). Use inclusive language ('our nation', 'we') without slipping into cheerleading.
+    - Where appropriate, and only for less serious topics, inject dry, pointed, quintessentially Zambian wit — the kind that lands a jab, not just a chuckle. Keep it clever and subtle. Avoid humour on sensitive topics like crime, accidents, or political tensions.
+    - Start with a single introductory paragraph (2–3 factual sentences) summarising the key themes of the day from a national perspective, with a critical edge where warranted. No heading.
+    - After the paragraph, output exactly the three sections above, in that order. No extra text before/after.
+        - Main Stories: ordered list of the most significant national stories. Select stories that have the widest impact, such as national policy changes, major legal cases, economic trends, or issues directly affecting daily life for Zambians (e.g., energy, public services). Do NOT limit the number of stories.
+      For each item, use exactly this layout:
+      1. Title
+         1–2 factual sentences with concrete details taken ONLY from the input, framed to highlight relevance to Zambians AND any gaps, spin, or unanswered questions worth noting.
+    - Do NOT include “Why this matters:” or any similar editorial labels; the relevance and scrutiny should be woven into the summary itself.
+    - Other Notable Stories: group by bold category labels (e.g., **Governance & Justice:**) with * bullets. Only include items where at least one concrete detail (name, number, date, place) is present in the input.
+    - Key Takeaways & Watchpoints: 2–3 concise, forward-looking watchpoints that are fact-based (no speculation), relevant to national interests, and where relevant name what should be watched to hold someone accountable (e.g., a deadline, a promised report, a follow-up vote).
+    - No markdown links or HTML. Plain text only.
+    - Exclude any item that has only a headline with no supporting details in the input.
+    - An item marked "also reported by" was carried by several outlets; treat it as one story, and mention the corroboration only where it adds weight.
+    - Maintain a factual basis. Do not infer beyond the provided input, but frame the facts to be relevant to a Zambian audience — critical framing must stay grounded in what's actually in the input, not invented suspicion.
+    </requirements>
+
+    <input>
+    {digest_content}
+    </input>
+    """
+
+
+# The prompt of the map step of a map-reduce digest; {digest_content} is replaced with a group of numbered excerpts
+MAP_PROMPT = """
+    You are a Zambian news editor preparing notes for the daily news digest, which will be written from the notes of every group of stories.
+
+    <requirements>
+    - For each story below, in the same order, output its number and title as given (e.g. "3. Title"), keeping any "(source: ...; also reported by: ...)" credit, and then 2–4 factual sentences with the concrete details (names, numbers, dates, places) taken ONLY from the input.
+    - Note any promise, statistic or defence given without evidence, any missing timeline, and any contradiction within the input.
+    - Skip any story that has only a headline with no supporting details in the input.
+    - No headings, introduction or conclusion. No markdown links or HTML. Plain text only.
+    </requirements>
+
+    <input>
+    {digest_content}
+    </input>
+    """
+
+# Tokens the notes on a group of stories may take up
+MAP_MAX_TOKENS = 4096
+
+
+# The cleaning rules, compiled once. clean_digest_output applies them line by line, in a single pass (see
+# _clean_lines), and falls back to applying them one after the other, over the whole text, where one would reach
+# across a line break.
+_THINK_TAGS = re.compile(r"<think>.*?</think>", re.DOTALL)
+_TITLE_HEADING = re.compile(r"^# .*\n?", re.MULTILINE)
+_UNSPACED_HEADING = re.compile(r"^(#{1,6})([^\s#])", re.MULTILINE)
+_MARKDOWN_LINK = re.compile(r"\[([^\]]+)\]\([^\)]+\)")
+# The variants of each section heading, in the order of _CANONICAL_SECTIONS
+_SECTION_HEADING = re.compile(
+    r"^#+\s*(?:(Overview.*)|(Key Stories.*|Today'?s Top 8 Stories.*|Main Stories.*)|(Other Notable.*)"
+    r"|(Key Takeaways.*|Takeaways.*|Watch.*))$",
+    re.IGNORECASE | re.MULTILINE,
+)
+_CANONICAL_SECTIONS = (
+    "## Overview",
+    "## Main Stories",
+    "## Other Notable Stories",
+    "## Key Takeaways & Watchpoints",
+)
+_HTML_BREAK = re.compile(r"\s*<\s*br\s*/?\s*>\s*", re.IGNORECASE)
+_WHY_THIS_MATTERS = (
+    re.compile(r"^\*\*?\s*Why this matters:\s*\*\*?\s*", re.IGNORECASE | re.MULTILINE),
+    re.compile(r"^Why this matters:\s*", re.IGNORECASE | re.MULTILINE),
+)
+_OVERVIEW_SECTION = re.compile(r"^##\s*Overview\s*\n(?:.*?)(?=^##\s|\Z)", re.MULTILINE | re.DOTALL)
+_OVERVIEW_HEADING = re.compile(r"##\s*Overview\s*")
+_SECTION_START = re.compile(r"##\s")
+# The first characters of the lines the heading, label and bullet rules apply to
+_MARKERS = frozenset("#*-Ww")
+_EXTRA_NEWLINES = re.compile(r"\n{3,}")
+_BULLET = re.compile(r"^[\*\-]\s+", re.MULTILINE)
+
+# A line break left open at the end of a line, and a line (a bare heading, bullet or label) that a rule would join to
+# the next
+_OPEN_BREAK = re.compile(r"<\s*(?:br\s*/?\s*)?$", re.IGNORECASE)
+_JOINED_LINE = re.compile(
+    r"#+\s*|[\*\-]\s*|\*\*?\s*(?:Why this matters:\s*(?:\*\*?\s*)?)?|Why this matters:\s*", re.IGNORECASE
+)
+
 
 def remove_think_tags(text: str) -> str:
     """Remove <think> tags if present (safety fallback; Kimi returns reasoning separately)"""
-    return re.sub(r"<think>.*?</think>", "", text, flags=re.DOTALL)
+    return _THINK_TAGS.sub("", text)
 
 
 def fix_markdown_headings(text: str) -> str:
     """Fix markdown headings that might be missing spaces after hash characters"""
-    return re.sub(r"^(#{1,6})([^\s#])", r"\1 \2", text, flags=re.MULTILINE)
+    return _UNSPACED_HEADING.sub(r"\1 \2", text)
 
 
 def remove_title_headings(text: str) -> str:
     """Remove title-level headings (single # at start of line) from text"""
-    return re.sub(r"^# .*\n?", "", text, flags=re.MULTILINE)
+    return _TITLE_HEADING.sub("", text)
 
 
 def clean_digest_output(text: str) -> str:
     """Clean and standardize the digest output"""
     # Remove think tags
-    text = remove_think_tags(text)
+    if "<think>" in text:
+        text = remove_think_tags(text)
 
+    try:
+        text = _clean_lines(text)
+    except _AcrossLines:
+        text = _clean_passes(text)
+    return text.strip()
+
+
+def _clean_passes(text: str) -> str:
+    """Applies the cleaning rules one after the other, each to the whole text"""
     # Remove title-level headings
     text = remove_title_headings(text)
 
@@ -50,31 +168,138 @@ def clean_digest_output(text: str) -> str:
     text = remove_overview_section(text)
 
     # Remove excessive newlines
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _EXTRA_NEWLINES.sub("\n\n", text)
 
     # Ensure consistent bullet point formatting
-    text = re.sub(r"^[\*\-]\s+", "* ", text, flags=re.MULTILINE)
+    return _BULLET.sub("* ", text)
 
-    return text.strip()
+
+class _AcrossLines(Exception):
+    """A cleaning rule would reach across a line break, which only _clean_passes gets right"""
+
+
+def _clean_lines(text: str) -> str:
+    """
+    Applies the cleaning rules in a single pass over the lines of the text,
+    each line going through them in the same order as in _clean_passes
+    """
+    cleaned: list[str] = []
+    for line in _drop_overview(_split_lines(text)):
+        if line[:1] in ("*", "-"):
+            line = _BULLET.sub("* ", line)
+        # runs of blank lines are collapsed to one
+        if line or (cleaned and cleaned[-1]):
+            cleaned.append(line)
+    return "\n".join(cleaned)
+
+
+def _split_lines(text: str):
+    """Yields the lines of the text, with headings, links, line breaks and labels cleaned"""
+    lines = text.split("\n")
+    # after a line break at the end of a line, the whitespace up to the next text goes with it
+    joining = False
+    for i, line in enumerate(lines):
+        if ("[" in line or "<" in line) and _split_across_lines(line):
+            raise _AcrossLines
+        if not joining and line[:1] not in _MARKERS and not ("<" in line or "](" in line or "&lt;br" in line):
+            yield line
+            continue
+
+        line = _clean_heading(line, last=i == len(lines) - 1)
+        if line is None:
+            continue
+        carried = joining
+        if carried:
+            if not line or line.isspace():
+                continue
+            line = line.lstrip()
+        parts, joining = _split_breaks(line, carried)
+        yield from map(_clean_label, parts)
+    if joining:
+        raise _AcrossLines
+
+
+def _split_across_lines(line: str) -> bool:
+    """Whether a link or line break of the line carries on to the next line"""
+    return line.rfind("[") > line.rfind("]") or line.rfind("](") > line.rfind(")") or bool(_OPEN_BREAK.search(line))
+
+
+def _clean_heading(line: str, last: bool) -> str | None:
+    """
+    Applies the rules that come before the line breaks' (headings and links)
+    to a line; returns None if the line is removed
+    """
+    if line.startswith("# "):
+        # the last line leaves its line break behind
+        return "" if last else None
+    if line.startswith("#"):
+        line = _UNSPACED_HEADING.sub(r"\1 \2", line)
+    if "](" in line:
+        line = _MARKDOWN_LINK.sub(r"\1", line)
+    if line.startswith("#"):
+        if _JOINED_LINE.fullmatch(line):
+            raise _AcrossLines
+        if match := _SECTION_HEADING.match(line):
+            line = _CANONICAL_SECTIONS[match.lastindex - 1]
+    return line
+
+
+def _split_breaks(line: str, carried: bool) -> tuple[list[str], bool]:
+    """
+    Splits a line at its line breaks; and tells whether it ends with one
+    (``carried`` tells whether the line follows one)
+    """
+    parts, joining = [line], False
+    if "<" in line:
+        parts = _HTML_BREAK.split(line)
+        if len(parts) > 1 and not parts[0] and not carried:
+            raise _AcrossLines
+        if len(parts) > 1 and not parts[-1]:
+            parts.pop()
+            joining = True
+    if "&lt;br" in line:
+        parts = [piece for part in parts for piece in remove_html_breaks(part).split("\n")]
+    return parts, joining
+
+
+def _clean_label(line: str) -> str:
+    """Removes the 'Why this matters:' label of a line"""
+    if line[:1] in _MARKERS and _JOINED_LINE.fullmatch(line):
+        raise _AcrossLines
+    if line[:1] in ("*", "W", "w"):
+        cleaned = remove_why_this_matters(line)
+        # an emptied line loses its newline to the label's trailing \s* over the whole text
+        if (line and not cleaned) or (cleaned[:1] in ("*", "-", "#") and _JOINED_LINE.fullmatch(cleaned)):
+            raise _AcrossLines
+        line = cleaned
+    return line
+
+
+def _drop_overview(lines):
+    """Yields the lines but for those of an Overview section (from its heading to the next heading)"""
+    overview, heading = False, None
+    for line in lines:
+        heading = None
+        if overview and not _SECTION_START.match(line):
+            continue
+        overview = line.startswith("##") and _OVERVIEW_HEADING.fullmatch(line) is not None
+        if overview:
+            heading = line
+            continue
+        yield line
+    # a heading with nothing after it is not an Overview section
+    if heading is not None:
+        yield heading
 
 
 def normalize_section_headings(text: str) -> str:
     """Normalize headings to a canonical set used by the front-end."""
-    replacements: dict[str, str] = {
-        r"^#+\s*Overview.*$": "## Overview",
-        # Map variants of the main stories heading to a single canonical label
-        r"^#+\s*(Key Stories.*|Today'?s Top 8 Stories.*|Main Stories.*)$": "## Main Stories",
-        r"^#+\s*(Other Notable.*)$": "## Other Notable Stories",
-        r"^#+\s*(Key Takeaways.*|Takeaways.*|Watch.*)$": "## Key Takeaways & Watchpoints",
-    }
-    for pattern, replacement in replacements.items():
-        text = re.sub(pattern, replacement, text, flags=re.IGNORECASE | re.MULTILINE)
-    return text
+    return _SECTION_HEADING.sub(lambda match: _CANONICAL_SECTIONS[match.lastindex - 1], text)
 
 
 def strip_markdown_links(text: str) -> str:
     """Convert [text](url) or [text](#) to plain text."""
-    return re.sub(r"\[([^\]]+)\]\([^\)]+\)", r"\1", text)
+    return _MARKDOWN_LINK.sub(r"\1", text)
 
 
 def standardize_key_story_title_breaks(text: str) -> str:
@@ -88,7 +313,7 @@ def standardize_key_story_title_breaks(text: str) -> str:
 def remove_html_breaks(text: str) -> str:
     """Remove literal HTML line breaks that would render as text in Markdown parser with html=False."""
     # Remove common variants of <br>
-    text = re.sub(r"\s*<\s*br\s*/?\s*>\s*", "\n", text, flags=re.IGNORECASE)
+    text = _HTML_BREAK.sub("\n", text)
     if "&lt;br" in text:
         text = text.replace("&lt;br&gt;", "\n").replace("&lt;br/&gt;", "\n")
     return text
@@ -97,36 +322,110 @@ def remove_html_breaks(text: str) -> str:
 def remove_why_this_matters(text: str) -> str:
     """Remove the leading 'Why this matters:' label if present on lines."""
     # Remove bolded or plain variants
-    text = re.sub(r"^\*\*?\s*Why this matters:\s*\*\*?\s*", "", text, flags=re.IGNORECASE | re.MULTILINE)
-    text = re.sub(r"^Why this matters:\s*", "", text, flags=re.IGNORECASE | re.MULTILINE)
+    for pattern in _WHY_THIS_MATTERS:
+        text = pattern.sub("", text)
     return text
 
 
 def remove_overview_section(text: str) -> str:
     """Remove the '## Overview' section entirely (until the next heading)."""
-    pattern = r"^##\s*Overview\s*\n(?:.*?)(?=^##\s|\Z)"
-    return re.sub(pattern, "", text, flags=re.MULTILINE | re.DOTALL)
+    return _OVERVIEW_SECTION.sub("", text)
 
 
-def _collect_stream_content(stream) -> str:
+def _collect_stream_content(stream) -> ModelResponse:
+    """
+    Returns the content of a streamed response, with the reason it ended
+    (None if the stream broke off before the end)
+    """
     import httpx
 
     content = ""
+    finish_reason = None
     try:
         for chunk in stream:
             if chunk.choices:
                 delta = chunk.choices[0].delta
                 if hasattr(delta, "content") and delta.content:
                     content += delta.content
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
     except (httpx.RemoteProtocolError, GeneratorExit) as e:
         logger.error(f"Stream interrupted mid-response ({type(e).__name__}): {e}")
         if not content:
             raise
-    return content
+        finish_reason = None
+    return ModelResponse(content, finish_reason)
+
+
+def _generate_digest(prompt: str, model: str, temperature: float, max_tokens: int) -> str:
+    """
+    Sends the digest prompt to the model, and returns its (streamed) response;
+    the complete response to an unchanged prompt is reused (see app.core.llm_cache)
+    """
+    messages = [
+        {
+            "role": "system",
+            "content": "You are Kimi, an AI assistant created by Moonshot AI.",
+        },
+        {
+            "role": "user",
+            "content": prompt,
+        },
+    ]
+    params = {"temperature": temperature, "top_p": 0.95, "max_tokens": max_tokens, "reasoning": {"enabled": False}}
+
+    def generate() -> ModelResponse:
+        stream = client.chat.completions.create(model=model, messages=messages, **params, stream=True)
+        return _collect_stream_content(stream)
+
+    return cached_response(generate, model, messages, **params)
+
+
+def _source_name(source: str) -> str:
+    return source.replace("Zambia National Broadcasting Corporation (ZNBC)", "ZNBC")
+
+
+def _summarize_group(prompt: Prompt, model: str, temperature: float) -> str:
+    """
+    Returns the model's notes on a group of stories (cached, like any
+    response); if it produces none, the group's excerpts are passed on as
+    they are
+    """
+    try:
+        notes = remove_think_tags(_generate_digest(prompt.text, model, temperature, MAP_MAX_TOKENS)).strip()
+    except Exception as err:
+        logger.error(f"Failed to summarise a group of {len(prompt.stories)} stories: {err!r}")
+        notes = ""
+    if not notes:
+        logger.warning(f"Passing the excerpts of {len(prompt.stories)} stories on without notes")
+        return prompt.content.strip()
+    return notes
+
+
+def _map_reduce_prompt(stories: list[Story], model: str, temperature: float) -> Prompt:
+    """
+    The map step of a map-reduce digest: summarises the stories a group at a
+    time (each group a single source's), the groups concurrently, and returns
+    the prompt to write the digest from their notes
+    """
+    group_budget = DIGEST_MAP_GROUP_TOKENS - count_tokens(MAP_PROMPT.format(digest_content=""))
+    prompts = []
+    numbered = []
+    for group in group_stories(stories, group_budget):
+        prompt = build_prompt(MAP_PROMPT, [stories[i] for i in group], DIGEST_MAP_GROUP_TOKENS, first=len(numbered) + 1)
+        prompts.append(prompt)
+        numbered.extend(group[i] for i in prompt.stories)
+    logger.info(f"Summarising {len(stories)} stories in {len(prompts)} groups")
+
+    with ThreadPoolExecutor(max_workers=DIGEST_MAP_MAX_WORKERS, thread_name_prefix="digest-map") as executor:
+        notes = list(executor.map(lambda prompt: _summarize_group(prompt, model, temperature), prompts))
 
+    content = "".join(f"{group_notes}\n\n" for group_notes in notes)
+    text = DIGEST_PROMPT.format(digest_content=content)
+    return Prompt(text, content, numbered, count_tokens(text))
 
-def create_news_digest(news: list[dict[str, str]], dest: str):
-    """Create a news digest from the news articles using the provided summarization function"""
+
+def create_news_digest(news: list[dict[str, str]], dest: str, date: str | None = None):
+    """Create a news digest of the news articles of ``date`` (an ISO date, today by default)"""
 
     if not news:
         logger.info("No news to create digest from.")
@@ -135,106 +434,67 @@ def create_news_digest(news: list[dict[str, str]], dest: str):
     articles_by_source: dict[str, list[dict[str, str]]] = {}
 
     for article in news:
-        source = article["source"].replace("Zambia National Broadcasting Corporation (ZNBC)", "ZNBC")
+        source = _source_name(article["source"])
 
         if source not in articles_by_source:
             articles_by_source[source] = []
 
         articles_by_source[source].append(article)
 
-    # Create structured content for the digest
-    # Note: Feed the model original article texts (clipped) to reduce compounding summarization
-    digest_content = ""
-    counter = 0
-    article_summaries = []
-
-    for source in articles_by_source:
-        for article in articles_by_source[source]:
-            title = article["title"]
-            text = article["content"]
-
-            # For the model input, prefer original article content to avoid layered summarization
-            original_excerpt = text.strip()
-            # Clip very long articles to keep prompt within token limits
-            max_length = 2200
-            if len(original_excerpt) > max_length:
-                original_excerpt = original_excerpt[:max_length].rstrip() + "…"
-
-            counter += 1
-
-            article_summaries.append(
-                {
-                    "id": counter,
-                    "title": title,
-                    "source": source,
-                    "url": article["url"],
-                    "category": article.get("category"),
-                }
-            )
-
-            digest_content += f"{counter}. {title} (source: {source})\n"
-            digest_content += f"{original_excerpt}\n\n"
+    articles = [article for source in articles_by_source for article in articles_by_source[source]]
 
-    # Write the raw content to a file for reference
-    metadata = f"Title: Zed News Digest\nDate: {today_human_readable}\n\n"
-    with open(f"{DATA_DIR}/{today_iso_fmt}_news_headlines.txt", "w") as f:
-        f.write(metadata + "News Items:\n\n" + digest_content)
+    # The same story carried by several outlets goes into the prompt once, credited to all of them
+    clusters = cluster_articles(articles)
+    logger.info(f"{len(articles)} articles, {len(clusters)} distinct stories")
 
     model = "moonshotai/Kimi-K2.6"
     temperature = 0.6  # instant mode
     max_tokens = 16384
 
-    prompt = f"""
-    You are a patriotic Zambian news editor with a watchdog streak, creating a daily news digest in Markdown for your fellow citizens. You love this country enough to hold it to a high standard — professional and engaging, but with sharp critical scrutiny: question motives, call out spin/gaps/contradictions in the reporting itself, and press on accountability wherever officials or institutions are involved.
-
-    <sections>
-    - ## Main Stories
-    - ## Other Notable Stories
-    - ## Key Takeaways & Watchpoints
-    </sections>
-
-    <requirements>
-    - Adopt a patriotic but critical perspective. Explain not just WHAT happened, but WHY it matters for Zambia and its people — and don't let claims (especially from officials/institutions) pass unexamined. If the input contains a promise, statistic, or defence without evidence, flag it as such (e.g., "unverified", "no timeline given", "contradicts earlier statements"). Use inclusive language ('our nation', 'we') without slipping into cheerleading.
-    - Where appropriate, and only for less serious topics, inject dry, pointed, quintessentially Zambian wit — the kind that lands a jab, not just a chuckle. Keep it clever and subtle. Avoid humour on sensitive topics like crime, accidents, or political tensions.
-    - Start with a single introductory paragraph (2–3 factual sentences) summarising the key themes of the day from a national perspective, with a critical edge where warranted. No heading.
-    - After the paragraph, output exactly the three sections above, in that order. No extra text before/after.
-        - Main Stories: ordered list of the most significant national stories. Select stories that have the widest impact, such as national policy changes, major legal cases, economic trends, or issues directly affecting daily life for Zambians (e.g., energy, public services). Do NOT limit the number of stories.
-      For each item, use exactly this layout:
-      1. Title
-         1–2 factual sentences with concrete details taken ONLY from the input, framed to highlight relevance to Zambians AND any gaps, spin, or unanswered questions worth noting.
-    - Do NOT include “Why this matters:” or any similar editorial labels; the relevance and scrutiny should be woven into the summary itself.
-    - Other Notable Stories: group by bold category labels (e.g., **Governance & Justice:**) with * bullets. Only include items where at least one concrete detail (name, number, date, place) is present in the input.
-    - Key Takeaways & Watchpoints: 2–3 concise, forward-looking watchpoints that are fact-based (no speculation), relevant to national interests, and where relevant name what should be watched to hold someone accountable (e.g., a deadline, a promised report, a follow-up vote).
-    - No markdown links or HTML. Plain text only.
-    - Exclude any item that has only a headline with no supporting details in the input.
-    - Maintain a factual basis. Do not infer beyond the provided input, but frame the facts to be relevant to a Zambian audience — critical framing must stay grounded in what's actually in the input, not invented suspicion.
-    </requirements>
+    # Note: Feed the model original article texts (clipped) to reduce compounding summarization
+    positions: dict[str, int] = {}
+    stories = []
+    for cluster in clusters:
+        article = articles[cluster[0]]
+        source = _source_name(article["source"])
+        others = [
+            name for name in dict.fromkeys(_source_name(articles[i]["source"]) for i in cluster) if name != source
+        ]
+        # the sources list their articles newest first
+        position = positions[source] = positions.get(source, -1) + 1
+        stories.append(Story(article["title"], source, article["content"], others, len(cluster), position))
+
+    if DIGEST_MAP_REDUCE:
+        prompt = _map_reduce_prompt(stories, model, temperature)
+    else:
+        # The stories share a token budget, leaving room for the response
+        budget = min(DIGEST_TOKEN_BUDGET, MODEL_CONTEXT_TOKENS - max_tokens)
+        prompt = build_prompt(DIGEST_PROMPT, stories, budget)
+    logger.info(f"Digest prompt: {prompt.tokens} tokens, {len(prompt.stories)} of {len(stories)} stories")
+
+    # Stories left out of the prompt have no number
+    story_ids = {i: number for number, story in enumerate(prompt.stories, start=1) for i in clusters[story]}
+
+    # Every article is listed, under the number of the story it was part of
+    article_summaries = [
+        {
+            "id": story_ids.get(i),
+            "title": article["title"],
+            "source": _source_name(article["source"]),
+            "url": article["url"],
+            "category": article.get("category"),
+        }
+        for i, article in enumerate(articles)
+    ]
 
-    <input>
-    {digest_content}
-    </input>
-    """
+    # Write the raw content to a file for reference
+    date = date or today_iso_fmt
+    metadata = f"Title: Zed News Digest\nDate: {human_readable(date)}\n\n"
+    with open(f"{DATA_DIR}/{date}_news_headlines.txt", "w") as f:
+        f.write(metadata + "News Items:\n\n" + prompt.content)
 
-    stream = client.chat.completions.create(
-        model=model,
-        messages=[
-            {
-                "role": "system",
-                "content": "You are Kimi, an AI assistant created by Moonshot AI.",
-            },
-            {
-                "role": "user",
-                "content": prompt,
-            },
-        ],
-        temperature=temperature,
-        top_p=0.95,
-        max_tokens=max_tokens,
-        reasoning={"enabled": False},
-        stream=True,
-    )
-
-    generated_digest = _collect_stream_content(stream)
+    # The digest is only generated again if the prompt (or the model settings) changed since it was last generated
+    generated_digest = _generate_digest(prompt.text, model, temperature, max_tokens)
 
     if generated_digest := generated_digest.strip():
         # Clean the output
@@ -246,8 +506,8 @@ def create_news_digest(news: list[dict[str, str]], dest: str):
 
         logger.info(f"News digest created successfully: {dest}")
         return {
-            "date": today_iso_fmt,
-            "title": f"News Digest - {today_human_readable}",
+            "date": date,
+            "title": f"News Digest - {human_readable(date)}",
             "content": generated_digest,
             "articles": article_summaries,
             "total_articles": len(article_summaries),
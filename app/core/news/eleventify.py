@@ -7,21 +7,32 @@ import pytz
 from jinja2 import Environment, PackageLoader, select_autoescape
 from together import Together
 
-from app.core.utilities import DATA_DIR, today_human_readable, today_iso_fmt
+from app.core.llm_cache import ModelResponse, cached_response
+from app.core.utilities import DATA_DIR, human_readable, today_iso_fmt
 
 env = Environment(
     loader=PackageLoader("app", "core/news/template"),
     autoescape=select_autoescape(["html"]),
 )
 base_template = env.get_template("digest.njk.jinja")
-dist_file = f"app/web/_pages/news/{today_iso_fmt}.njk"
+
+
+def _dist_file(date: str) -> str:
+    return f"app/web/_pages/news/{date}.njk"
+
+
+def _digest_metadata_file(date: str) -> str:
+    return f"{DATA_DIR}/{date}/{date}_digest.json"
+
+
+dist_file = _dist_file(today_iso_fmt)
 
 TOGETHER_API_KEY = os.getenv("TOGETHER_API_KEY")
 DESCRIPTION_MODEL = "Qwen/Qwen3-235B-A22B-Instruct-2507-tput"
 
 client = Together(api_key=TOGETHER_API_KEY)
 
-digest_metadata_file = f"{DATA_DIR}/{today_iso_fmt}/{today_iso_fmt}_digest.json"
+digest_metadata_file = _digest_metadata_file(today_iso_fmt)
 
 logger = logging.getLogger(__name__)
 
@@ -48,22 +59,22 @@ def create_digest_description(content: str, date: str) -> str:
 Digest Content:
 {content}"""
 
-    try:
-        completion = client.chat.completions.create(
-            model=DESCRIPTION_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=150,
-            reasoning={"enabled": False},
-        )
+    messages = [{"role": "user", "content": prompt}]
+    params = {"max_tokens": 150, "reasoning": {"enabled": False}}
 
+    def generate() -> ModelResponse:
+        completion = client.chat.completions.create(model=DESCRIPTION_MODEL, messages=messages, **params)
         choice = completion.choices[0]
-        finish_reason = choice.finish_reason
         result = (choice.message.content or "").strip()
+        logger.info(f"finish_reason={choice.finish_reason} result={result!r}")
+        if not result:
+            logger.error(f"Digest description is empty (finish_reason={choice.finish_reason})")
+        return ModelResponse(result, choice.finish_reason)
 
-        logger.info(f"finish_reason={finish_reason} result={result!r}")
+    try:
+        result = cached_response(generate, DESCRIPTION_MODEL, messages, **params)
 
         if not result:
-            logger.error(f"Digest description is empty (finish_reason={finish_reason})")
             return fallback
 
         result = result.replace("```", "")
@@ -84,32 +95,35 @@ Digest Content:
         return fallback
 
 
-def get_digest_metadata() -> dict:
-    """Load the digest metadata from JSON file"""
+def get_digest_metadata(date: str | None = None) -> dict:
+    """Load the digest metadata of ``date`` (an ISO date, today by default) from JSON file"""
+    metadata_file = _digest_metadata_file(date) if date else digest_metadata_file
     try:
-        with open(digest_metadata_file, "r") as f:
+        with open(metadata_file, "r") as f:
             return json.load(f)
     except FileNotFoundError:
-        logger.error(f"Digest metadata file not found: {digest_metadata_file}")
+        logger.error(f"Digest metadata file not found: {metadata_file}")
         return {}
     except json.JSONDecodeError:
-        logger.error(f"Invalid JSON in digest metadata file: {digest_metadata_file}")
+        logger.error(f"Invalid JSON in digest metadata file: {metadata_file}")
         return {}
 
 
-def render_jinja_template():
-    """Render the Jinja template for a daily digest"""
+def render_jinja_template(date: str | None = None):
+    """Render the Jinja template for the daily digest of ``date`` (an ISO date, today by default)"""
     logger.info("Rendering Jinja template for daily digest...")
+    output_file = _dist_file(date) if date else dist_file
+    date = date or today_iso_fmt
 
     # Load digest metadata
-    digest_data = get_digest_metadata()
+    digest_data = get_digest_metadata(date)
 
     if not digest_data:
         logger.error("No digest metadata available, cannot render template")
         return
 
     # Create digest description
-    digest_description = create_digest_description(digest_data.get("content", ""), today_human_readable)
+    digest_description = create_digest_description(digest_data.get("content", ""), human_readable(date))
 
     # Prepare sources list and articles from digest data (no database query needed)
     sources = digest_data.get("sources", [])
@@ -118,18 +132,22 @@ def render_jinja_template():
     # Setup timezone
     utc_dt = datetime.now(timezone.utc) + timedelta(minutes=5)
     LSK = pytz.timezone("Africa/Lusaka")
+    published = utc_dt.astimezone(LSK)
+    # a digest rendered later (see app.core.backfill) is dated on its day, at the time of day it is rendered
+    day = datetime.fromisoformat(date)
+    published = published.replace(year=day.year, month=day.month, day=day.day)
 
     # Ensure output directory exists
-    os.makedirs(os.path.dirname(dist_file), exist_ok=True)
+    os.makedirs(os.path.dirname(output_file), exist_ok=True)
 
     # Render template
-    with open(dist_file, "w") as f:
+    with open(output_file, "w") as f:
         f.write(
             base_template.render(
                 {
-                    "title": today_human_readable,
+                    "title": human_readable(date),
                     "description": digest_description,
-                    "date": utc_dt.astimezone(LSK).isoformat(),
+                    "date": published.isoformat(),
                     "digest_content": digest_data.get("content", ""),
                     "total_articles": digest_data.get("total_articles", len(digest_articles)),
                     "num_sources": len(sources),
@@ -147,4 +165,4 @@ def render_jinja_template():
             ),
         )
 
-    logger.info(f"Daily digest template rendered successfully: {dist_file}")
+    logger.info(f"Daily digest template rendered successfully: {output_file}")
@@ -1,30 +1,133 @@
 import json
 import logging
+from typing import NamedTuple
 
-from app.core.db.models import Article
-from app.core.news.other import get_rss_feed_entries
-from app.core.news.znbc import get_news
+from peewee import EXCLUDED, Case, chunked
 
+from app.core import http_client
+from app.core.db.models import Article, ArticleArchive
+from app.core.db.partitions import is_partitioned
+from app.core.news.other import fetch_feeds, get_rss_feed_entries
+from app.core.news.znbc import Candidate, fetch_candidates, get_news
+from app.core.utilities import content_hash
 
-def get_latest_news():
-    """Fetches today's news from all sources"""
+# rows per INSERT, which keeps the statement's parameters within SQLite's limit of 999
+UPSERT_BATCH_SIZE = 100
+
+
+class UpsertCounts(NamedTuple):
+    inserted: int
+    updated: int
+    unchanged: int
+
+
+class Listings(NamedTuple):
+    """What the sources list, from which the news of any of the dates they cover can be fetched"""
+
+    candidates: list[Candidate]
+    feeds: list[dict | None]
+
+
+def fetch_listings() -> Listings:
+    """Fetches the ZNBC listing page and the feeds of the other sources, once for any number of dates"""
+    try:
+        candidates = fetch_candidates()
+    except Exception as err:
+        logging.error(f"Failed to fetch the ZNBC listing: {err}")
+        candidates = []
+    return Listings(candidates, fetch_feeds())
+
+
+def get_latest_news(date: str | None = None, listings: Listings | None = None):
+    """
+    Fetches the news published on ``date`` (an ISO date, today by default)
+    from all sources, using ``listings`` if they were already fetched (see
+    ``fetch_listings``)
+    """
 
     logging.info("Fetching news from ZNBC ...")
-    news = get_news()
+    news = get_news(date, listings and listings.candidates)
 
     logging.info("Fetching feeds from the other sources ...")
-    feeds = get_rss_feed_entries()
+    feeds = get_rss_feed_entries(date, listings and listings.feeds)
+
+    try:
+        http_client.save_host_health()
+    except OSError as err:
+        logging.error(f"Failed to save the host health: {err}")
 
     return feeds + news
 
 
-def save_news_to_db(news: list[dict[str, str]]):
-    """Saves the news to the database"""
+def save_news_to_db(news: list[dict[str, str]]) -> UpsertCounts:
+    """
+    Saves the news to the database, in batches and in a single transaction.
+
+    Articles are keyed by URL. One that is already stored with the same
+    content hash is left as it is; otherwise its source, title, content and
+    category are updated (its date and episode are kept, and so is its
+    summary unless the content changed), so saving the same news twice
+    doesn't duplicate it. An archived article whose content changed is stored
+    in the article table again, and its copy in cold storage is dropped. On a partitioned article table, the URL is only
+    unique per date, so an article is upserted under the date it is stored with.
+    """
 
     logging.info("Saving news to the database ...")
 
-    for item in news:
-        Article.create(**item)
+    # the last copy of an article wins, as it would if the rows were upserted one by one
+    rows = list({item["url"]: {**item, "content_hash": content_hash(item["content"])} for item in news}.values())
+    inserted = updated = unchanged = 0
+
+    partitioned = is_partitioned()
+    with Article._meta.database.atomic():
+        for batch in chunked(rows, UPSERT_BATCH_SIZE):
+            urls = [row["url"] for row in batch]
+            stored = {
+                url: (stored_hash, date, article_id, archived)
+                for url, stored_hash, date, article_id, archived in Article.select(
+                    Article.url, Article.content_hash, Article.date, Article.id, Article.archived
+                )
+                .where(Article.url.in_(urls))
+                .tuples()
+            }
+            changed = [row for row in batch if row["url"] not in stored or stored[row["url"]][0] != row["content_hash"]]
+            unchanged += len(batch) - len(changed)
+            if not changed:
+                continue
+            # an article keeps its date, which a partitioned table's unique index includes
+            for row in changed:
+                if row["url"] in stored:
+                    row["date"] = stored[row["url"]][1]
+
+            (
+                Article.insert_many(changed)
+                .on_conflict(
+                    conflict_target=[Article.url, Article.date] if partitioned else [Article.url],
+                    preserve=[
+                        Article.source,
+                        Article.title,
+                        Article.content,
+                        Article.category,
+                        Article.content_hash,
+                        # changed content is stored in the article table again, even if it had been archived
+                        Article.archived,
+                    ],
+                    update={
+                        Article.summary: Case(None, [(Article.content == EXCLUDED.content, Article.summary)], None)
+                    },
+                )
+                .execute()
+            )
+            # the cold storage copy of an archived article whose content is stored again is out of date
+            unarchived = [stored[row["url"]][2] for row in changed if row["url"] in stored and stored[row["url"]][3]]
+            if unarchived:
+                ArticleArchive.delete().where(ArticleArchive.article_id.in_(unarchived)).execute()
+            new = sum(row["url"] not in stored for row in changed)
+            inserted += new
+            updated += len(changed) - new
+
+    logging.info(f"Saved {len(rows)} articles ({inserted} new, {updated} updated, {unchanged} unchanged)")
+    return UpsertCounts(inserted, updated, unchanged)
 
 
 def save_news_to_file(news: list[dict[str, str]], dest: str):
@@ -1,16 +1,20 @@
+import json
 import logging
+import os
 import traceback
 from http import HTTPStatus
-from urllib.parse import urlparse, urlunparse
 
-import cloudscraper
 import dateutil.parser
 import feedparser
-import requests
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 from fake_useragent import UserAgent
 
-from app.core.utilities import today_iso_fmt
+from app.core import http_client
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.news.parsing import has_class, make_soup
+from app.core.news.scheduler import run_concurrently
+from app.core.news.sources import Source, SourceRegistry
+from app.core.utilities import DATA_DIR, host_of, today_iso_fmt
 
 logger = logging.getLogger(__name__)
 
@@ -18,13 +22,36 @@ ua = UserAgent(
     fallback="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/147.0.0.0 Safari/537.36",
 )
 
-URLs = [
-    "http://www.daily-mail.co.zm/feed/",
-    "https://diggers.news/rss/",
-    "https://www.muvitv.com/rss/",
-    "https://www.mwebantu.com/rss/",
-    "https://www.times.co.zm/?feed=rss2",
-]
+# ETag/Last-Modified validators and entries of each feed, from the previous run
+FEED_STATE_FILE = DATA_DIR / "feed_state.json"
+
+
+# Only the elements the extractors look at are parsed (see app.core.news.parsing)
+DAILY_MAIL_STRAINER = SoupStrainer(["article", "main"])
+TIMES_OF_ZAMBIA_STRAINER = SoupStrainer("div", class_=has_class("ts-contain"))
+MWEBANTU_STRAINER = SoupStrainer("article")
+MUVITV_STRAINER = SoupStrainer("article")
+DIGGERS_STRAINER = SoupStrainer("div", class_=has_class("article-text"))
+
+
+def extract_daily_mail_article(soup):
+    """
+    Extracts the article text from a parsed Zambia Daily Mail page
+    """
+    if article := soup.find("article"):
+        content_element = article.select_one("div.entry-content")
+        paragraphs = content_element.find_all("p")
+        content = "\n".join([p.get_text() for p in paragraphs])
+
+        return DAILY_MAIL.clean(content)
+    elif article := soup.find("main"):
+        content_elements = article.select("div.e-con-inner")
+        content_element = content_elements[-1]
+        paragraphs = content_element.find_all("p")
+        content = "\n".join([p.get_text() for p in paragraphs])
+
+        return DAILY_MAIL.clean(content)
+    return None
 
 
 def get_daily_mail_article_detail(url):
@@ -35,40 +62,33 @@ def get_daily_mail_article_detail(url):
         logger.error(f"{url} is not a Zambia Daily Mail URL")
         return None
     else:
-        parsed_url = urlparse(url)
         # Create a new URL without query parameters
-        new_url = urlunparse(parsed_url._replace(query=""))
+        new_url = http_client.strip_query(url)
 
-        response = requests.get(new_url, headers={"User-Agent": ua.chrome})
-        soup = BeautifulSoup(response.text, "html.parser")
-        if article := soup.find("article"):
-            content_element = article.select_one("div.entry-content")
-            paragraphs = content_element.find_all("p")
-            content = "\n".join([p.get_text() for p in paragraphs])
+        response = http_client.fetch_page(new_url, headers={"User-Agent": ua.chrome})
+        soup = make_soup(response.text, parse_only=DAILY_MAIL_STRAINER)
+        return extract_daily_mail_article(soup)
 
-            # Remove "CLICK TO READ MORE" from the content
-            content = content.replace("CLICK TO READ MORE", "...")
-            content = content.replace("https://enews.daily-mail.co.zm/welcome/home", "")
 
-            # remove Read more: eNews Daily Mail | Without Fear Or Favour (daily-mail.co.zm)
-            content = content.replace("Read more: eNews Daily Mail | Without Fear Or Favour (daily-mail.co.zm)", "")
+def extract_times_of_zambia_article(soup):
+    """
+    Extracts the article text from a parsed Times of Zambia page
+    """
+    article_content = soup.find("div", class_=has_class("ts-contain"))
 
-            return content
-        elif article := soup.find("main"):
-            content_elements = article.select("div.e-con-inner")
-            content_element = content_elements[-1]
-            paragraphs = content_element.find_all("p")
-            content = "\n".join([p.get_text() for p in paragraphs])
+    if not article_content:
+        logger.error("No article content found")
+        return None
 
-            # remove Read more: eNews Daily Mail | Without Fear Or Favour (daily-mail.co.zm)
-            content = content.replace("Read more: eNews Daily Mail | Without Fear Or Favour (daily-mail.co.zm)", "")
+    # Remove any 'Read more' links
+    for read_more in article_content.find_all("a", string="Read more"):
+        read_more.decompose()
 
-            # Remove "CLICK TO READ MORE" from the content
-            content = content.replace("CLICK TO READ MORE", "...")
-            content = content.replace("https://enews.daily-mail.co.zm/welcome/home", "")
+    # Extract text from paragraphs
+    paragraphs = article_content.find_all("p")
+    text_content = "\n".join(p.get_text() for p in paragraphs)
 
-            return content
-        return None
+    return text_content.strip()
 
 
 def get_times_of_zambia_article_detail(url):
@@ -79,28 +99,31 @@ def get_times_of_zambia_article_detail(url):
         logger.error(f"{url} is not a Times of Zambia URL")
         return None
     else:
-        response = requests.get(url, headers={"User-Agent": ua.chrome})
+        response = http_client.fetch_page(url, headers={"User-Agent": ua.chrome})
 
         if response.status_code != HTTPStatus.OK:
             logger.error(f"Failed to fetch the article from {url}")
             return None
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        article_content = soup.find("div", class_="ts-contain")
+        soup = make_soup(response.text, parse_only=TIMES_OF_ZAMBIA_STRAINER)
+        return extract_times_of_zambia_article(soup)
 
-        if not article_content:
-            logger.error("No article content found")
-            return None
 
-        # Remove any 'Read more' links
-        for read_more in article_content.find_all("a", string="Read more"):
-            read_more.decompose()
+def extract_mwebantu_article(soup):
+    """
+    Extracts the article text from a parsed Mwebantu page
+    """
+    article = soup.find("article")
+    content_element = article.select_one("div.m26-article-content") if article else None
+    if content_element:
+        paragraphs = content_element.find_all("p")
+        content_lines = [p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)]
 
-        # Extract text from paragraphs
-        paragraphs = article_content.find_all("p")
-        text_content = "\n".join(p.get_text() for p in paragraphs)
+        content = MWEBANTU.clean("\n".join(content_lines))
+    else:
+        content = None
 
-        return text_content.strip()
+    return content
 
 
 def get_mwebantu_article_detail(url):
@@ -111,28 +134,31 @@ def get_mwebantu_article_detail(url):
         logger.error(f"{url} is not a Mwebantu URL")
         return None
     else:
-        parsed_url = urlparse(url)
         # Create a new URL without query parameters
-        new_url = urlunparse(parsed_url._replace(query=""))
+        new_url = http_client.strip_query(url)
 
-        response = requests.get(new_url, headers={"User-Agent": ua.chrome})
-        soup = BeautifulSoup(response.text, "html.parser")
+        response = http_client.fetch_page(new_url, headers={"User-Agent": ua.chrome})
+        soup = make_soup(response.text, parse_only=MWEBANTU_STRAINER)
+        return extract_mwebantu_article(soup)
 
-        article = soup.find("article")
-        content_element = article.select_one("div.m26-article-content") if article else None
-        if content_element:
-            paragraphs = content_element.find_all("p")
 
-            # Remove "(Mwebantu ...)" from the content
-            content_lines = [p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)]
-            if content_lines and content_lines[-1].startswith("(Mwebantu, "):
-                content_lines.pop()
+def extract_muvitv_article(soup):
+    """
+    Extracts the article text from a parsed Muvi TV page
+    """
+    article = soup.find("article")
 
-            content = "\n".join(content_lines)
+    if article:
+        content_element = article.select_one("div.td-post-content")
+        if content_element:
+            paragraphs = content_element.find_all("p")
+            content = "\n".join([p.get_text(strip=True) for p in paragraphs])
         else:
             content = None
+    else:
+        content = None
 
-        return content
+    return content
 
 
 def get_muvitv_article_detail(url):
@@ -143,26 +169,28 @@ def get_muvitv_article_detail(url):
         logger.error(f"{url} is not a Muvi TV URL")
         return None
     else:
-        parsed_url = urlparse(url)
         # Create a new URL without query parameters
-        new_url = urlunparse(parsed_url._replace(query=""))
+        new_url = http_client.strip_query(url)
 
-        response = requests.get(new_url, headers={"User-Agent": ua.chrome})
-        soup = BeautifulSoup(response.text, "html.parser")
+        response = http_client.fetch_page(new_url, headers={"User-Agent": ua.chrome})
+        soup = make_soup(response.text, parse_only=MUVITV_STRAINER)
+        return extract_muvitv_article(soup)
 
-        article = soup.find("article")
 
-        if article:
-            content_element = article.select_one("div.td-post-content")
-            if content_element:
-                paragraphs = content_element.find_all("p")
-                content = "\n".join([p.get_text(strip=True) for p in paragraphs])
-            else:
-                content = None
-        else:
-            content = None
+def extract_diggers_article(soup):
+    """
+    Extracts the article text from a parsed Diggers News page
+    """
+    article = soup.select_one("div.article-text")
+
+    if article:
+        paragraphs = article.find_all("p")
 
-        return content
+        content = "\n".join([p.get_text(strip=True) for p in paragraphs])
+    else:
+        content = None
+
+    return content
 
 
 def get_diggers_article_detail(url):
@@ -176,108 +204,212 @@ def get_diggers_article_detail(url):
         logger.error(f"{url} points to a cartoon image. Skipping.")
         return None
     else:
-        parsed_url = urlparse(url)
         # Create a new URL without query parameters
-        new_url = urlunparse(parsed_url._replace(query=""))
-
-        scraper = cloudscraper.create_scraper(browser="chrome")
-        response = scraper.get(new_url)
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        article = soup.select_one("div.article-text")
+        new_url = http_client.strip_query(url)
+
+        response = http_client.fetch_page(new_url, scraper=True)
+        soup = make_soup(response.text, parse_only=DIGGERS_STRAINER)
+        return extract_diggers_article(soup)
+
+
+DAILY_MAIL = Source(
+    host="daily-mail.co.zm",
+    name="Zambia Daily Mail",
+    feed_url="http://www.daily-mail.co.zm/feed/",
+    extractor=get_daily_mail_article_detail,
+    cleanup=(
+        # Remove "CLICK TO READ MORE" from the content
+        ("CLICK TO READ MORE", "..."),
+        ("https://enews.daily-mail.co.zm/welcome/home", ""),
+        # remove Read more: eNews Daily Mail | Without Fear Or Favour (daily-mail.co.zm)
+        ("Read more: eNews Daily Mail | Without Fear Or Favour (daily-mail.co.zm)", ""),
+    ),
+)
 
-        if article:
-            paragraphs = article.find_all("p")
+MWEBANTU = Source(
+    host="mwebantu.com",
+    name="Mwebantu",
+    feed_url="https://www.mwebantu.com/rss/",
+    extractor=get_mwebantu_article_detail,
+    # Remove "(Mwebantu, <date>)" from the content
+    trailers=("(Mwebantu, ",),
+)
 
-            content = "\n".join([p.get_text(strip=True) for p in paragraphs])
-        else:
-            content = None
+SOURCES = SourceRegistry(
+    [
+        DAILY_MAIL,
+        Source(
+            host="diggers.news",
+            name="News Diggers!",
+            feed_url="https://diggers.news/rss/",
+            extractor=get_diggers_article_detail,
+            # Behind Cloudflare, and fetched through a single shared cloudscraper session
+            max_concurrency=2,
+            min_interval=0.5,
+        ),
+        Source(
+            host="muvitv.com",
+            name="MUVI Television",
+            feed_url="https://www.muvitv.com/rss/",
+            extractor=get_muvitv_article_detail,
+        ),
+        MWEBANTU,
+        Source(
+            host="times.co.zm",
+            name="Times of Zambia",
+            feed_url="https://www.times.co.zm/?feed=rss2",
+            extractor=get_times_of_zambia_article_detail,
+        ),
+    ]
+)
 
-        return content
+URLs = SOURCES.feed_urls()
 
 
 def get_description(url):
     """
     Fetches the article detail from a URL
     """
-    if "daily-mail.co.zm" in url:
-        return get_daily_mail_article_detail(url)
-    if "times.co.zm" in url:
-        return get_times_of_zambia_article_detail(url)
-    elif "mwebantu.com" in url:
-        return get_mwebantu_article_detail(url)
-    elif "muvitv.com" in url:
-        return get_muvitv_article_detail(url)
-    elif "diggers.news" in url:
-        return get_diggers_article_detail(url)
-    else:
-        return None
+    if source := SOURCES.lookup(url):
+        return source.extractor(url)
+    return None
 
 
 def get_feed_title(url):
     """
     Fetches the feed title from a URL
     """
-    if "daily-mail.co.zm" in url:
-        return "Zambia Daily Mail"
-    if "times.co.zm" in url:
-        return "Times of Zambia"
-    elif "mwebantu.com" in url:
-        return "Mwebantu"
-    elif "muvitv.com" in url:
-        return "MUVI Television"
-    elif "diggers.news" in url:
-        return "News Diggers!"
-    else:
+    if source := SOURCES.lookup(url):
+        return source.name
+    return None
+
+
+def _fetch_entry(entry):
+    """
+    Fetches the article content for a feed entry and builds the news item,
+    or returns None if the content can't be fetched.
+    """
+    try:
+        content = get_description(entry["link"])
+    except CircuitOpenError as err:
+        logger.warning(f"Skipping {entry['link']}: {err}")
+        return None
+    except Exception:
+        logger.error(f"Failed to fetch article content for {entry['link']}\n{traceback.format_exc()}")
+        return None
+
+    if not content:
         return None
 
+    return {
+        "source": get_feed_title(entry["link"]),
+        "url": entry["link"],
+        "title": entry["title"],
+        "content": content,
+        "category": "",
+    }
+
+
+def _load_feed_state() -> dict:
+    """Loads the ETag/Last-Modified validators and entries stored for each feed"""
+    try:
+        with open(FEED_STATE_FILE) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
 
-def get_rss_feed_entries():
+def _save_feed_state(state: dict):
+    """Persists the feed state, replacing the previous file atomically"""
+    FEED_STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = FEED_STATE_FILE.with_suffix(".tmp")
+    with open(tmp_file, "w") as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_file, FEED_STATE_FILE)
+
+
+def _fetch_feed(url, previous):
+    """
+    Fetches a feed with a conditional GET, based on the validators from the
+    previous run. If the feed hasn't changed (HTTP 304), the entries stored on
+    the previous run are reused instead of downloading and parsing it again.
     """
-    Parses URLs and fetches today's feeds
+    headers = {"User-Agent": ua.chrome, "Cache-Control": "max-age=0"}
+    if previous.get("etag"):
+        headers["If-None-Match"] = previous["etag"]
+    if previous.get("modified"):
+        headers["If-Modified-Since"] = previous["modified"]
+
+    response = http_client.get(url, headers=headers)
+
+    if response.status_code == HTTPStatus.NOT_MODIFIED:
+        logger.info(f"{url} has not changed since the last run, reusing its stored entries")
+        return previous
+
+    response.raise_for_status()
+    feed = feedparser.parse(response.content, response_headers=dict(response.headers))
+
+    return {
+        "etag": response.headers.get("ETag"),
+        "modified": response.headers.get("Last-Modified"),
+        "entries": [
+            {"link": i["link"], "title": i.get("title", ""), "published": i.get("published")}
+            for i in feed.entries
+            if i.get("link")
+        ],
+    }
+
+
+def fetch_feeds() -> list[dict | None]:
+    """
+    Fetches the feeds at URLs concurrently, and returns them in that order
+    (None for those that failed), persisting their state for the next run
+    """
+    state = _load_feed_state()
+    feeds = run_concurrently(URLs, lambda url: _fetch_feed(url, state.get(url, {})), host=host_of)
+
+    for url, feed in zip(URLs, feeds, strict=True):
+        if feed is not None:
+            state[url] = feed
+    try:
+        _save_feed_state(state)
+    except OSError:
+        logger.error(f"Failed to save the feed state\n{traceback.format_exc()}")
+
+    return feeds
+
+
+def get_rss_feed_entries(date: str | None = None, feeds: list[dict | None] | None = None):
+    """
+    Parses URLs and fetches the feed entries published on ``date`` (an ISO
+    date, today by default), from ``feeds`` if they were already fetched
 
     Each entry is fetched independently so that a single source failing (e.g. a
     site changing its HTML) doesn't discard articles already fetched from the
-    other sources.
+    other sources. Feeds, and then article pages, are fetched concurrently, with
+    a cap on the number of parallel requests per host and a global deadline.
     """
 
-    try:
-        feeds = [
-            feedparser.parse(
-                url,
-                request_headers={"User-Agent": ua.chrome, "Cache-Control": "max-age=0"},
-            )
-            for url in URLs
-        ]
-        feed = [item for feed in feeds for item in feed.entries]
-    except Exception:
-        logger.error(traceback.format_exc())
-        return []
-
-    entries = []
-    for i in feed:
-        if not i.get("published"):
-            continue
-        if dateutil.parser.parse(i["published"]).date().isoformat() != today_iso_fmt:
-            continue
-
-        try:
-            content = get_description(i["link"])
-        except Exception:
-            logger.error(f"Failed to fetch article content for {i['link']}\n{traceback.format_exc()}")
-            continue
-
-        if not content:
-            continue
-
-        entries.append(
-            {
-                "source": get_feed_title(i["link"]),
-                "url": i["link"],
-                "title": i["title"],
-                "content": content,
-                "category": "",
-            }
-        )
-
-    return entries
+    date = date or today_iso_fmt
+    if feeds is None:
+        feeds = fetch_feeds()
+
+    todays_entries = [
+        i
+        for feed in feeds
+        if feed
+        for i in feed.get("entries", [])
+        if i.get("published") and dateutil.parser.parse(i["published"]).date().isoformat() == date
+    ]
+
+    # Only entries from a known source are fetched, within that source's limits
+    todays_entries = [i for i in todays_entries if SOURCES.lookup(i["link"])]
+    entries = run_concurrently(
+        todays_entries,
+        _fetch_entry,
+        host=lambda entry: host_of(entry["link"]),
+        per_host_limit=SOURCES.max_concurrency,
+        min_interval=SOURCES.min_interval,
+    )
+
+    return [entry for entry in entries if entry]
@@ -0,0 +1,44 @@
+"""
+HTML parsing for the article extractors.
+
+The extractors only ever look at one container element per page, so pages are
+parsed with a ``SoupStrainer`` that only builds a tree for that container,
+using lxml when it is installed and Python's built-in parser otherwise.
+"""
+
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from app.core.utilities import HTML_PARSER
+
+try:
+    import lxml  # noqa: F401
+except ImportError:
+    lxml = None
+
+
+def default_parser() -> str:
+    """Returns the parser backend to use: $HTML_PARSER if set, else lxml if installed, else html.parser"""
+    if HTML_PARSER:
+        return HTML_PARSER
+    return "lxml" if lxml else "html.parser"
+
+
+def has_class(name: str) -> re.Pattern:
+    """
+    Matches a class attribute containing ``name`` among its classes.
+
+    SoupStrainer sees the raw attribute value while parsing, before it is split
+    into a list, so ``class_="x"`` would only match elements whose class is
+    exactly "x".
+    """
+    return re.compile(rf"(?:^|\s){re.escape(name)}(?:\s|$)")
+
+
+def make_soup(markup: str | bytes, parse_only: SoupStrainer | None = None, parser: str | None = None) -> BeautifulSoup:
+    """
+    Parses markup with the configured backend. If ``parse_only`` is given, only
+    the elements it matches (and their descendants) end up in the tree.
+    """
+    return BeautifulSoup(markup, parser or default_parser(), parse_only=parse_only)
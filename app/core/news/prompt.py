@@ -0,0 +1,200 @@
+"""
+Token-budgeted assembly of the digest prompt.
+
+Rather than clipping every article to the same length, the stories of the
+day share a budget of tokens, counted with a BPE tokenizer: on a light day
+each story is sent (up to ``MAX_EXCERPT_TOKENS``) as it is, and on a busy
+day the excerpts shrink, the stories that matter most keeping the most.
+
+A story matters more the more outlets carried it, the more articles were
+grouped into it, and the more recent it is (sources list their articles
+newest first). If even the shortest excerpts don't fit, stories are left
+out, taking them in turn from each source (its least important first), so
+that no source crowds the others out.
+"""
+
+import functools
+import logging
+import math
+from typing import NamedTuple
+
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+# A BPE encoding close to the digest model's own (which isn't published in a form tiktoken can load)
+TOKENIZER_ENCODING = "o200k_base"
+
+# Characters per token, to estimate counts if the encoding can't be loaded (it is downloaded on first use)
+CHARS_PER_TOKEN = 4
+
+# Bounds of a story's excerpt
+MAX_EXCERPT_TOKENS = 600
+MIN_EXCERPT_TOKENS = 60
+
+# Weights of the priority of a story
+SOURCE_WEIGHT = 1.0  # per outlet beyond the first
+ARTICLE_WEIGHT = 0.25  # per article beyond one per outlet
+RECENCY_WEIGHT = 1.0  # for the newest article of its source, falling off with its position
+
+
+class Story(NamedTuple):
+    """A story for the digest: its representative article, and how widely it was reported"""
+
+    title: str
+    source: str
+    text: str
+    # the other outlets that reported it
+    others: list[str]
+    # the number of articles grouped into it
+    articles: int
+    # its position among its source's articles, newest first
+    position: int
+
+    @property
+    def priority(self) -> float:
+        outlets = 1 + len(self.others)
+        return (
+            SOURCE_WEIGHT * (outlets - 1)
+            + ARTICLE_WEIGHT * (self.articles - outlets)
+            + RECENCY_WEIGHT / (1 + self.position)
+            + 1
+        )
+
+    def heading(self, number: int) -> str:
+        also_reported = f"; also reported by: {', '.join(self.others)}" if self.others else ""
+        return f"{number}. {self.title} (source: {self.source}{also_reported})\n"
+
+
+class Prompt(NamedTuple):
+    text: str
+    # what went into the template: the numbered stories and their excerpts
+    content: str
+    # the indices of the stories included, in the order they are numbered
+    stories: list[int]
+    tokens: int
+
+
+@functools.cache
+def _encoding():
+    try:
+        return tiktoken.get_encoding(TOKENIZER_ENCODING)
+    except Exception as err:
+        logger.warning(f"Failed to load the {TOKENIZER_ENCODING} encoding, estimating token counts instead: {err}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Returns the number of tokens in ``text``"""
+    if encoding := _encoding():
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_tokens(text: str, tokens: int) -> str:
+    """Returns ``text``, clipped to its first ``tokens`` tokens (and marked as such, if it was)"""
+    if encoding := _encoding():
+        encoded = encoding.encode(text, disallowed_special=())
+        if len(encoded) <= tokens:
+            return text
+        return encoding.decode(encoded[:tokens]).rstrip() + "…"
+    if len(text) <= tokens * CHARS_PER_TOKEN:
+        return text
+    return text[: tokens * CHARS_PER_TOKEN].rstrip() + "…"
+
+
+def _allocate(wants: list[int], weights: list[float], budget: int) -> list[int]:
+    """
+    Shares ``budget`` out in proportion to ``weights``, without giving anyone
+    more than they want: finds the largest ``level`` for which giving each
+    ``min(want, max(MIN_EXCERPT_TOKENS, level * weight))`` fits
+    """
+
+    def allocation(level: float) -> list[int]:
+        return [
+            min(want, max(MIN_EXCERPT_TOKENS, int(level * weight))) for want, weight in zip(wants, weights, strict=True)
+        ]
+
+    if sum(wants) <= budget:
+        return wants
+    low, high = 0.0, max(want / weight for want, weight in zip(wants, weights, strict=True))
+    for _ in range(40):
+        middle = (low + high) / 2
+        if sum(allocation(middle)) <= budget:
+            low = middle
+        else:
+            high = middle
+    return allocation(low)
+
+
+def _keep_order(stories: list[Story]) -> list[int]:
+    """
+    Returns the indices of the stories, from the last to leave out to the
+    first: each source's most important story, then each one's second, ...
+    """
+    by_source: dict[str, list[int]] = {}
+    for i in sorted(range(len(stories)), key=lambda i: -stories[i].priority):
+        by_source.setdefault(stories[i].source, []).append(i)
+    rank = {i: n for indices in by_source.values() for n, i in enumerate(indices)}
+    return sorted(range(len(stories)), key=lambda i: (rank[i], -stories[i].priority))
+
+
+def build_prompt(template: str, stories: list[Story], budget: int, first: int = 1) -> Prompt:
+    """
+    Fills ``template``'s ``{digest_content}`` with the stories, numbered from
+    ``first``, their excerpts sized so that the whole prompt stays within
+    ``budget`` tokens (as far as the template itself allows)
+    """
+    texts = [story.text.strip() for story in stories]
+    wants = [min(count_tokens(text), MAX_EXCERPT_TOKENS) for text in texts]
+    # (numbered as if all were kept: the numbers hardly vary in length)
+    headings = [count_tokens(story.heading(i)) + 2 for i, story in enumerate(stories, start=first)]
+    available = budget - count_tokens(template.format(digest_content=""))
+
+    keep = _keep_order(stories)
+    while keep:
+        # the stories kept, in their original order
+        kept = sorted(keep)
+        excerpt_budget = available - sum(headings[i] for i in kept)
+        needed = sum(min(wants[i], MIN_EXCERPT_TOKENS) for i in kept)
+        if needed <= excerpt_budget:
+            break
+        keep.pop()
+    else:
+        kept = []
+        excerpt_budget = available
+
+    if len(kept) < len(stories):
+        logger.warning(
+            f"Left {len(stories) - len(kept)} of {len(stories)} stories out of the prompt, to fit its budget"
+        )
+
+    allocated = _allocate([wants[i] for i in kept], [stories[i].priority for i in kept], max(excerpt_budget, 0))
+    parts = [
+        story.heading(number) + f"{truncate_tokens(texts[i], tokens)}\n\n"
+        for number, (i, tokens) in enumerate(zip(kept, allocated, strict=True), start=first)
+        for story in [stories[i]]
+    ]
+    content = "".join(parts)
+    text = template.format(digest_content=content)
+    return Prompt(text, content, kept, count_tokens(text))
+
+
+def group_stories(stories: list[Story], budget: int) -> list[list[int]]:
+    """
+    Splits the stories into groups of a single source's, each taking up at
+    most ``budget`` tokens with its excerpts whole (but for a story that is
+    too long on its own), and returns their indices, in order of the groups'
+    first story
+    """
+    groups: list[list[int]] = []
+    current: dict[str, tuple[list[int], int]] = {}
+    for i, story in enumerate(stories):
+        tokens = count_tokens(story.heading(i + 1)) + min(count_tokens(story.text.strip()), MAX_EXCERPT_TOKENS) + 2
+        group, size = current.get(story.source, (None, 0))
+        if group is None or size + tokens > budget:
+            group, size = [], 0
+            groups.append(group)
+        group.append(i)
+        current[story.source] = (group, size + tokens)
+    return groups
@@ -0,0 +1,115 @@
+"""
+Bounded-concurrency scheduling for the fetch stage.
+
+Article pages are fetched on a thread pool, with a cap on how many requests
+may be in flight against any one host and a global deadline after which
+unfinished work is abandoned.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor, wait
+from itertools import zip_longest
+from typing import TypeVar
+
+from app.core.utilities import FETCH_DEADLINE, FETCH_MAX_WORKERS, FETCH_PER_HOST_LIMIT
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class _HostThrottle:
+    """Caps the number of concurrent calls against a host, and spaces them at least ``min_interval`` seconds apart"""
+
+    def __init__(self, limit: int, min_interval: float):
+        self.semaphore = threading.BoundedSemaphore(max(1, limit))
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait_turn(self):
+        """Blocks until the next call is allowed to start, given the minimum interval"""
+        if not self.min_interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.min_interval
+        time.sleep(start - now)
+
+
+def _interleave_by_host(items: Sequence[T], host: Callable[[T], str]) -> list[int]:
+    """
+    Returns the item indices in round-robin order across hosts, so that the
+    pool works on every host at once instead of queueing up behind the
+    per-host cap of whichever host comes first.
+    """
+    queues: dict[str, list[int]] = {}
+    for index, item in enumerate(items):
+        queues.setdefault(host(item), []).append(index)
+    return [index for group in zip_longest(*queues.values()) for index in group if index is not None]
+
+
+def run_concurrently(
+    items: Sequence[T],
+    fn: Callable[[T], R],
+    host: Callable[[T], str],
+    max_workers: int = FETCH_MAX_WORKERS,
+    per_host_limit: int | Callable[[str], int] = FETCH_PER_HOST_LIMIT,
+    min_interval: float | Callable[[str], float] = 0.0,
+    deadline: float = FETCH_DEADLINE,
+) -> list[R | None]:
+    """
+    Calls ``fn`` on every item concurrently and returns the results in input order.
+
+    At most ``per_host_limit`` calls run against the same host (as given by
+    ``host(item)``) at any time, and calls to a host start at least
+    ``min_interval`` seconds apart. Both may be given per host, as functions
+    of the host name. Items that raise, or that haven't completed within
+    ``deadline`` seconds, yield ``None`` so that one failing or slow source
+    doesn't hold up the rest.
+    """
+    if not items:
+        return []
+
+    limit_for = per_host_limit if callable(per_host_limit) else lambda _: per_host_limit
+    interval_for = min_interval if callable(min_interval) else lambda _: min_interval
+
+    deadline_at = time.monotonic() + deadline
+    throttles = {h: _HostThrottle(limit_for(h), interval_for(h)) for h in {host(item) for item in items}}
+
+    def worker(item: T) -> R | None:
+        throttle = throttles[host(item)]
+        with throttle.semaphore:
+            throttle.wait_turn()
+            # Work that only got its turn after the deadline is skipped
+            if time.monotonic() >= deadline_at:
+                return None
+            return fn(item)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items))))
+    try:
+        futures: list = [None] * len(items)
+        for index in _interleave_by_host(items, host):
+            futures[index] = executor.submit(worker, items[index])
+        _, not_done = wait(futures, timeout=max(0.0, deadline_at - time.monotonic()))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if not_done:
+        logger.warning(f"Fetch deadline of {deadline}s exceeded, abandoning {len(not_done)} of {len(items)} items")
+
+    results: list[R | None] = []
+    for item, future in zip(items, futures, strict=True):
+        if future in not_done:
+            results.append(None)
+        elif error := future.exception():
+            logger.error(f"Unhandled error while processing {item!r}: {error!r}")
+            results.append(None)
+        else:
+            results.append(future.result())
+    return results
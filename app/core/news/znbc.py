@@ -4,14 +4,19 @@ Fetches today's news from https://znbc.co.zm/?page_id=4187
 """
 
 import logging
+from typing import NamedTuple
 
 import dateutil.parser
 import requests
 import urllib3
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 from fake_useragent import UserAgent
 
-from app.core.utilities import today_iso_fmt
+from app.core import http_client
+from app.core.news.parsing import has_class, make_soup
+from app.core.news.scheduler import run_concurrently
+from app.core.news.sources import Source
+from app.core.utilities import host_of, today_iso_fmt
 
 logger = logging.getLogger(__name__)
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -20,34 +25,65 @@ ua = UserAgent(
 )
 
 
+LISTING_URL = "https://znbc.co.zm/?page_id=4187"
+
+# Only the elements we look at are parsed (see app.core.news.parsing)
+ARTICLE_STRAINER = SoupStrainer("div", class_=has_class("elementor-widget-theme-post-content"))
+LISTING_STRAINER = SoupStrainer("article", class_=has_class("elementor-post"))
+
+
+def extract_article(soup):
+    """
+    Extracts the article text from a parsed ZNBC article page
+    """
+    content_element = soup.select_one("div.elementor-widget-theme-post-content")
+    if content_element:
+        paragraphs = content_element.find_all("p")
+        content = "\n".join([p.get_text(strip=True) for p in paragraphs])
+        return ZNBC.clean(content).strip()
+    return None
+
+
 def get_article_detail(url):
     """
     Fetches the article detail from the URL
     """
-    response = requests.get(url, verify=False)
-    soup = BeautifulSoup(response.text, "html.parser")
+    response = http_client.fetch_page(url, verify=False)
+    soup = make_soup(response.text, parse_only=ARTICLE_STRAINER)
 
     try:
-        content_element = soup.select_one("div.elementor-widget-theme-post-content")
-        if content_element:
-            paragraphs = content_element.find_all("p")
-            content = "\n".join([p.get_text(strip=True) for p in paragraphs])
-            content = content.split("Post Views:")[0].strip()
-        else:
-            content = None
+        content = extract_article(soup)
     except AttributeError as err:
         logger.exception(f"Error fetching article detail for {url}\n: {err}")
         content = None
     return content
 
 
-def _parse_article(article, encountered_titles):
+ZNBC = Source(
+    host="znbc.co.zm",
+    name="Zambia National Broadcasting Corporation (ZNBC)",
+    extractor=get_article_detail,
+    # Remove the view counter, and whatever follows it, from the content
+    cut_at=("Post Views:",),
+)
+
+
+class Candidate(NamedTuple):
+    """A news item as listed on the listing page, before its article is fetched"""
+
+    date: str
+    title: str
+    url: str
+
+
+def _parse_candidate(article):
     """
-    Extracts a news item from an article element, or returns None if it
-    doesn't belong to today or can't be parsed.
+    Extracts the date, title and URL from a listing article element, or
+    returns None if it can't be parsed.
     """
     date_element = article.select_one("span.elementor-post-date")
-    if not date_element:
+    title_element = article.select_one("h3.elementor-post__title a")
+    if not date_element or not title_element or not title_element.get("href"):
         return None
 
     try:
@@ -55,53 +91,81 @@ def _parse_article(article, encountered_titles):
     except (ValueError, OverflowError):
         return None
 
-    if article_date != today_iso_fmt:
-        return None
+    return Candidate(article_date, title_element.get_text(strip=True), title_element["href"])
 
-    title_element = article.select_one("h3.elementor-post__title a")
-    if not title_element:
-        return None
 
-    title = title_element.get_text(strip=True)
-    if title in encountered_titles:
-        return None
+def _normalize_title(title):
+    return " ".join(title.split()).casefold()
+
+
+def select_candidates(candidates, date=None):
+    """
+    Returns the candidates published on ``date`` (today by default), without duplicates.
 
-    detail_url = title_element["href"]
-    content = get_article_detail(detail_url)
+    Two candidates are duplicates if they point to the same article (ignoring
+    case in the scheme and host, and any fragment) or have the same title
+    (ignoring case and whitespace). As the listing is newest first, the
+    oldest listing of an article is the one that is kept.
+    """
+    date = date or today_iso_fmt
+    seen_urls = set()
+    seen_titles = set()
+    selected = []
+
+    for candidate in reversed(candidates):
+        if candidate.date != date:
+            continue
+        url = http_client.cache_key(candidate.url)
+        title = _normalize_title(candidate.title)
+        if url in seen_urls or title in seen_titles:
+            continue
+        seen_urls.add(url)
+        seen_titles.add(title)
+        selected.append(candidate)
+
+    return selected[::-1]
+
+
+def _fetch_candidate(candidate):
+    content = get_article_detail(candidate.url)
     if not content:
         return None
 
     return {
-        "source": "Zambia National Broadcasting Corporation (ZNBC)",
-        "url": detail_url,
-        "title": title,
+        "source": ZNBC.name,
+        "url": candidate.url,
+        "title": candidate.title,
         "content": content,
         "category": "",
     }
 
 
-def get_news():
+def fetch_candidates() -> list[Candidate]:
+    """Fetches the listing page, and returns the articles it lists"""
+    headers = {"User-Agent": ua.firefox}
+    response = http_client.get(LISTING_URL, headers=headers, timeout=60, verify=False)
+    response.raise_for_status()
+    soup = make_soup(response.text, parse_only=LISTING_STRAINER)
+    news = soup.find_all("article", class_="elementor-post")
+    return [candidate for candidate in map(_parse_candidate, news) if candidate]
+
+
+def get_news(date=None, candidates=None):
     """
-    Fetches today's news from https://znbc.co.zm/?page_id=4187
+    Fetches the news published on ``date`` (an ISO date, today by default)
+    from https://znbc.co.zm/?page_id=4187, or from ``candidates`` if the
+    listing was already fetched
     """
-    url = "https://znbc.co.zm/?page_id=4187"
-    headers = {"User-Agent": ua.firefox}
+    url = LISTING_URL
 
     try:
-        response = requests.get(url, headers=headers, timeout=60, verify=False)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        news = soup.find_all("article", class_="elementor-post")
-        latest_news = []
-        encountered_titles = set()
-
-        for article in reversed(news):
-            item = _parse_article(article, encountered_titles)
-            if item:
-                latest_news.append(item)
-                encountered_titles.add(item["title"])
-
-        return latest_news[::-1]
+        if candidates is None:
+            candidates = fetch_candidates()
+
+        # Only the day's distinct articles are downloaded
+        selected = select_candidates(candidates, date)
+        items = run_concurrently(selected, _fetch_candidate, host=lambda candidate: host_of(candidate.url))
+        return [item for item in items if item]
     except requests.exceptions.ConnectionError as conn_err:
         logger.exception(f"Connection error occurred for {url}\n: {conn_err}")
         return []
@@ -0,0 +1,179 @@
+"""
+Record and replay of HTTP exchanges, for running the fetch stage offline.
+
+In record mode, every response received through the shared sessions of
+``app.core.http_client`` is kept in an ``HttpArchive``, which is saved as a ZIP
+file. In replay mode the sessions are served from such an archive instead of
+the network, so that the fetch stage can be benchmarked and regression-tested
+reproducibly on a machine with no network access.
+
+Set $HTTP_RECORD (or $HTTP_REPLAY) to the path of an archive to record (or
+replay) the exchanges of any run, or see ``app.benchmarks.fetch``.
+"""
+
+import hashlib
+import io
+import json
+import threading
+import zipfile
+from pathlib import Path
+from urllib.parse import urldefrag
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+RECORD = "record"
+REPLAY = "replay"
+
+# response headers that describe the body as it was sent, rather than as it is stored
+_TRANSPORT_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+
+class NotRecordedError(requests.ConnectionError):
+    """The archive has no response for the request"""
+
+
+def _key(request: requests.PreparedRequest) -> str:
+    return f"{request.method} {urldefrag(request.url).url}"
+
+
+class HttpArchive:
+    """
+    The responses received for each request (by method and URL), in the order
+    they were received.
+
+    When replaying, a request that was sent several times during the recording
+    (say, a page that was retried) gets the recorded responses in turn, and the
+    last one from then on. Bodies are stored once per distinct content.
+    """
+
+    def __init__(self, meta: dict | None = None):
+        # anything worth knowing about the recording, e.g. the date it was made
+        self.meta = meta or {}
+        self._exchanges: dict[str, list[dict]] = {}
+        self._bodies: dict[str, bytes] = {}
+        self._served: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(responses) for responses in self._exchanges.values())
+
+    def add(self, request: requests.PreparedRequest, response: requests.Response):
+        """Records the response to a request. The response body is read in full."""
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        exchange = {
+            "status": response.status_code,
+            "reason": response.reason,
+            "encoding": response.encoding,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in _TRANSPORT_HEADERS},
+            "body": digest,
+        }
+        with self._lock:
+            self._bodies[digest] = body
+            self._exchanges.setdefault(_key(request), []).append(exchange)
+
+    def response_for(self, request: requests.PreparedRequest) -> requests.Response:
+        """Returns the next recorded response to a request, or raises ``NotRecordedError``"""
+        key = _key(request)
+        with self._lock:
+            responses = self._exchanges.get(key)
+            if not responses:
+                raise NotRecordedError(f"No recorded response for {key}", request=request)
+            index = self._served.get(key, 0)
+            self._served[key] = index + 1
+            exchange = responses[min(index, len(responses) - 1)]
+
+        body = self._bodies[exchange["body"]]
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        response.status_code = exchange["status"]
+        response.reason = exchange["reason"]
+        response.encoding = exchange["encoding"]
+        response.headers = CaseInsensitiveDict(exchange["headers"])
+        response.raw = io.BytesIO(body)
+        response._content = body
+        response._content_consumed = True
+        return response
+
+    def pages(self):
+        """Yields the URL and body of every successful response recorded for a GET request"""
+        with self._lock:
+            exchanges = list(self._exchanges.items())
+        for key, responses in exchanges:
+            method, url = key.split(" ", 1)
+            for exchange in responses:
+                if method == "GET" and exchange["status"] == 200:
+                    yield url, self._bodies[exchange["body"]]
+
+    def rewind(self):
+        """Starts serving every request's responses from the first one again"""
+        with self._lock:
+            self._served.clear()
+
+    def save(self, path: str | Path):
+        """Writes the archive to a ZIP file"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("exchanges.json", json.dumps({"meta": self.meta, "exchanges": self._exchanges}, indent=1))
+            for digest, body in self._bodies.items():
+                archive.writestr(f"bodies/{digest}", body)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "HttpArchive":
+        """Reads an archive written by ``save``"""
+        with zipfile.ZipFile(path) as archive:
+            index = json.loads(archive.read("exchanges.json"))
+            instance = cls(index["meta"])
+            instance._exchanges = index["exchanges"]
+            instance._bodies = {
+                name.removeprefix("bodies/"): archive.read(name)
+                for name in archive.namelist()
+                if name.startswith("bodies/")
+            }
+        return instance
+
+
+class RecordingAdapter(BaseAdapter):
+    """Sends requests through another adapter, and records the responses"""
+
+    def __init__(self, adapter: BaseAdapter, archive: HttpArchive):
+        super().__init__()
+        self.adapter = adapter
+        self.archive = archive
+
+    def send(self, request, **kwargs):
+        response = self.adapter.send(request, **kwargs)
+        self.archive.add(request, response)
+        return response
+
+    def close(self):
+        self.adapter.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    """Serves requests from an archive, without touching the network"""
+
+    def __init__(self, archive: HttpArchive):
+        super().__init__()
+        self.archive = archive
+
+    def send(self, request, **kwargs):
+        return self.archive.response_for(request)
+
+    def close(self):
+        pass
+
+
+def install(session: requests.Session, archive: HttpArchive, mode: str):
+    """Mounts the adapters that record a session's exchanges to ``archive``, or replay them from it"""
+    for prefix in ("https://", "http://"):
+        if mode == RECORD:
+            session.mount(prefix, RecordingAdapter(session.get_adapter(prefix), archive))
+        elif mode == REPLAY:
+            session.mount(prefix, ReplayAdapter(archive))
+        else:
+            raise ValueError(f"Unknown mode {mode!r}, expected {RECORD!r} or {REPLAY!r}")
@@ -5,12 +5,13 @@ Toolchain for fetching news content and processing it into a digest.
 import json
 import logging
 import subprocess
+import sys
 import time
 
 from colorama import init
 from dotenv import load_dotenv
 
-from app.core.db.config import close_database, initialize_database
+from app.core.db.config import check_database, close_database, initialize_database
 from app.core.news.digest import create_news_digest
 from app.core.news.eleventify import render_jinja_template
 from app.core.news.fetch import get_latest_news, save_news_to_db, save_news_to_file
@@ -22,43 +23,34 @@ def _read_json_file(file):
         return json.load(f)
 
 
-def main():
-    raw_news = f"{DATA_DIR}/{today_iso_fmt}_news.json"
-    digest_content = f"{DATA_DIR}/{today_iso_fmt}_digest-content.txt"
-    digest_metadata = f"{DATA_DIR}/{today_iso_fmt}_digest.json"
+def raw_news_file(date: str) -> str:
+    """The JSON file ``date``'s news is saved to, before anything else is done with it"""
+    return f"{DATA_DIR}/{date}_news.json"
 
-    start_time = time.time()
 
-    # Configure logging
-    init()
-    configure_logging()
-
-    # Load environment variables
-    load_dotenv()
-
-    # Fetch news
-    logging.info("Fetching latest news from all sources...")
-    news = get_latest_news()
-
-    # Save news to a JSON file
-    save_news_to_file(news, raw_news)
+def process_news(news: list[dict[str, str]], date: str, start_time: float) -> bool:
+    """
+    Stores ``date``'s news (an ISO date), creates its digest and renders it
+    for the website, and returns whether a digest was produced. The news
+    must already be saved to its ``raw_news_file``, and the database
+    initialized.
+    """
+    raw_news = raw_news_file(date)
+    digest_content = f"{DATA_DIR}/{date}_digest-content.txt"
+    digest_metadata = f"{DATA_DIR}/{date}_digest.json"
 
     # news = _read_json_file(raw_news)  # for testing
 
-    # Connect to the database
-    initialize_database()
-
     # Save news to the database
     save_news_to_db(news)
 
     # Create news digest
-    logging.info("Creating news digest...")
-    digest_data = create_news_digest(news, digest_content)
+    logging.info(f"Creating news digest for {date}...")
+    digest_data = create_news_digest(news, digest_content, date)
 
     if digest_data is None:
-        logging.warning("No digest produced (no articles fetched). Exiting.")
-        close_database()
-        return
+        logging.warning(f"No digest produced for {date} (no articles fetched).")
+        return False
 
     end_time = time.time()
     processing_time = int(end_time - start_time)
@@ -79,27 +71,58 @@ def main():
     logging.info(f"News digest processing completed in {processing_time} seconds")
     logging.info(f"Digest metadata saved to: {digest_metadata}")
 
-    # Move files to today's directory for organization first
+    # Move files to the day's directory for organization first
     # NOTE: Run a cron job to delete these files after a month
     subprocess.run(
-        f"mkdir -p {DATA_DIR}/{today_iso_fmt}",
+        f"mkdir -p {DATA_DIR}/{date}",
         shell=True,
     )
     subprocess.run(
-        f"mv -v {digest_content} {DATA_DIR}/{today_iso_fmt}/",
+        f"mv -v {digest_content} {DATA_DIR}/{date}/",
         shell=True,
     )
     subprocess.run(
-        f"mv -v {raw_news} {DATA_DIR}/{today_iso_fmt}/",
+        f"mv -v {raw_news} {DATA_DIR}/{date}/",
         shell=True,
     )
     subprocess.run(
-        f"mv -v {digest_metadata} {DATA_DIR}/{today_iso_fmt}/",
+        f"mv -v {digest_metadata} {DATA_DIR}/{date}/",
         shell=True,
     )
 
     # Render the Jinja template for website generation (after files are moved)
-    render_jinja_template()
+    render_jinja_template(date)
+    return True
+
+
+def main():
+    start_time = time.time()
+
+    # Configure logging
+    init()
+    configure_logging()
+
+    # Load environment variables
+    load_dotenv()
+
+    # Make sure the news can be stored before fetching it (and fail the run if it can't)
+    if not check_database():
+        sys.exit(1)
+
+    # Fetch news
+    logging.info("Fetching latest news from all sources...")
+    news = get_latest_news()
+
+    # Save news to a JSON file (first, so that it isn't lost if the database can't be initialized)
+    save_news_to_file(news, raw_news_file(today_iso_fmt))
+
+    # Connect to the database
+    initialize_database()
+
+    if not process_news(news, today_iso_fmt, start_time):
+        logging.warning("Exiting.")
+        close_database()
+        return
 
     logging.info("News digest generation completed successfully!")
 
@@ -21,6 +21,7 @@ import requests
 from dotenv import load_dotenv
 from together import Together
 
+from app.core.llm_cache import ModelResponse, cached_response
 from app.core.utilities import (
     ASSETS_DIR,  # noqa: F401
     DATA_DIR,
@@ -71,6 +72,17 @@ def get_digest_content() -> str:
         return ""
 
 
+def _complete(messages: list[dict[str, str]], **params) -> str:
+    """Get the text model's response, reusing the one to an unchanged call (see app.core.llm_cache)."""
+
+    def generate() -> ModelResponse:
+        completion = client.chat.completions.create(model=TEXT_MODEL, messages=messages, **params)
+        choice = completion.choices[0]
+        return ModelResponse(choice.message.content, choice.finish_reason)
+
+    return cached_response(generate, TEXT_MODEL, messages, **params)
+
+
 def get_image_prompt_concept(content: str) -> str:
     """Generate a creative image prompt concept from the digest content using an LLM."""
     if not content:
@@ -100,17 +112,13 @@ def get_image_prompt_concept(content: str) -> str:
 
     user_prompt = f"Here is today's news digest for Zambia. Generate a creative photo concept based on it:\n\n{content}"
 
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
     try:
-        completion = client.chat.completions.create(
-            model=TEXT_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=IMAGE_CONCEPT_TEMP,
-            max_tokens=150,
-        )
-        concept = completion.choices[0].message.content.strip()
+        concept = _complete(messages, temperature=IMAGE_CONCEPT_TEMP, max_tokens=150).strip()
         logger.info(f"Generated image prompt concept: {concept}")
         return concept
     except Exception as e:
@@ -241,17 +249,13 @@ def create_facebook_post_text(content: str) -> str:
         f"End with this link: {digest_url}"
     )
 
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
     try:
-        completion = client.chat.completions.create(
-            model=TEXT_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=FACEBOOK_POST_TEMP,
-            max_tokens=1800,
-        )
-        post_text = completion.choices[0].message.content
+        post_text = _complete(messages, temperature=FACEBOOK_POST_TEMP, max_tokens=1800)
         logger.info(f"Generated Facebook post text:\n{post_text}")
         return post_text
     except Exception as e:
@@ -2,6 +2,7 @@ import logging
 
 import cohere
 
+from app.core.llm_cache import cached_response
 from app.core.utilities import COHERE_API_KEY
 
 co = cohere.Client(COHERE_API_KEY)
@@ -14,13 +15,12 @@ def summarize(content: str, title: str) -> str:
     """
 
     logging.info(f"Summarizing '{title}' via Cohere ...")
-    response = co.summarize(
-        text=content,
-        model="summarize-xlarge",
-        temperature=0,
-        length="auto",
-        format="paragraph",
-        extractiveness="auto",
-        additional_command="in a news-digest format",
-    )
-    return response.summary
+    model = "summarize-xlarge"
+    params = {
+        "temperature": 0,
+        "length": "auto",
+        "format": "paragraph",
+        "extractiveness": "auto",
+        "additional_command": "in a news-digest format",
+    }
+    return cached_response(lambda: co.summarize(text=content, model=model, **params).summary, model, content, **params)
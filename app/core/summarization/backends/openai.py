@@ -5,6 +5,7 @@ import textwrap
 from langchain_core.prompts import PromptTemplate
 from langchain_openai import OpenAI
 
+from app.core.llm_cache import cached_response
 from app.core.utilities import OPENAI_API_KEY
 
 llm = OpenAI(temperature=0, openai_api_key=OPENAI_API_KEY)
@@ -40,4 +41,4 @@ def summarize(content: str, title: str) -> str:
     num_tokens = llm.get_num_tokens(summary_prompt)
     logging.info(f"'{title}' and its prompt has {num_tokens} tokens")
 
-    return llm(summary_prompt)
+    return cached_response(lambda: llm(summary_prompt), llm.model_name, summary_prompt, temperature=llm.temperature)
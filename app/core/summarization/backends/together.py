@@ -5,11 +5,40 @@ import time
 
 from together import Together, TogetherError
 
+from app.core.llm_cache import ModelResponse, cached_response
 from app.core.utilities import TOGETHER_API_KEY
 
 client = Together(api_key=TOGETHER_API_KEY)
 
 
+def _complete(system_prompt: str, user_prompt: str, model: str, temperature: float, max_tokens: int) -> str:
+    """Returns the model's response to the prompts, reusing the one to an unchanged call (see app.core.llm_cache)"""
+    messages = [
+        {
+            "role": "system",
+            "content": system_prompt,
+        },
+        {
+            "role": "user",
+            "content": user_prompt,
+        },
+    ]
+
+    def generate() -> ModelResponse:
+        completion = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+        time.sleep(1.5)
+        logging.info(completion)
+        choice = completion.choices[0]
+        return ModelResponse(choice.message.content, choice.finish_reason)
+
+    return cached_response(generate, model, messages, temperature=temperature, max_tokens=max_tokens)
+
+
 def summarize(content: str, title: str) -> str:
     """
     TODO: rename this function to `synthesize`
@@ -37,25 +66,7 @@ def summarize(content: str, title: str) -> str:
 
     while retries < max_retries:
         try:
-            completion = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_prompt,
-                    },
-                    {
-                        "role": "user",
-                        "content": user_prompt,
-                    },
-                ],
-                temperature=temperature,
-                max_tokens=max_tokens,
-            )
-            time.sleep(1.5)
-            logging.info(completion)
-
-            if result := completion.choices[0].message.content.strip():
+            if result := _complete(system_prompt, user_prompt, model, temperature, max_tokens).strip():
                 result = result.replace("```", "")  # Remove triple backticks
                 first_line = result.splitlines()[0].lower()
                 unwanted = ["summary:", "here's", "here is", "sure"]
@@ -99,25 +110,7 @@ def brief_summary(content: str, title: str) -> str:
 
     while retries < max_retries:
         try:
-            completion = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_prompt,
-                    },
-                    {
-                        "role": "user",
-                        "content": user_prompt,
-                    },
-                ],
-                temperature=temperature,
-                max_tokens=max_tokens,
-            )
-            time.sleep(1.5)
-            logging.info(completion)
-
-            if result := completion.choices[0].message.content.strip():
+            if result := _complete(system_prompt, user_prompt, model, temperature, max_tokens).strip():
                 result = result.replace("```", "")  # Remove triple backticks
                 first_line = result.splitlines()[0].lower()
                 unwanted = ["summary:", "here's", "here is", "sure"]
@@ -1,9 +1,12 @@
 import copy
 import datetime
+import hashlib
 import logging
 import os
 import sys
+import unicodedata
 from pathlib import Path
+from urllib.parse import urlparse
 
 import pytz
 from colorama import Fore, Style
@@ -22,14 +25,70 @@ LOG_COLORS = {
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 ASSETS_DIR = PROJECT_ROOT / "assets"
 DATA_DIR = PROJECT_ROOT / "data"
+# "postgres", or "sqlite" for a local file at DATABASE_PATH (for development and benchmarks)
+DATABASE_BACKEND = os.getenv("DATABASE_BACKEND", "postgres")
+DATABASE_PATH = Path(os.getenv("DATABASE_PATH", DATA_DIR / "zednews.sqlite3"))
 DATABASE_NAME = os.getenv("DATABASE_NAME")
 DATABASE_HOST = os.getenv("DATABASE_HOST")
 DATABASE_USER = os.getenv("DATABASE_USER")
 DATABASE_PASSWORD = os.getenv("DATABASE_PASSWORD")
+# connections kept in the pool shared by all threads (0 to connect without a pool), and seconds to wait to connect
+DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", "8"))
+DATABASE_CONNECT_TIMEOUT = int(os.getenv("DATABASE_CONNECT_TIMEOUT", "5"))
+# partition the article table by month, on PostgreSQL (see app.core.db.partitions)
+DATABASE_PARTITIONED = os.getenv("DATABASE_PARTITIONED", "0") == "1"
+# articles older than this many days have their content moved to compressed cold storage (see app.core.db.archive)
+ARTICLE_ARCHIVE_AFTER_DAYS = int(os.getenv("ARTICLE_ARCHIVE_AFTER_DAYS", "90"))
 COHERE_API_KEY = os.getenv("COHERE_API_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 TOGETHER_API_KEY = os.getenv("TOGETHER_API_KEY")
 
+# fetch stage concurrency
+FETCH_MAX_WORKERS = int(os.getenv("FETCH_MAX_WORKERS", "16"))
+FETCH_PER_HOST_LIMIT = int(os.getenv("FETCH_PER_HOST_LIMIT", "4"))
+FETCH_DEADLINE = float(os.getenv("FETCH_DEADLINE", "180"))  # seconds
+# article pages larger than this are not downloaded
+FETCH_MAX_BYTES = int(os.getenv("FETCH_MAX_BYTES", str(5 * 1024 * 1024)))
+# retries of failed requests, with jittered exponential backoff between them
+FETCH_RETRIES = int(os.getenv("FETCH_RETRIES", "2"))
+FETCH_BACKOFF_BASE = float(os.getenv("FETCH_BACKOFF_BASE", "1"))  # seconds
+FETCH_BACKOFF_MAX = float(os.getenv("FETCH_BACKOFF_MAX", "10"))  # seconds
+
+# per-host circuit breaker: consecutive failures before a host is skipped, and for how long
+CIRCUIT_BREAKER_THRESHOLD = int(os.getenv("CIRCUIT_BREAKER_THRESHOLD", "3"))
+CIRCUIT_BREAKER_COOLDOWN = float(os.getenv("CIRCUIT_BREAKER_COOLDOWN", "600"))  # seconds
+HOST_HEALTH_FILE = Path(os.getenv("HOST_HEALTH_FILE", DATA_DIR / "host_health.json"))
+
+# on-disk cache of article pages
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE", "1") != "0"
+HTTP_CACHE_DIR = Path(os.getenv("HTTP_CACHE_DIR", DATA_DIR / "cache" / "http"))
+HTTP_CACHE_TTL = float(os.getenv("HTTP_CACHE_TTL", str(7 * 24 * 60 * 60)))  # seconds
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# model responses, reused for unchanged prompts (see app.core.llm_cache)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") != "0"
+LLM_CACHE_DIR = Path(os.getenv("LLM_CACHE_DIR", DATA_DIR / "cache" / "llm"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(30 * 24 * 60 * 60)))  # seconds
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# tokens the digest prompt may take up, at most (see app.core.news.prompt)
+DIGEST_TOKEN_BUDGET = int(os.getenv("DIGEST_TOKEN_BUDGET", "64000"))
+
+# generate the digest by map-reduce: groups of stories summarised concurrently, then assembled
+DIGEST_MAP_REDUCE = os.getenv("DIGEST_MAP_REDUCE", "0") == "1"
+DIGEST_MAP_GROUP_TOKENS = int(os.getenv("DIGEST_MAP_GROUP_TOKENS", "8000"))
+DIGEST_MAP_MAX_WORKERS = int(os.getenv("DIGEST_MAP_MAX_WORKERS", "4"))
+
+# dates processed at once by a backfill (see app.core.backfill)
+BACKFILL_MAX_WORKERS = int(os.getenv("BACKFILL_MAX_WORKERS", "4"))
+
+# record the HTTP exchanges of a run to, or replay them from, an archive (see app.core.recording)
+HTTP_RECORD = os.getenv("HTTP_RECORD")
+HTTP_REPLAY = os.getenv("HTTP_REPLAY")
+
+# BeautifulSoup parser backend for the article extractors (defaults to lxml, if installed)
+HTML_PARSER = os.getenv("HTML_PARSER")
+
 
 class ColourFormatter(logging.Formatter):
     """Display the severity of the log using unique colours
@@ -71,6 +130,21 @@ def configure_logging():
     logger.addHandler(handler)
 
 
+def content_hash(text: str) -> str:
+    """
+    Returns the SHA-256 of a text, normalized so that differences in Unicode
+    representation and whitespace don't count as changes
+    """
+    normalized = " ".join(unicodedata.normalize("NFKC", text).split())
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def host_of(url: str) -> str:
+    """Returns the host of a URL, lower-cased and without a leading "www." """
+    host = (urlparse(url).hostname or "").lower()
+    return host.removeprefix("www.")
+
+
 def suffix(d):
     return "th" if 11 <= d <= 13 else {1: "st", 2: "nd", 3: "rd"}.get(d % 10, "th")
 
@@ -79,8 +153,13 @@ def custom_strftime(format, t):
     return t.strftime(format).replace("{S}", str(t.day) + suffix(t.day))
 
 
+def human_readable(date: str) -> str:
+    """Formats an ISO date for people, e.g. Saturday, October 17th, 2026"""
+    return custom_strftime("%A, %B {S}, %Y", datetime.date.fromisoformat(date))
+
+
 timezone = pytz.timezone("Africa/Lusaka")
 today = datetime.datetime.now(timezone).date()
 
 today_iso_fmt = today.isoformat()
-today_human_readable = custom_strftime("%A, %B {S}, %Y", today)
+today_human_readable = human_readable(today_iso_fmt)
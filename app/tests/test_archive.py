@@ -0,0 +1,114 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+
+import zstandard
+from peewee import SqliteDatabase
+
+from app.core.db import repository
+from app.core.db.archive import archive_articles, article_content, compress_news_files
+from app.core.db.models import Article, ArticleArchive, Episode, Mp3
+from app.core.news.fetch import save_news_to_db
+from app.core.utilities import content_hash
+
+MODELS = [Mp3, Episode, Article, ArticleArchive]
+test_db = SqliteDatabase(":memory:")
+
+OLD = datetime.date(2026, 5, 1)
+RECENT = datetime.date(2026, 10, 16)
+CUTOFF = datetime.date(2026, 7, 19)
+
+
+class TestArchiveArticles(unittest.TestCase):
+    def setUp(self):
+        test_db.bind(MODELS, bind_refs=False, bind_backrefs=False)
+        test_db.connect()
+        test_db.create_tables(MODELS)
+
+        for i, date in enumerate([OLD, OLD, OLD, RECENT]):
+            content = f"Content {i} " * 50
+            Article.create(
+                date=date,
+                source="ZNBC",
+                url=f"https://znbc.co.zm/{i}",
+                title=f"Article {i}",
+                content=content,
+                content_hash=content_hash(content),
+            )
+
+    def tearDown(self):
+        test_db.drop_tables(MODELS)
+        test_db.close()
+
+    def test_old_articles_are_archived(self):
+        self.assertEqual(archive_articles(CUTOFF, batch_size=2), 3)
+        # nothing is left to archive
+        self.assertEqual(archive_articles(CUTOFF), 0)
+
+        self.assertEqual(ArticleArchive.select().count(), 3)
+        self.assertEqual(
+            [(a.archived, a.content == "") for a in Article.select().order_by(Article.id)],
+            [(True, True)] * 3 + [(False, False)],
+        )
+        self.assertLess(len(ArticleArchive.get_by_id(1).content), len("Content 0 " * 50))
+
+        for article in Article.select():
+            self.assertEqual(article_content(article), f"Content {article.id - 1} " * 50)
+
+    def test_archived_content_is_loaded_transparently(self):
+        archive_articles(CUTOFF)
+
+        articles = repository.articles_between(OLD, RECENT)
+        self.assertEqual([a.content for a in articles], [f"Content {i} " * 50 for i in range(4)])
+        self.assertIsNone(repository.articles_between(OLD, RECENT, with_content=False)[0].content)
+
+    def test_changed_archived_articles_are_stored_again(self):
+        archive_articles(CUTOFF)
+
+        news = [{"source": "ZNBC", "url": "https://znbc.co.zm/0", "title": "Article 0", "content": "Corrected"}]
+        news.append({**news[0], "url": "https://znbc.co.zm/1", "content": "Content 1 " * 50})
+        counts = save_news_to_db(news)
+
+        self.assertEqual((counts.updated, counts.unchanged), (1, 1))
+        article = Article.get(Article.url == "https://znbc.co.zm/0")
+        self.assertFalse(article.archived)
+        self.assertEqual(article_content(article), "Corrected")
+        self.assertTrue(Article.get(Article.url == "https://znbc.co.zm/1").archived)
+        # its out-of-date copy in cold storage is dropped
+        self.assertEqual(
+            [row.article_id for row in ArticleArchive.select().order_by(ArticleArchive.article_id)], [2, 3]
+        )
+
+
+class TestCompressNewsFiles(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_old_news_files_are_compressed(self):
+        # each run moves its files to a directory of their date, but for failed ones
+        files = [
+            "2026-05-01/2026-05-01_news.json",
+            "2026-05-01/2026-05-01_digest.json",
+            "2026-10-16/2026-10-16_news.json",
+            "2026-05-02_news.json",
+        ]
+        for name in files:
+            os.makedirs(os.path.join(self.temp_dir, os.path.dirname(name)), exist_ok=True)
+            with open(os.path.join(self.temp_dir, name), "w") as f:
+                f.write('[{"title": "Article"}]')
+
+        self.assertEqual(compress_news_files(CUTOFF, self.temp_dir), 2)
+
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(self.temp_dir, "2026-05-01"))),
+            ["2026-05-01_digest.json", "2026-05-01_news.json.zst"],
+        )
+        self.assertEqual(os.listdir(os.path.join(self.temp_dir, "2026-10-16")), ["2026-10-16_news.json"])
+        self.assertIn("2026-05-02_news.json.zst", os.listdir(self.temp_dir))
+        with open(os.path.join(self.temp_dir, "2026-05-01", "2026-05-01_news.json.zst"), "rb") as f:
+            self.assertEqual(zstandard.decompress(f.read()), b'[{"title": "Article"}]')
@@ -0,0 +1,84 @@
+import datetime
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.core import backfill
+from app.core.news.fetch import Listings
+
+
+class TestBackfill(unittest.TestCase):
+    def test_dates_between(self):
+        self.assertEqual(
+            backfill.dates_between(datetime.date(2026, 9, 29), datetime.date(2026, 10, 2)),
+            ["2026-09-29", "2026-09-30", "2026-10-01", "2026-10-02"],
+        )
+        self.assertEqual(backfill.dates_between(datetime.date(2026, 10, 2), datetime.date(2026, 10, 1)), [])
+
+    @patch("app.core.backfill.get_latest_news")
+    @patch("app.core.backfill.articles_between")
+    def test_news_of(self, mock_articles_between, mock_get_latest_news):
+        stored = [
+            SimpleNamespace(source="ZNBC", url="https://znbc.co.zm/1", title="1", content="Stored", category=None),
+            SimpleNamespace(source="ZNBC", url="https://znbc.co.zm/2", title="2", content="Stored", category=None),
+        ]
+        mock_articles_between.return_value = stored
+        fetched = {"source": "ZNBC", "url": "https://znbc.co.zm/2", "title": "2", "content": "Fetched", "category": ""}
+        mock_get_latest_news.return_value = [fetched]
+        listings = Listings([], [])
+
+        news = backfill.news_of("2026-10-10", listings)
+
+        mock_articles_between.assert_called_once_with(datetime.date(2026, 10, 10), datetime.date(2026, 10, 10))
+        mock_get_latest_news.assert_called_once_with("2026-10-10", listings)
+        # a fetched copy wins over a stored one, and all are stored under the date
+        self.assertEqual(
+            [(item["url"], item["content"]) for item in news],
+            [("https://znbc.co.zm/1", "Stored"), ("https://znbc.co.zm/2", "Fetched")],
+        )
+        self.assertEqual({item["date"] for item in news}, {"2026-10-10"})
+
+    @patch("app.core.backfill.save_news_to_file")
+    @patch("app.core.backfill.connection")
+    @patch("app.core.backfill.process_news")
+    @patch("app.core.backfill.news_of")
+    @patch("app.core.backfill.fetch_listings")
+    def test_backfill(self, mock_fetch_listings, mock_news_of, mock_process_news, mock_connection, mock_save_file):
+        mock_news_of.side_effect = lambda date, listings: [{"url": date}]
+
+        def process(news, date, start_time):
+            if date == "2026-10-11":
+                raise SystemExit(1)
+            return date != "2026-10-12"
+
+        mock_process_news.side_effect = process
+
+        with self.assertLogs(level="ERROR"):
+            results = backfill.backfill(["2026-10-10", "2026-10-11", "2026-10-12"], max_workers=2)
+
+        # the listings are fetched once, for all the dates
+        mock_fetch_listings.assert_called_once()
+        self.assertEqual(mock_news_of.call_count, 3)
+        self.assertEqual(results, {"2026-10-10": True, "2026-10-11": False, "2026-10-12": False})
+        # each date's news is saved to its file before it is processed
+        self.assertEqual(
+            sorted(call.args[1] for call in mock_save_file.call_args_list),
+            [backfill.raw_news_file(date) for date in ["2026-10-10", "2026-10-11", "2026-10-12"]],
+        )
+        processed = sorted((call.args[1], call.args[0]) for call in mock_process_news.call_args_list)
+        self.assertEqual(processed[0], ("2026-10-10", [{"url": "2026-10-10"}]))
+
+    @patch("app.core.backfill.initialize_database")
+    @patch("app.core.backfill.check_database", return_value=False)
+    @patch("app.core.backfill.configure_logging")
+    @patch("app.core.backfill.init")
+    def test_main_fails_without_a_database(self, mock_init, mock_logging, mock_check_db, mock_initialize_db):
+        with patch("sys.argv", ["backfill", "2026-10-10"]), self.assertRaises(SystemExit) as cm:
+            backfill.main()
+
+        self.assertEqual(cm.exception.code, 1)
+        mock_initialize_db.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import tempfile
+import time
+import unittest
+
+from app.core.cache import DiskCache
+
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = DiskCache(self.temp_dir.name, max_bytes=1024, ttl=60)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_set_and_get(self):
+        self.assertIsNone(self.cache.get("https://example.com/a"))
+
+        self.cache.set("https://example.com/a", b"<html>a</html>")
+        self.assertEqual(self.cache.get("https://example.com/a"), b"<html>a</html>")
+
+        self.cache.set("https://example.com/a", b"<html>b</html>")
+        self.assertEqual(self.cache.get("https://example.com/a"), b"<html>b</html>")
+
+    def test_expired_entries_are_dropped(self):
+        self.cache.set("key", b"value")
+        path = self.cache._path("key")
+        old = time.time() - 120
+        os.utime(path, (old, old))
+
+        self.assertIsNone(self.cache.get("key"))
+        self.assertFalse(path.exists())
+
+    def test_least_recently_used_entries_are_evicted(self):
+        for i in range(3):
+            self.cache.set(f"key-{i}", b"x" * 300)
+            path = self.cache._path(f"key-{i}")
+            # spread out access times, key-0 being the oldest
+            os.utime(path, (time.time() - 30 + i, time.time()))
+
+        # reading key-0 makes key-1 the least recently used entry
+        self.assertIsNotNone(self.cache.get("key-0"))
+        self.cache.set("key-3", b"x" * 300)
+
+        self.assertIsNone(self.cache.get("key-1"))
+        self.assertIsNotNone(self.cache.get("key-0"))
+        self.assertIsNotNone(self.cache.get("key-2"))
+        self.assertIsNotNone(self.cache.get("key-3"))
+
+    def test_delete_and_clear(self):
+        self.cache.set("a", b"1")
+        self.cache.set("b", b"2")
+
+        self.cache.delete("a")
+        self.assertIsNone(self.cache.get("a"))
+
+        self.cache.clear()
+        self.assertIsNone(self.cache.get("b"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import json
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from app.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.state_file = Path(self.temp_dir.name) / "host_health.json"
+        self.breaker = CircuitBreaker(self.state_file, threshold=3, cooldown=60)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_opens_after_consecutive_failures(self):
+        for _ in range(2):
+            self.assertFalse(self.breaker.before_request("diggers.news"))
+            self.breaker.record_failure("diggers.news")
+        self.assertEqual(self.breaker.state("diggers.news"), CLOSED)
+
+        self.breaker.record_failure("diggers.news")
+        self.assertEqual(self.breaker.state("diggers.news"), OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_request("diggers.news")
+
+        # other hosts are unaffected
+        self.assertFalse(self.breaker.before_request("mwebantu.com"))
+
+    def test_success_resets_failures(self):
+        for _ in range(2):
+            self.breaker.record_failure("times.co.zm")
+        self.breaker.record_success("times.co.zm")
+        for _ in range(2):
+            self.breaker.record_failure("times.co.zm")
+
+        self.assertEqual(self.breaker.state("times.co.zm"), CLOSED)
+
+    def test_half_open_after_cooldown(self):
+        breaker = CircuitBreaker(self.state_file, threshold=1, cooldown=0.05)
+        breaker.record_failure("times.co.zm")
+        self.assertEqual(breaker.state("times.co.zm"), OPEN)
+
+        time.sleep(0.06)
+        self.assertEqual(breaker.state("times.co.zm"), HALF_OPEN)
+        self.assertTrue(breaker.before_request("times.co.zm"))
+
+        # a failed probe re-opens the circuit straight away
+        breaker.record_failure("times.co.zm")
+        self.assertEqual(breaker.state("times.co.zm"), OPEN)
+
+    def test_requests_wait_for_the_probe(self):
+        breaker = CircuitBreaker(self.state_file, threshold=1, cooldown=0)
+        breaker.record_failure("muvitv.com")
+        self.assertTrue(breaker.before_request("muvitv.com"))
+
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(breaker.before_request("muvitv.com")))
+        waiter.start()
+        time.sleep(0.05)
+        self.assertEqual(results, [])
+
+        breaker.record_success("muvitv.com")
+        waiter.join(timeout=1)
+        self.assertEqual(results, [False])
+        self.assertEqual(breaker.state("muvitv.com"), CLOSED)
+
+    def test_only_the_probing_thread_ends_the_probe(self):
+        breaker = CircuitBreaker(self.state_file, threshold=1, cooldown=0)
+        breaker.record_failure("muvitv.com")
+        probe = []
+        prober = threading.Thread(target=lambda: probe.append(breaker.before_request("muvitv.com")))
+        prober.start()
+        prober.join(timeout=1)
+        self.assertEqual(probe, [True])
+
+        # a request sent before the circuit opened fails or gives up while the probe is in flight
+        breaker.release("muvitv.com")
+        breaker.record_failure("muvitv.com")
+
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(breaker.before_request("muvitv.com")))
+        waiter.start()
+        time.sleep(0.05)
+        # no second probe is let through
+        self.assertEqual(results, [])
+
+        ender = threading.Thread(target=lambda: breaker.record_success("muvitv.com"))
+        ender.start()
+        ender.join(timeout=1)
+        waiter.join(timeout=1)
+        self.assertEqual(results, [False])
+
+    def test_health_is_kept_across_runs(self):
+        for _ in range(3):
+            self.breaker.record_failure("diggers.news")
+        self.breaker.record_failure("times.co.zm")
+        self.breaker.record_failure("mwebantu.com")
+        self.breaker.record_success("mwebantu.com")
+        self.breaker.save()
+
+        stored = json.loads(self.state_file.read_text())
+        self.assertEqual(set(stored), {"diggers.news", "times.co.zm"})
+
+        # on the next run, the host that was down is probed once, and not retried if the probe fails
+        next_run = CircuitBreaker(self.state_file, threshold=3, cooldown=60)
+        self.assertEqual(next_run.state("diggers.news"), HALF_OPEN)
+        self.assertTrue(next_run.before_request("diggers.news"))
+        next_run.record_failure("diggers.news")
+        with self.assertRaises(CircuitOpenError):
+            next_run.before_request("diggers.news")
+
+        # while failures short of the threshold start afresh: the circuit opens after enough failures in this run
+        self.assertEqual(next_run.state("times.co.zm"), CLOSED)
+        next_run.record_failure("times.co.zm")
+        next_run.record_failure("times.co.zm")
+        self.assertEqual(next_run.state("times.co.zm"), CLOSED)
+        next_run.record_failure("times.co.zm")
+        self.assertEqual(next_run.state("times.co.zm"), OPEN)
+
+    def test_corrupt_state_file_is_ignored(self):
+        self.state_file.write_text("{not json")
+        self.assertEqual(self.breaker.state("diggers.news"), CLOSED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+from app.core.news.clustering import NUM_PERM, cluster_articles, minhash, shingles
+
+STORY = (
+    "The Ministry of Energy has announced that load-shedding hours will be reduced from next week, "
+    "after water levels at Lake Kariba improved following heavy rains in the catchment area. "
+    "ZESCO said households would receive at least twelve hours of power a day, and that mines "
+    "and industry would be supplied through imports from Mozambique until the end of the year."
+)
+OTHER_STORY = (
+    "The National Assembly has passed the Cyber Security Bill by a majority vote, despite objections "
+    "from opposition members who argued that several clauses give the police wide powers to intercept "
+    "private communications without a warrant. The bill now awaits presidential assent."
+)
+
+
+def article(source, title, content):
+    return {
+        "source": source,
+        "url": f"https://{source.lower()}.example/{len(content)}",
+        "title": title,
+        "content": content,
+    }
+
+
+class TestShingles(unittest.TestCase):
+    def test_shingles(self):
+        self.assertEqual(
+            shingles("The quick, brown fox jumps"), {"the quick brown", "quick brown fox", "brown fox jumps"}
+        )
+        self.assertEqual(shingles("Short text"), {"short text"})
+        self.assertEqual(shingles(" ... "), set())
+
+    def test_minhash_similarity(self):
+        signature = minhash(shingles(STORY))
+        self.assertEqual(len(signature), NUM_PERM)
+        self.assertTrue((signature == minhash(shingles(STORY.upper()))).all())
+        self.assertLess((signature == minhash(shingles(OTHER_STORY))).mean(), 0.1)
+
+
+class TestClusterArticles(unittest.TestCase):
+    def test_near_duplicates_are_grouped(self):
+        articles = [
+            article("ZNBC", "Load-shedding hours to be reduced", STORY),
+            article("Diggers", "Parliament passes Cyber Security Bill", OTHER_STORY),
+            article(
+                "Mwebantu",
+                "Load-shedding to be reduced from next week",
+                STORY.replace("has announced", "announced") + " More to follow.",
+            ),
+            article("Times", "Load shedding hours reduced", STORY.replace("ZESCO said", "ZESCO also said")),
+        ]
+
+        # each cluster starts with its longest article, and clusters are in the order of their first article
+        self.assertEqual(cluster_articles(articles), [[2, 3, 0], [1]])
+
+    def test_distinct_articles_are_not_grouped(self):
+        articles = [
+            article("ZNBC", "Load-shedding hours to be reduced", STORY),
+            article("Diggers", "Parliament passes Cyber Security Bill", OTHER_STORY),
+        ]
+        self.assertEqual(cluster_articles(articles), [[0], [1]])
+
+    def test_articles_without_text_are_not_grouped(self):
+        articles = [article("ZNBC", "", ""), article("Mwebantu", "", "")]
+        self.assertEqual(cluster_articles(articles), [[0], [1]])
+        self.assertEqual(cluster_articles([]), [])
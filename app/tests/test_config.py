@@ -1,14 +1,28 @@
+import tempfile
 import unittest
+from pathlib import Path
 from unittest.mock import patch
 
+from peewee import OperationalError, PostgresqlDatabase, SqliteDatabase
+from playhouse.pool import PooledPostgresqlDatabase
 
-from app.core.db.config import close_database, initialize_database
+from app.core.db.config import (
+    _add_missing_columns,
+    _deduplicate_articles,
+    check_database,
+    close_database,
+    create_database,
+    initialize_database,
+)
+from app.core.db.models import Article, ArticleArchive, Episode, Mp3
 
 
 class TestDatabaseConfig(unittest.TestCase):
     @patch("app.core.db.config.database")
     def test_initialize_database(self, mock_db):
         """Test database initialization"""
+        mock_db.table_exists.return_value = False
+
         initialize_database()
 
         # Verify database connection was attempted
@@ -19,7 +33,7 @@ class TestDatabaseConfig(unittest.TestCase):
 
         # Check if the correct tables were passed
         tables_arg = mock_db.create_tables.call_args[0][0]
-        self.assertEqual(len(tables_arg), 3)  # Mp3, Episode, Article
+        self.assertEqual(len(tables_arg), 4)  # Mp3, Episode, Article, ArticleArchive
 
     @patch("app.core.db.config.database")
     def test_close_database(self, mock_db):
@@ -47,6 +61,96 @@ class TestDatabaseConfig(unittest.TestCase):
         mock_db.is_closed.assert_called_once()
         mock_db.close.assert_not_called()
 
+    def test_create_database(self):
+        pooled = create_database(pool_size=4)
+        self.assertIsInstance(pooled, PooledPostgresqlDatabase)
+        self.assertEqual(pooled._max_connections, 4)
+        self.assertTrue(pooled.is_closed())
+
+        unpooled = create_database(pool_size=0)
+        self.assertNotIsInstance(unpooled, PooledPostgresqlDatabase)
+        self.assertIsInstance(unpooled, PostgresqlDatabase)
+
+    def test_create_sqlite_database(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = create_database("sqlite", path=Path(tmp) / "data" / "zednews.sqlite3")
+            self.assertIsInstance(db, SqliteDatabase)
+
+            with patch("app.core.db.config.database", db), db.bind_ctx([Mp3, Episode, Article, ArticleArchive]):
+                self.assertTrue(check_database())
+                initialize_database()
+                self.assertEqual(db.execute_sql("PRAGMA journal_mode").fetchone()[0], "wal")
+                self.assertEqual(set(db.get_tables()), {"mp3", "episode", "article", "article_archive"})
+                close_database()
+
+        with self.assertRaises(ValueError):
+            create_database("mysql")
+
+    @patch("app.core.db.config.database")
+    def test_check_database(self, mock_db):
+        self.assertTrue(check_database())
+        mock_db.connection_context.assert_called_once()
+        mock_db.execute_sql.assert_called_once_with("SELECT 1")
+
+        mock_db.execute_sql.side_effect = OperationalError("could not connect to server")
+        with self.assertLogs(level="ERROR"):
+            self.assertFalse(check_database())
+
+
+class TestDeduplicateArticles(unittest.TestCase):
+    def setUp(self):
+        self.db = SqliteDatabase(":memory:")
+        self.db.bind([Article], bind_refs=False, bind_backrefs=False)
+        self.db.connect()
+        # the article table as created before the URL was unique
+        self.db.execute_sql(
+            "CREATE TABLE article (id INTEGER PRIMARY KEY, source TEXT, url TEXT, title TEXT, content TEXT, "
+            "category TEXT, date DATE, summary TEXT, episode_id INTEGER)"
+        )
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_duplicates_are_removed_before_the_unique_index_is_created(self):
+        # (in SQL, as the model's fields with defaults are missing from the table)
+        for url, title, summary, episode_id in [
+            ("a", "first", None, None),
+            ("a", "second", "A summary", None),
+            ("a", "third", "Another summary", 7),
+            ("b", "other", "Its summary", None),
+            ("b", "copy", None, 8),
+        ]:
+            self.db.execute_sql(
+                "INSERT INTO article (source, url, title, content, summary, episode_id) VALUES (?, ?, ?, ?, ?, ?)",
+                ("ZNBC", f"https://znbc.co.zm/{url}", title, ".", summary, episode_id),
+            )
+
+        with patch("app.core.db.config.database", self.db):
+            with self.assertLogs(level="WARNING"):
+                _deduplicate_articles()
+            _add_missing_columns([Article])
+            self.db.create_tables([Article], safe=True)
+            # once the index exists, nothing is done
+            with patch.object(Article, "delete") as mock_delete:
+                _deduplicate_articles()
+                mock_delete.assert_not_called()
+
+        # the first copy is kept, with the summary and episode it lacked from the earliest copy that had them
+        self.assertEqual(
+            sorted((a.title, a.summary, a.episode_id) for a in Article.select()),
+            [("first", "A summary", 7), ("other", "Its summary", 8)],
+        )
+
+    def test_missing_columns_are_added(self):
+        with patch("app.core.db.config.database", self.db):
+            _add_missing_columns([Article])
+            self.db.create_tables([Article], safe=True)
+
+        columns = [column.name for column in self.db.get_columns("article")]
+        self.assertIn("content_hash", columns)
+        self.assertIn("archived", columns)
+        self.assertIn(["content_hash"], [index.columns for index in self.db.get_indexes("article")])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,14 +1,23 @@
 import os
+import re
 import shutil
 import tempfile
 import unittest
+from pathlib import Path
 from unittest.mock import MagicMock, mock_open, patch
 
+from app.core.cache import DiskCache
+from app.core.news import digest
 from app.core.news.digest import (
+    clean_digest_output,
     create_news_digest,
     fix_markdown_headings,
     remove_title_headings,
 )
+from app.core.news.prompt import count_tokens
+
+# Model output, and the same cleaned by clean_digest_output (<name>.md, <name>.cleaned.md)
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "digests"
 
 
 class TestDigest(unittest.TestCase):
@@ -16,8 +25,14 @@ class TestDigest(unittest.TestCase):
         self.temp_dir = tempfile.mkdtemp()
         self.patcher_data_dir = patch("app.core.news.digest.DATA_DIR", self.temp_dir)
         self.mock_data_dir = self.patcher_data_dir.start()
+        self.patcher_llm_cache = patch(
+            "app.core.llm_cache.response_cache",
+            DiskCache(os.path.join(self.temp_dir, "cache"), max_bytes=1024 * 1024, ttl=60),
+        )
+        self.patcher_llm_cache.start()
 
     def tearDown(self):
+        self.patcher_llm_cache.stop()
         self.patcher_data_dir.stop()
         shutil.rmtree(self.temp_dir)
 
@@ -76,6 +91,162 @@ class TestDigest(unittest.TestCase):
         mock_exit.assert_called_once_with(1)
         mock_logger.error.assert_called_with("Generated digest is empty")
 
+    @patch("app.core.news.digest.client")
+    def test_create_news_digest_reused_for_unchanged_articles(self, mock_client):
+        news = [
+            {"source": "ZNBC", "title": "Title 1", "content": "Content 1", "url": "url1"},
+            {"source": "Mwebantu", "title": "Title 2", "content": "Content 2", "url": "url2"},
+        ]
+        dest = os.path.join(self.temp_dir, "digest.md")
+
+        def stream(content):
+            chunk = MagicMock()
+            chunk.choices = [MagicMock()]
+            chunk.choices[0].delta.content = content
+            chunk.choices[0].finish_reason = "stop"
+            return [chunk]
+
+        mock_client.chat.completions.create.side_effect = [stream("First Digest"), stream("Second Digest")]
+
+        self.assertEqual(create_news_digest(news, dest)["content"], "First Digest")
+        # the same articles, with whitespace-only changes, are not sent to the model again
+        news[0] = {**news[0], "content": "  Content 1\n"}
+        self.assertEqual(create_news_digest(news, dest)["content"], "First Digest")
+        self.assertEqual(mock_client.chat.completions.create.call_count, 1)
+
+        news[1] = {**news[1], "content": "Content 2, updated"}
+        self.assertEqual(create_news_digest(news, dest)["content"], "Second Digest")
+        self.assertEqual(mock_client.chat.completions.create.call_count, 2)
+
+    @patch("app.core.news.digest.client")
+    def test_create_news_digest_groups_near_duplicates(self, mock_client):
+        story = (
+            "The Bank of Zambia has maintained the monetary policy rate at 14.5 percent, citing inflation that "
+            "remains above the target band of 6 to 8 percent despite a stable kwacha over the last quarter."
+        )
+        news = [
+            {"source": "ZNBC", "title": "BoZ holds policy rate", "content": story, "url": "url1"},
+            {
+                "source": "Mwebantu",
+                "title": "Chipolopolo name squad",
+                "content": "Avram Grant names 25 players.",
+                "url": "url2",
+            },
+            {
+                "source": "Times of Zambia",
+                "title": "BoZ maintains rate",
+                "content": story + " More to follow.",
+                "url": "url3",
+            },
+        ]
+        dest = os.path.join(self.temp_dir, "digest.md")
+
+        chunk = MagicMock()
+        chunk.choices = [MagicMock()]
+        chunk.choices[0].delta.content = "Generated Digest"
+        mock_client.chat.completions.create.return_value = [chunk]
+
+        result = create_news_digest(news, dest)
+
+        prompt = mock_client.chat.completions.create.call_args.kwargs["messages"][1]["content"]
+        self.assertIn("1. BoZ maintains rate (source: Times of Zambia; also reported by: ZNBC)", prompt)
+        self.assertIn("2. Chipolopolo name squad (source: Mwebantu)", prompt)
+        self.assertNotIn("BoZ holds policy rate", prompt)
+        # every article is still listed, under the number of its story
+        self.assertEqual([article["id"] for article in result["articles"]], [1, 2, 1])
+        self.assertEqual(result["total_articles"], 3)
+
+    @patch("app.core.news.digest.client")
+    def test_create_news_digest_within_token_budget(self, mock_client):
+        news = [
+            {
+                "source": "ZNBC" if n % 2 else "Mwebantu",
+                "title": f"Title {n}",
+                "content": " ".join(f"story{n}-word{w}" for w in range(400)),
+                "url": f"url{n}",
+            }
+            for n in range(40)
+        ]
+        dest = os.path.join(self.temp_dir, "digest.md")
+
+        chunk = MagicMock()
+        chunk.choices = [MagicMock()]
+        chunk.choices[0].delta.content = "Generated Digest"
+        mock_client.chat.completions.create.return_value = [chunk]
+
+        with patch("app.core.news.digest.DIGEST_TOKEN_BUDGET", 2500):
+            result = create_news_digest(news, dest)
+
+        prompt = mock_client.chat.completions.create.call_args.kwargs["messages"][1]["content"]
+        self.assertLessEqual(count_tokens(prompt), 2500)
+        # the stories left out have no number, and both sources keep some
+        ids = [article["id"] for article in result["articles"]]
+        self.assertIn(None, ids)
+        numbered = [article for article in result["articles"] if article["id"] is not None]
+        self.assertEqual([article["id"] for article in numbered], list(range(1, len(numbered) + 1)))
+        self.assertEqual({article["source"] for article in numbered}, {"ZNBC", "Mwebantu"})
+        self.assertEqual(result["total_articles"], 40)
+
+    @patch("app.core.news.digest.DIGEST_MAP_REDUCE", True)
+    @patch("app.core.news.digest.client")
+    def test_create_news_digest_map_reduce(self, mock_client):
+        news = [
+            {
+                "source": "ZNBC" if n < 4 else "Mwebantu",
+                "title": f"Title {n}",
+                "content": " ".join(f"story{n}-word{w}" for w in range(100)),
+                "url": f"url{n}",
+            }
+            for n in range(6)
+        ]
+        dest = os.path.join(self.temp_dir, "digest.md")
+        fail_reduce = True
+
+        def stream(content):
+            chunk = MagicMock()
+            chunk.choices = [MagicMock()]
+            chunk.choices[0].delta.content = content
+            chunk.choices[0].finish_reason = "stop"
+            return [chunk]
+
+        def complete(**kwargs):
+            prompt = kwargs["messages"][1]["content"]
+            if "preparing notes" not in prompt:
+                if fail_reduce:
+                    raise RuntimeError("Service unavailable")
+                return stream("## Main Stories\n1. Digest")
+            if "Title 2" in prompt:
+                raise RuntimeError("Service unavailable")
+            titles = re.findall(r"^\s*(\d+\. Title \d+)", prompt, flags=re.MULTILINE)
+            return stream("\n".join(f"{title}\nNotes on {title}." for title in titles))
+
+        mock_client.chat.completions.create.side_effect = complete
+
+        with patch("app.core.news.digest.DIGEST_MAP_GROUP_TOKENS", 1200):
+            with self.assertRaises(RuntimeError):
+                create_news_digest(news, dest)
+            # the notes of the groups summarised are kept, so only the failed group and the digest are generated again
+            calls = mock_client.chat.completions.create.call_count
+            fail_reduce = False
+            result = create_news_digest(news, dest)
+
+        map_prompts = [
+            call.kwargs["messages"][1]["content"] for call in mock_client.chat.completions.create.call_args_list[:calls]
+        ]
+        # each group holds a single source's stories, within the token limit
+        self.assertEqual(len(map_prompts), 4)
+        self.assertTrue(all(count_tokens(prompt) <= 1200 for prompt in map_prompts[:-1]))
+        self.assertTrue(all("ZNBC" not in prompt or "Mwebantu" not in prompt for prompt in map_prompts[:-1]))
+        self.assertEqual(mock_client.chat.completions.create.call_count, calls + 2)
+
+        reduce_prompt = mock_client.chat.completions.create.call_args.kwargs["messages"][1]["content"]
+        self.assertIn("Notes on 1. Title 0.", reduce_prompt)
+        self.assertIn("Notes on 5. Title 4.", reduce_prompt)
+        # the group the model failed on goes in as excerpts
+        self.assertIn("3. Title 2 (source: ZNBC)\nstory2-word0", reduce_prompt)
+        self.assertEqual(result["content"], "## Main Stories\n1. Digest")
+        self.assertEqual([article["id"] for article in result["articles"]], [1, 2, 3, 4, 5, 6])
+
     @patch("app.core.news.digest.client")
     @patch("app.core.news.digest.logger")
     def test_create_news_digest_no_news(self, mock_logger, mock_client):
@@ -229,3 +400,41 @@ class TestDigest(unittest.TestCase):
                     f"Expected: {repr(test_case['expected'])}\n"
                     f"Got: {repr(result)}",
                 )
+
+    def test_clean_digest_output(self):
+        raw_files = sorted(path for path in FIXTURES_DIR.glob("*.md") if not path.name.endswith(".cleaned.md"))
+        self.assertTrue(raw_files)
+        for raw_file in raw_files:
+            with self.subTest(fixture=raw_file.name):
+                expected = raw_file.with_suffix(".cleaned.md").read_text()
+                self.assertEqual(clean_digest_output(raw_file.read_text()) + "\n", expected)
+
+    def test_clean_digest_output_line_by_line(self):
+        """The single pass over the lines cleans as the whole-text passes do, or leaves the text to them"""
+        digest_text = (FIXTURES_DIR / "2026-08-19.md").read_text()
+        self.assertEqual(digest._clean_lines(digest_text).strip(), digest._clean_passes(digest_text).strip())
+
+        cases = [
+            "# Title\n## Overview\nDropped\n## Key Stories\n1. **A**<br>\n\n   Text\n- Point\n\n\n\n* Point",
+            "Text\n## Overview",
+            "Text\n## Overview\n# Title",
+            "**Why this matters:** ## Overview\nDropped\n##\tWatch this",
+            "1. **[A](url)** <br/> Text &lt;br&gt;More <br>\n\n  After a break",
+        ]
+        for text in cases:
+            with self.subTest(text=text):
+                self.assertEqual(digest._clean_lines(text).strip(), digest._clean_passes(text).strip())
+
+        # a bare heading, label or bullet, or a link or line break split over lines, is joined to the next line
+        for text in [
+            "##\nOverview",
+            "**Why this matters:**\nText",
+            "*\nText",
+            "Text <br>\n",
+            "[A\nB](url)",
+            "*Why this matters:* why this matters:\nfoo",
+        ]:
+            with self.subTest(text=text):
+                with self.assertRaises(digest._AcrossLines):
+                    digest._clean_lines(text)
+                self.assertEqual(clean_digest_output(text), digest._clean_passes(text).strip())
@@ -15,13 +15,17 @@ class TestEleventify(unittest.TestCase):
         self.patcher_data_dir = patch("app.core.utilities.DATA_DIR", self.temp_dir)
         self.patcher_dist_file = patch("app.core.news.eleventify.dist_file", f"{self.temp_dir}/{today_iso_fmt}.njk")
 
+        self.patcher_llm_cache = patch("app.core.llm_cache.LLM_CACHE_ENABLED", False)
+
         self.mock_data_dir = self.patcher_data_dir.start()
         self.mock_dist_file = self.patcher_dist_file.start()
+        self.patcher_llm_cache.start()
 
         self.digest_metadata_file = os.path.join(self.mock_data_dir, f"{today_iso_fmt}/{today_iso_fmt}_digest.json")
         os.makedirs(os.path.dirname(self.digest_metadata_file), exist_ok=True)
 
     def tearDown(self):
+        self.patcher_llm_cache.stop()
         self.patcher_data_dir.stop()
         self.patcher_dist_file.stop()
         shutil.rmtree(self.temp_dir)
@@ -58,6 +62,22 @@ class TestEleventify(unittest.TestCase):
         mock_logger.info.assert_any_call("Rendering Jinja template for daily digest...")
         mock_logger.info.assert_any_call(f"Daily digest template rendered successfully: {dist_file_path}")
 
+    @patch("app.core.news.eleventify._dist_file")
+    @patch("app.core.news.eleventify.create_digest_description", return_value="A digest.")
+    @patch("app.core.news.eleventify.get_digest_metadata")
+    def test_render_jinja_template_for_another_date(self, mock_get_digest_metadata, mock_description, mock_dist_file):
+        mock_get_digest_metadata.return_value = {"content": "Content.", "sources": [], "articles": []}
+        mock_dist_file.return_value = dist_file_path = f"{self.temp_dir}/2026-10-10.njk"
+
+        render_jinja_template("2026-10-10")
+
+        mock_get_digest_metadata.assert_called_once_with("2026-10-10")
+        mock_dist_file.assert_called_once_with("2026-10-10")
+        with open(dist_file_path) as f:
+            content = f.read()
+        self.assertIn('title: "News Digest - Saturday, October 10th, 2026"', content)
+        self.assertIn("date: 2026-10-10T", content)
+
     def test_get_digest_metadata(self):
         mock_data = {"key": "value"}
         with open(self.digest_metadata_file, "w") as f:
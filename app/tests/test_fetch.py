@@ -1,10 +1,12 @@
+import datetime
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 from peewee import SqliteDatabase
 
 from app.core.db.models import Article
 from app.core.news.fetch import save_news_to_db, save_news_to_file
+from app.core.utilities import content_hash
 
 MODELS = [Article]
 test_db = SqliteDatabase(":memory:")
@@ -33,9 +35,6 @@ class TestSaveToDB(unittest.TestCase):
 
     @patch("app.core.news.fetch.logging")
     def test_save_news_to_db(self, mock_logging):
-        mock_create = MagicMock()
-        Article.create = mock_create
-
         news = [
             {
                 "source": "Example Site",
@@ -46,23 +45,66 @@ class TestSaveToDB(unittest.TestCase):
             for i in range(1, 4)
         ]
 
+        counts = save_news_to_db(news)
+
+        self.assertEqual(counts, (3, 0, 0))
+        self.assertEqual(
+            [(a.url, a.title, a.content) for a in Article.select().order_by(Article.id)],
+            [(item["url"], item["title"], item["content"]) for item in news],
+        )
+        mock_logging.info.assert_any_call("Saving news to the database ...")
+
+    @patch("app.core.news.fetch.logging")
+    def test_save_news_to_db_is_idempotent(self, mock_logging):
+        news = [
+            {"source": "Example Site", "url": f"https://example.com/article-{i}", "title": f"{i}", "content": f"{i}"}
+            for i in range(1, 4)
+        ]
+        save_news_to_db(news)
+        Article.update(summary="A summary").execute()
+
+        # unchanged apart from whitespace, changed, and new
+        news[0] = {**news[0], "title": "Updated title", "content": " 1\n"}
+        news[1] = {**news[1], "title": "Updated title", "content": "Updated content"}
+        news.append({"source": "Example Site", "url": "https://example.com/article-4", "title": "4", "content": "4"})
+        counts = save_news_to_db(news)
+
+        self.assertEqual(counts, (1, 1, 2))
+        self.assertEqual(Article.select().count(), 4)
+        unchanged = Article.get(Article.url == news[0]["url"])
+        self.assertEqual((unchanged.title, unchanged.content, unchanged.summary), ("1", "1", "A summary"))
+        changed = Article.get(Article.url == news[1]["url"])
+        self.assertEqual((changed.title, changed.content, changed.summary), ("Updated title", "Updated content", None))
+        self.assertEqual(changed.content_hash, content_hash("Updated content"))
+
+    @patch("app.core.news.fetch.is_partitioned", return_value=True)
+    @patch("app.core.news.fetch.logging")
+    def test_save_news_to_db_when_partitioned(self, mock_logging, mock_is_partitioned):
+        # the URL is only unique per date on a partitioned table
+        test_db.execute_sql("CREATE UNIQUE INDEX article_url_date ON article (url, date)")
+        news = [{"source": "Example Site", "url": "https://example.com/article-1", "title": "1", "content": "1"}]
         save_news_to_db(news)
+        Article.update(date=datetime.date(2026, 10, 1)).execute()
+
+        counts = save_news_to_db([{**news[0], "content": "Updated content"}])
+
+        self.assertEqual(counts, (0, 1, 0))
+        article = Article.get()
+        self.assertEqual((article.date, article.content), (datetime.date(2026, 10, 1), "Updated content"))
+
+    @patch("app.core.news.fetch.UPSERT_BATCH_SIZE", 2)
+    @patch("app.core.news.fetch.logging")
+    def test_save_news_to_db_in_batches(self, mock_logging):
+        news = [
+            {"source": "Example Site", "url": f"https://example.com/article-{i % 4}", "title": f"{i}", "content": "."}
+            for i in range(6)
+        ]
+
+        counts = save_news_to_db(news)
 
-        expected_calls = []
-        for article in news:
-            expected_calls.append(
-                unittest.mock.call(
-                    source=article["source"],
-                    url=article["url"],
-                    title=article["title"],
-                    content=article["content"],
-                ),
-            )
-        mock_create.assert_has_calls(expected_calls)
-
-        self.assertEqual(mock_create.call_count, len(news))
-
-        mock_logging.info.assert_called_once_with("Saving news to the database ...")
+        # the duplicates among the news count once, with their last copy stored
+        self.assertEqual(counts, (4, 0, 0))
+        self.assertEqual(Article.get(Article.url == "https://example.com/article-0").title, "4")
 
 
 class TestSaveToFile(unittest.TestCase):
@@ -67,7 +67,7 @@ class TestFXDataProcessor(unittest.TestCase):
                 self.mock_excel_data.to_excel(writer, sheet_name="Sheet1", index=False)
             return buffer.getvalue()
 
-    @patch("app.core.fx.processor.requests.get")
+    @patch("app.core.fx.processor.http_client.get")
     def test_fetch_data_success(self, mock_get):
         """Test successful data fetching from Bank of Zambia."""
         # Mock successful responses for the 3 sequential requests
@@ -96,7 +96,7 @@ class TestFXDataProcessor(unittest.TestCase):
         self.assertEqual(result, b"mock_excel_content")
         self.assertEqual(mock_get.call_count, 3)
 
-    @patch("app.core.fx.processor.requests.get")
+    @patch("app.core.fx.processor.http_client.get")
     def test_fetch_data_failure(self, mock_get):
         """Test data fetching failure handling."""
         # Mock request exception
@@ -0,0 +1,208 @@
+import io
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from app.core import http_client
+from app.core.cache import DiskCache
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+class TestHttpClient(unittest.TestCase):
+    def setUp(self):
+        http_client.close()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.patcher_breaker = patch(
+            "app.core.http_client.breaker",
+            CircuitBreaker(f"{self.temp_dir.name}/host_health.json", threshold=3, cooldown=60),
+        )
+        self.patcher_breaker.start()
+        self.patcher_sleep = patch("app.core.http_client.time.sleep")
+        self.mock_sleep = self.patcher_sleep.start()
+
+    def tearDown(self):
+        self.patcher_sleep.stop()
+        self.patcher_breaker.stop()
+        self.temp_dir.cleanup()
+        http_client.close()
+
+    def test_session_is_shared(self):
+        session = http_client.get_session()
+        self.assertIs(http_client.get_session(), session)
+
+        adapter = session.get_adapter("https://www.mwebantu.com/")
+        self.assertEqual(adapter._pool_maxsize, http_client.POOL_MAXSIZE)
+        self.assertIn("gzip", session.headers["Accept-Encoding"])
+
+    @patch("app.core.http_client.cloudscraper.create_scraper")
+    def test_scraper_is_created_once(self, mock_create_scraper):
+        mock_create_scraper.return_value = MagicMock()
+
+        first = http_client.get_scraper()
+        second = http_client.get_scraper()
+
+        self.assertIs(first, second)
+        mock_create_scraper.assert_called_once_with(browser="chrome")
+
+    @patch("app.core.http_client.get_session")
+    def test_get_uses_default_timeout(self, mock_get_session):
+        http_client.get("https://example.com", headers={"User-Agent": "test"})
+
+        mock_get_session.return_value.get.assert_called_once_with(
+            "https://example.com", timeout=http_client.DEFAULT_TIMEOUT, headers={"User-Agent": "test"}
+        )
+
+    @patch("app.core.http_client.get_scraper")
+    def test_get_with_scraper(self, mock_get_scraper):
+        http_client.get("https://diggers.news/article", scraper=True, timeout=5)
+
+        mock_get_scraper.return_value.get.assert_called_once_with("https://diggers.news/article", timeout=5)
+
+    @patch("app.core.http_client.get_session")
+    def test_retries_transient_failures(self, mock_get_session):
+        ok = MagicMock(status_code=200)
+        mock_get_session.return_value.get.side_effect = [requests.ConnectTimeout(), MagicMock(status_code=503), ok]
+
+        self.assertIs(http_client.get("https://www.times.co.zm/?p=1"), ok)
+        self.assertEqual(mock_get_session.return_value.get.call_count, 3)
+        self.assertEqual(self.mock_sleep.call_count, 2)
+
+    @patch("app.core.http_client.get_session")
+    def test_client_errors_are_not_retried(self, mock_get_session):
+        mock_get_session.return_value.get.return_value = MagicMock(status_code=404)
+
+        self.assertEqual(http_client.get("https://www.times.co.zm/?p=404").status_code, 404)
+        mock_get_session.return_value.get.assert_called_once()
+
+    @patch("app.core.http_client.get_session")
+    def test_failing_host_is_short_circuited(self, mock_get_session):
+        mock_get_session.return_value.get.side_effect = requests.ConnectionError()
+
+        with self.assertRaises(requests.ConnectionError):
+            http_client.get("https://diggers.news/article-1")
+        # the circuit opened on the third attempt, so there were no more retries
+        self.assertEqual(mock_get_session.return_value.get.call_count, 3)
+
+        with self.assertRaises(CircuitOpenError):
+            http_client.get("https://www.diggers.news/article-2")
+        self.assertEqual(mock_get_session.return_value.get.call_count, 3)
+
+    def test_backoff_is_capped(self):
+        for attempt in range(10):
+            delay = http_client.backoff(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, http_client.FETCH_BACKOFF_MAX)
+
+
+class TrackingBytesIO(io.BytesIO):
+    """A response body that counts how much of it was read"""
+
+    bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+class TestFetchPage(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.patcher_cache = patch(
+            "app.core.http_client.page_cache", DiskCache(self.temp_dir.name, max_bytes=1024 * 1024, ttl=60)
+        )
+        self.patcher_cache.start()
+
+    def tearDown(self):
+        self.patcher_cache.stop()
+        self.temp_dir.cleanup()
+
+    def make_response(self, status_code=200, content=b"<p>Muli shani</p>", content_type="text/html; charset=utf-8"):
+        response = requests.Response()
+        response.status_code = status_code
+        response.encoding = "utf-8"
+        response.headers["Content-Type"] = content_type
+        response.raw = TrackingBytesIO(content)
+        return response
+
+    def test_strip_query(self):
+        self.assertEqual(
+            http_client.strip_query("https://www.mwebantu.com/news/story/?utm_source=rss"),
+            "https://www.mwebantu.com/news/story/",
+        )
+
+    def test_cache_key(self):
+        self.assertEqual(
+            http_client.cache_key("HTTPS://WWW.Times.co.zm/?p=123#comments"),
+            "https://www.times.co.zm/?p=123",
+        )
+
+    @patch("app.core.http_client.get")
+    def test_pages_are_served_from_cache(self, mock_get):
+        mock_get.return_value = self.make_response()
+
+        first = http_client.fetch_page("https://www.times.co.zm/?p=1", headers={"User-Agent": "test"})
+        second = http_client.fetch_page("https://www.times.co.zm/?p=1#top")
+
+        mock_get.assert_called_once_with(
+            "https://www.times.co.zm/?p=1", scraper=False, stream=True, headers={"User-Agent": "test"}
+        )
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.text, first.text)
+        self.assertEqual(second.headers["content-type"], "text/html; charset=utf-8")
+
+        # a different article is not a cache hit
+        http_client.fetch_page("https://www.times.co.zm/?p=2")
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch("app.core.http_client.get")
+    def test_errors_are_not_cached(self, mock_get):
+        mock_get.return_value = self.make_response(status_code=503)
+
+        http_client.fetch_page("https://diggers.news/article", scraper=True)
+        http_client.fetch_page("https://diggers.news/article", scraper=True)
+
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch("app.core.http_client.get")
+    def test_reads_whole_page(self, mock_get):
+        # an <article> nested in the post (an embed, related posts) doesn't end the page
+        body = b"<html><article><p>Muli shani</p><article>Related</article><p>More</p></article></html>"
+        mock_get.return_value = self.make_response(content=body)
+
+        with patch("app.core.http_client.CHUNK_SIZE", 16):
+            response = http_client.fetch_page("https://www.mwebantu.com/story/")
+            cached = http_client.fetch_page("https://www.mwebantu.com/story/")
+
+        self.assertEqual(response.content, body)
+        self.assertEqual(cached.content, body)
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch("app.core.http_client.get")
+    def test_rejects_non_html(self, mock_get):
+        mock_get.return_value = self.make_response(content=b"\x89PNG", content_type="image/png")
+
+        with self.assertRaises(http_client.UnexpectedContentTypeError):
+            http_client.fetch_page("https://diggers.news/cartoons/today.png", scraper=True)
+
+    @patch("app.core.http_client.get")
+    def test_rejects_large_pages(self, mock_get):
+        mock_get.return_value = self.make_response(content=b"x" * 1000)
+
+        with self.assertRaises(http_client.PageTooLargeError):
+            http_client.fetch_page("https://www.times.co.zm/?p=3", max_bytes=100)
+
+        mock_get.return_value = self.make_response(content=b"x" * 1000)
+        mock_get.return_value.headers["Content-Length"] = "1000"
+
+        with self.assertRaises(http_client.PageTooLargeError):
+            http_client.fetch_page("https://www.times.co.zm/?p=3", max_bytes=100)
+        self.assertEqual(mock_get.return_value.raw.bytes_read, 0)
+        self.assertTrue(mock_get.return_value.raw.closed)
+        self.assertIsNone(http_client.page_cache.get(http_client.cache_key("https://www.times.co.zm/?p=3")))
+
+
+if __name__ == "__main__":
+    unittest.main()
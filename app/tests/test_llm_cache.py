@@ -0,0 +1,98 @@
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from app.core import llm_cache
+from app.core.cache import DiskCache
+from app.core.llm_cache import ModelResponse, cached_response, response_key
+from app.core.summarization.backends.together import summarize
+
+MESSAGES = [{"role": "user", "content": "Summarise today's news."}]
+
+
+class TestLLMCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.patcher_cache = patch.object(
+            llm_cache, "response_cache", DiskCache(self.temp_dir.name, max_bytes=1024 * 1024, ttl=60)
+        )
+        self.patcher_cache.start()
+
+    def tearDown(self):
+        self.patcher_cache.stop()
+        self.temp_dir.cleanup()
+
+    def test_response_key(self):
+        key = response_key("model", MESSAGES, temperature=0.7, max_tokens=100)
+        self.assertEqual(key, response_key("model", MESSAGES, max_tokens=100, temperature=0.7))
+        self.assertNotEqual(key, response_key("other-model", MESSAGES, temperature=0.7, max_tokens=100))
+        self.assertNotEqual(key, response_key("model", MESSAGES, temperature=0.6, max_tokens=100))
+        self.assertNotEqual(key, response_key("model", [{**MESSAGES[0], "content": "Other"}], temperature=0.7))
+        # the prompt itself is only kept as a hash
+        self.assertNotIn("Summarise", key)
+
+    def test_cached_response(self):
+        generate = MagicMock(side_effect=["First", "Second"])
+
+        self.assertEqual(cached_response(generate, "model", MESSAGES, temperature=0.7), "First")
+        self.assertEqual(cached_response(generate, "model", MESSAGES, temperature=0.7), "First")
+        self.assertEqual(generate.call_count, 1)
+
+        self.assertEqual(cached_response(generate, "model", MESSAGES, temperature=0.8), "Second")
+        self.assertEqual(generate.call_count, 2)
+
+    def test_empty_responses_are_not_cached(self):
+        generate = MagicMock(side_effect=["", " \n", "Response"])
+
+        self.assertEqual(cached_response(generate, "model", MESSAGES), "")
+        self.assertEqual(cached_response(generate, "model", MESSAGES), " \n")
+        self.assertEqual(cached_response(generate, "model", MESSAGES), "Response")
+        self.assertEqual(cached_response(generate, "model", MESSAGES), "Response")
+        self.assertEqual(generate.call_count, 3)
+
+    def test_incomplete_responses_are_not_cached(self):
+        generate = MagicMock(
+            side_effect=[
+                ModelResponse("Cut", None),
+                ModelResponse("Too lo", "length"),
+                ModelResponse("Response", "stop"),
+            ]
+        )
+
+        self.assertEqual(cached_response(generate, "model", MESSAGES), "Cut")
+        self.assertEqual(cached_response(generate, "model", MESSAGES), "Too lo")
+        self.assertEqual(cached_response(generate, "model", MESSAGES), "Response")
+        self.assertEqual(cached_response(generate, "model", MESSAGES), "Response")
+        self.assertEqual(generate.call_count, 3)
+
+    def test_failures_are_not_cached(self):
+        generate = MagicMock(side_effect=[RuntimeError("Service unavailable"), "Response"])
+
+        with self.assertRaises(RuntimeError):
+            cached_response(generate, "model", MESSAGES)
+        self.assertEqual(cached_response(generate, "model", MESSAGES), "Response")
+
+    def test_bypass(self):
+        generate = MagicMock(side_effect=["First", "Second"])
+
+        with patch.object(llm_cache, "LLM_CACHE_ENABLED", False):
+            self.assertEqual(cached_response(generate, "model", MESSAGES), "First")
+            self.assertEqual(cached_response(generate, "model", MESSAGES), "Second")
+        self.assertIsNone(llm_cache.response_cache.get(response_key("model", MESSAGES)))
+
+    @patch("app.core.summarization.backends.together.time.sleep")
+    @patch("app.core.summarization.backends.together.client")
+    def test_model_calls_are_cached(self, mock_client, mock_sleep):
+        mock_client.chat.completions.create.return_value.choices[0].message.content = "A synthesis."
+        mock_client.chat.completions.create.return_value.choices[0].finish_reason = "stop"
+
+        self.assertEqual(summarize("Content", "Title"), "A synthesis.")
+        self.assertEqual(summarize("Content", "Title"), "A synthesis.")
+        self.assertEqual(mock_client.chat.completions.create.call_count, 1)
+
+        summarize("Other content", "Title")
+        self.assertEqual(mock_client.chat.completions.create.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
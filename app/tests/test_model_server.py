@@ -0,0 +1,118 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from together import InternalServerError, Together
+
+from app.benchmarks.model_server import Behaviour, respond, serving
+from app.core.cache import DiskCache
+from app.core.news import digest
+
+FAST = Behaviour(latency=0, tokens_per_second=100_000)
+MESSAGES = [{"role": "user", "content": "Summarise this article."}]
+
+
+class TestModelServer(unittest.TestCase):
+    def test_respond(self):
+        prompt = digest.DIGEST_PROMPT.format(
+            digest_content="1. Title 1 (source: ZNBC)\nContent\n\n2. Title 2 (source: Mwebantu; also reported by: ZNBC)\n"
+        )
+        response = respond(prompt)
+        self.assertIn("## Main Stories\n1. Title 1\n", response)
+        self.assertIn("## Other Notable Stories\n**General:**\n* Title 2: ", response)
+        self.assertIn("## Key Takeaways & Watchpoints\n", response)
+
+        notes = respond(digest.MAP_PROMPT.format(digest_content="3. Title 3 (source: ZNBC)\nContent\n"))
+        self.assertTrue(notes.startswith("3. Title 3 (source: ZNBC)\n"))
+
+        self.assertTrue(respond("Summarise this article."))
+
+    def test_chat_completion(self):
+        with serving(FAST) as server:
+            client = Together(api_key="stand-in", base_url=server.url, max_retries=0)
+            completion = client.chat.completions.create(model="model", messages=MESSAGES, max_tokens=100)
+            self.assertEqual(completion.choices[0].message.content, respond("Summarise this article."))
+            self.assertGreater(completion.usage.completion_tokens, 0)
+
+            # responses are cut off at max_tokens
+            completion = client.chat.completions.create(model="model", messages=MESSAGES, max_tokens=2)
+            self.assertEqual(completion.choices[0].message.content, "A stand-in ")
+            self.assertEqual(server.requests, 2)
+
+    def test_streamed_chat_completion(self):
+        with serving(FAST) as server:
+            client = Together(api_key="stand-in", base_url=server.url, max_retries=0)
+            stream = client.chat.completions.create(model="model", messages=MESSAGES, max_tokens=100, stream=True)
+            chunks = [chunk.choices[0].delta.content for chunk in stream]
+            self.assertGreater(len(chunks), 1)
+            self.assertEqual("".join(chunks), respond("Summarise this article."))
+
+    def test_failures(self):
+        with serving(FAST._replace(failure_rate=1)) as server:
+            client = Together(api_key="stand-in", base_url=server.url, max_retries=0)
+            with self.assertRaises(InternalServerError):
+                client.chat.completions.create(model="model", messages=MESSAGES)
+
+    def test_disconnects(self):
+        with serving(FAST._replace(disconnect_rate=1)) as server:
+            client = Together(api_key="stand-in", base_url=server.url, max_retries=0)
+            stream = client.chat.completions.create(model="model", messages=MESSAGES, stream=True)
+            # the part of the response received before the break is kept
+            content = digest._collect_stream_content(stream)
+            self.assertTrue(respond("Summarise this article.").startswith(content))
+            self.assertLess(len(content), len(respond("Summarise this article.")))
+            self.assertIsNone(content.finish_reason)
+
+    def test_broken_off_digest_is_not_reused(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        news = [{"source": "ZNBC", "title": "Title 1", "content": "Content 1", "url": "url1"}]
+        dest = os.path.join(temp_dir, "digest.md")
+
+        with (
+            patch.object(digest, "DATA_DIR", temp_dir),
+            patch("app.core.llm_cache.LLM_CACHE_ENABLED", True),
+            patch(
+                "app.core.llm_cache.response_cache",
+                DiskCache(os.path.join(temp_dir, "cache"), max_bytes=1024 * 1024, ttl=60),
+            ),
+        ):
+            with (
+                serving(FAST._replace(disconnect_rate=1)) as server,
+                patch.object(digest, "client", Together(api_key="stand-in", base_url=server.url, max_retries=0)),
+            ):
+                broken = digest.create_news_digest(news, dest)
+            with (
+                serving(FAST) as server,
+                patch.object(digest, "client", Together(api_key="stand-in", base_url=server.url, max_retries=0)),
+            ):
+                result = digest.create_news_digest(news, dest)
+                self.assertEqual(server.requests, 1)
+
+        self.assertNotIn("## Key Takeaways", broken["content"])
+        self.assertIn("## Key Takeaways", result["content"])
+
+    def test_create_news_digest(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        news = [
+            {"source": "ZNBC", "title": "Title 1", "content": "Content 1", "url": "url1"},
+            {"source": "Mwebantu", "title": "Title 2", "content": "Content 2", "url": "url2"},
+        ]
+
+        with (
+            serving(FAST) as server,
+            patch.object(digest, "client", Together(api_key="stand-in", base_url=server.url, max_retries=0)),
+            patch.object(digest, "DATA_DIR", temp_dir),
+            patch("app.core.llm_cache.LLM_CACHE_ENABLED", False),
+        ):
+            result = digest.create_news_digest(news, os.path.join(temp_dir, "digest.md"))
+
+        self.assertIn("## Main Stories\n1. Title 1", result["content"])
+        self.assertIn("* Title 2: ", result["content"])
+
+
+if __name__ == "__main__":
+    unittest.main()
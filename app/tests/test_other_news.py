@@ -1,11 +1,16 @@
+import json
+import tempfile
 import unittest
+from dataclasses import replace
 from datetime import datetime, timezone
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 from urllib.parse import urlparse
 
 from feedparser.util import FeedParserDict
 
 from app.core.news.other import (
+    SOURCES,
     URLs,
     get_daily_mail_article_detail,
     get_description,
@@ -13,9 +18,9 @@ from app.core.news.other import (
     get_feed_title,
     get_muvitv_article_detail,
     get_mwebantu_article_detail,
+    get_rss_feed_entries,
 )
-
-# from app.core.news.other import get_rss_feed_entries,
+from app.core.news.sources import SourceRegistry
 
 
 def mock_parse(url, *args, **kwargs):
@@ -76,6 +81,20 @@ def mock_parse(url, *args, **kwargs):
         )
 
 
+def mock_parse_content(content, *args, **kwargs):
+    """
+    Mocks feedparser.parse() being given the body of a mock_feed_response()
+    """
+    return mock_parse(content.decode())
+
+
+def mock_feed_response(url, *args, **kwargs):
+    """
+    Mocks the HTTP response for a feed, with the feed URL as its body
+    """
+    return MagicMock(status_code=200, headers={}, content=url.encode())
+
+
 class TestOtherNews(unittest.TestCase):
     def setUp(self):
         self.daily_mail_url = "http://www.daily-mail.co.zm/article"
@@ -84,7 +103,16 @@ class TestOtherNews(unittest.TestCase):
         self.diggers_url = "https://diggers.news/article"
         self.invalid_url = "http://www.example.com/invalid"
 
-    @patch("app.core.news.other.requests.get")
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.feed_state_file = Path(self.temp_dir.name) / "feed_state.json"
+        self.patcher_feed_state = patch("app.core.news.other.FEED_STATE_FILE", self.feed_state_file)
+        self.patcher_feed_state.start()
+
+    def tearDown(self):
+        self.patcher_feed_state.stop()
+        self.temp_dir.cleanup()
+
+    @patch("app.core.news.other.http_client.fetch_page")
     def test_get_daily_mail_article_detail(self, mock_get):
         mock_response = MagicMock()
         mock_response.text = """
@@ -105,7 +133,7 @@ class TestOtherNews(unittest.TestCase):
         article_detail = get_daily_mail_article_detail(self.daily_mail_url)
         self.assertEqual(article_detail, "Paragraph 1.\nParagraph 2.")
 
-    @patch("app.core.news.other.requests.get")
+    @patch("app.core.news.other.http_client.fetch_page")
     def test_get_mwebantu_article_detail(self, mock_get):
         mock_response = MagicMock()
         mock_response.text = """
@@ -125,7 +153,7 @@ class TestOtherNews(unittest.TestCase):
         article_detail = get_mwebantu_article_detail(self.mwebantu_url)
         self.assertEqual(article_detail, "Paragraph 1.\nParagraph 2.")
 
-    @patch("app.core.news.other.requests.get")
+    @patch("app.core.news.other.http_client.fetch_page")
     def test_get_muvitv_article_detail(self, mock_get):
         mock_response = MagicMock()
         mock_response.text = """
@@ -146,8 +174,8 @@ class TestOtherNews(unittest.TestCase):
         article_detail = get_muvitv_article_detail(self.muvitv_url)
         self.assertEqual(article_detail, "Paragraph 0.\nParagraph 1.")
 
-    @patch("app.core.news.other.cloudscraper.create_scraper")
-    def test_get_diggers_article_detail(self, mock_create_scraper):
+    @patch("app.core.news.other.http_client.fetch_page")
+    def test_get_diggers_article_detail(self, mock_get):
         mock_response = MagicMock()
         mock_response.text = """
         <html>
@@ -160,47 +188,55 @@ class TestOtherNews(unittest.TestCase):
         </html>
         """
 
-        mock_scraper = MagicMock()
-        mock_scraper.get.return_value = mock_response
-        mock_create_scraper.return_value = mock_scraper
+        mock_get.return_value = mock_response
 
         article_detail = get_diggers_article_detail(self.diggers_url)
         self.assertEqual(article_detail, "Paragraph 0.\nParagraph 1.")
+        # Diggers sits behind Cloudflare, so it goes through the shared cloudscraper session
+        mock_get.assert_called_once_with(self.diggers_url, scraper=True)
+
+    @patch("app.core.news.other.http_client.fetch_page")
+    def test_get_description(self, mock_get):
+        mock_daily_mail = MagicMock(return_value="Daily Mail Article content")
+        mock_mwebantu = MagicMock(return_value="Mwebantu Article content")
+        mock_muvitv = MagicMock(return_value="Muvi TV Article content")
+        mock_diggers = MagicMock(return_value="Diggers News Article content")
+
+        extractors = {
+            "daily-mail.co.zm": mock_daily_mail,
+            "mwebantu.com": mock_mwebantu,
+            "muvitv.com": mock_muvitv,
+            "diggers.news": mock_diggers,
+        }
+        registry = SourceRegistry(
+            replace(source, extractor=extractors.get(source.host, source.extractor)) for source in SOURCES
+        )
 
-    @patch("app.core.news.other.get_daily_mail_article_detail")
-    @patch("app.core.news.other.get_mwebantu_article_detail")
-    @patch("app.core.news.other.get_muvitv_article_detail")
-    @patch("app.core.news.other.get_diggers_article_detail")
-    @patch("app.core.news.other.requests.get")
-    def test_get_description(self, mock_get, mock_diggers, mock_muvitv, mock_mwebantu, mock_daily_mail):
-        mock_daily_mail.return_value = "Daily Mail Article content"
-        mock_mwebantu.return_value = "Mwebantu Article content"
-        mock_muvitv.return_value = "Muvi TV Article content"
-        mock_diggers.return_value = "Diggers News Article content"
-
-        # Daily Mail
-        description = get_description(self.daily_mail_url)
-        self.assertEqual(description, "Daily Mail Article content")
+        with patch("app.core.news.other.SOURCES", registry):
+            # Daily Mail
+            description = get_description(self.daily_mail_url)
+            self.assertEqual(description, "Daily Mail Article content")
 
-        # Mwebantu
-        description = get_description(self.mwebantu_url)
-        self.assertEqual(description, "Mwebantu Article content")
+            # Mwebantu
+            description = get_description(self.mwebantu_url)
+            self.assertEqual(description, "Mwebantu Article content")
 
-        # Muvi TV
-        description = get_description(self.muvitv_url)
-        self.assertEqual(description, "Muvi TV Article content")
+            # Muvi TV
+            description = get_description(self.muvitv_url)
+            self.assertEqual(description, "Muvi TV Article content")
 
-        # Diggers News
-        description = get_description(self.diggers_url)
-        self.assertEqual(description, "Diggers News Article content")
+            # Diggers News
+            description = get_description(self.diggers_url)
+            self.assertEqual(description, "Diggers News Article content")
 
-        # Invalid URL
-        mock_response = MagicMock()
-        mock_response.text = "<html><body>Invalid URL</body></html>"
-        mock_get.return_value = mock_response
+            # Invalid URL
+            mock_response = MagicMock()
+            mock_response.text = "<html><body>Invalid URL</body></html>"
+            mock_get.return_value = mock_response
 
-        description = get_description(self.invalid_url)
-        self.assertIsNone(description)
+            description = get_description(self.invalid_url)
+            self.assertIsNone(description)
+            mock_get.assert_not_called()
 
     def test_get_feed_title(self):
         # Daily Mail
@@ -223,6 +259,83 @@ class TestOtherNews(unittest.TestCase):
         feed_title = get_feed_title(self.invalid_url)
         self.assertIsNone(feed_title)
 
+    @patch("app.core.news.other.get_description")
+    @patch("app.core.news.other.feedparser.parse", side_effect=mock_parse_content)
+    @patch("app.core.news.other.http_client.get", side_effect=mock_feed_response)
+    def test_get_rss_feed_entries_concurrently(self, mock_get, mock_feedparser_parse, mock_get_description):
+        def fake_description(url):
+            if "diggers.news" in url:
+                raise ConnectionError("site is down")
+            if url.endswith("article2"):
+                return None
+            return f"Content of {url}"
+
+        mock_get_description.side_effect = fake_description
+
+        with patch("app.core.news.other.today_iso_fmt", datetime.now(timezone.utc).date().isoformat()):
+            with self.assertLogs("app.core.news.other", level="ERROR"):
+                result = get_rss_feed_entries()
+
+        # one article per feed, except Diggers whose fetches fail, in feed order
+        expected_urls = [url for url in URLs if "diggers.news" not in url]
+        self.assertEqual(len(result), len(expected_urls))
+        for item, url in zip(result, expected_urls, strict=True):
+            parsed_url = urlparse(url)
+            base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+            self.assertEqual(item["source"], get_feed_title(url))
+            self.assertEqual(item["url"], f"{base_url}/article1")
+            self.assertEqual(item["content"], f"Content of {base_url}/article1")
+        self.assertEqual(mock_get_description.call_count, 2 * len(URLs))
+
+    @patch("app.core.news.other.get_description", return_value="Article content")
+    @patch("app.core.news.other.feedparser.parse", side_effect=mock_parse_content)
+    @patch("app.core.news.other.http_client.get")
+    def test_get_rss_feed_entries_conditional_get(self, mock_get, mock_feedparser_parse, mock_get_description):
+        def first_run(url, *args, **kwargs):
+            response = mock_feed_response(url)
+            response.headers = {"ETag": f'"{url}-etag"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}
+            return response
+
+        today = datetime.now(timezone.utc).date().isoformat()
+        with patch("app.core.news.other.today_iso_fmt", today):
+            mock_get.side_effect = first_run
+            first_result = get_rss_feed_entries()
+
+            # validators are sent back on the next run, and a 304 reuses the stored entries
+            mock_get.side_effect = lambda url, *args, **kwargs: MagicMock(status_code=304)
+            mock_feedparser_parse.reset_mock()
+            second_result = get_rss_feed_entries()
+
+        self.assertEqual(len(first_result), 2 * len(URLs))
+        self.assertEqual(second_result, first_result)
+        mock_feedparser_parse.assert_not_called()
+
+        url, headers = mock_get.call_args[0][0], mock_get.call_args[1]["headers"]
+        self.assertEqual(headers["If-None-Match"], f'"{url}-etag"')
+        self.assertEqual(headers["If-Modified-Since"], "Mon, 01 Jan 2024 00:00:00 GMT")
+
+        state = json.loads(self.feed_state_file.read_text())
+        self.assertEqual(set(state), set(URLs))
+
+    @patch("app.core.news.other.get_description", return_value="Article content")
+    @patch("app.core.news.other.http_client.get")
+    def test_get_rss_feed_entries_from_fetched_feeds(self, mock_get, mock_get_description):
+        feeds = [
+            {
+                "entries": [
+                    {"link": "https://diggers.news/a", "title": "A", "published": "Fri, 16 Oct 2026 08:00:00 +0200"},
+                    {"link": "https://diggers.news/b", "title": "B", "published": "Sat, 17 Oct 2026 08:00:00 +0200"},
+                ]
+            },
+            None,
+        ]
+
+        result = get_rss_feed_entries("2026-10-16", feeds)
+
+        # the feeds aren't fetched again
+        mock_get.assert_not_called()
+        self.assertEqual([item["url"] for item in result], ["https://diggers.news/a"])
+
     # @patch("app.core.news.other.get_description")
     # @patch("app.core.news.other.feedparser.parse", return_value=MagicMock())
     # def test_get_rss_feed_entries(self, mock_feedparser_parse, mock_get_description):
@@ -0,0 +1,90 @@
+import datetime
+import unittest
+from unittest.mock import MagicMock, patch
+
+from peewee import PostgresqlDatabase, SqliteDatabase
+
+from app.core.db.config import initialize_database
+from app.core.db.partitions import create_partitions, detach_partitions, is_partitioned, partition_name
+
+
+def mock_database(existing=()):
+    """A mock database, whose article table has the ``existing`` partitions"""
+    db = MagicMock()
+    db.execute_sql.return_value.fetchall.return_value = [(name,) for name in existing]
+    return db
+
+
+def statements(db):
+    return [call.args[0] for call in db.execute_sql.call_args_list if "pg_inherits" not in call.args[0]]
+
+
+class TestPartitions(unittest.TestCase):
+    def test_partition_name(self):
+        self.assertEqual(partition_name(datetime.date(2026, 10, 17)), "article_p2026_10")
+        self.assertEqual(partition_name(datetime.date(2027, 1, 1)), "article_p2027_01")
+
+    def test_is_partitioned(self):
+        self.assertFalse(is_partitioned(SqliteDatabase(":memory:")))
+
+    def test_create_partitions(self):
+        db = mock_database(existing=["article_p2026_11"])
+
+        created = create_partitions(datetime.date(2026, 10, 17), datetime.date(2027, 1, 1), db)
+
+        self.assertEqual(created, ["article_p2026_10", "article_p2026_12", "article_p2027_01", "article_p_default"])
+        self.assertEqual(
+            statements(db)[:2],
+            [
+                "CREATE TABLE article_p2026_10 PARTITION OF article FOR VALUES FROM ('2026-10-01') TO ('2026-11-01')",
+                "CREATE TABLE article_p2026_12 PARTITION OF article FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')",
+            ],
+        )
+        self.assertEqual(statements(db)[-1], "CREATE TABLE article_p_default PARTITION OF article DEFAULT")
+
+    def test_detach_partitions(self):
+        db = mock_database(existing=["article_p2026_04", "article_p2026_05", "article_p2026_06", "article_p_default"])
+
+        self.assertEqual(detach_partitions(datetime.date(2026, 6, 15), db=db), ["article_p2026_04", "article_p2026_05"])
+        self.assertEqual(
+            statements(db),
+            [
+                "ALTER TABLE article DETACH PARTITION article_p2026_04",
+                "ALTER TABLE article DETACH PARTITION article_p2026_05",
+            ],
+        )
+
+    def test_detach_and_drop_partitions(self):
+        db = mock_database(existing=["article_p2026_04", "article_p2026_05"])
+
+        detach_partitions(datetime.date(2026, 5, 1), drop=True, db=db)
+
+        self.assertEqual(
+            statements(db),
+            [
+                "ALTER TABLE article DETACH PARTITION article_p2026_04",
+                "DELETE FROM article_archive WHERE article_id IN (SELECT id FROM article_p2026_04)",
+                "DROP TABLE article_p2026_04",
+            ],
+        )
+
+
+class TestInitializePartitionedDatabase(unittest.TestCase):
+    @patch("app.core.db.partitions.convert_to_partitioned")
+    @patch("app.core.db.partitions.create_upcoming_partitions", return_value=[])
+    @patch("app.core.db.partitions.create_partition_indexes")
+    @patch("app.core.db.partitions.is_partitioned", return_value=True)
+    @patch("app.core.db.search.create_search_index")
+    @patch("app.core.db.config.database", new_callable=lambda: MagicMock(spec=PostgresqlDatabase))
+    def test_partitioned_article_table(self, mock_db, mock_search_index, mock_is_partitioned, *mocks):
+        mock_create_indexes, mock_create_partitions, mock_convert = mocks
+        mock_db.table_exists.return_value = False
+
+        initialize_database()
+
+        mock_convert.assert_not_called()
+        # the article table's indexes are left to create_partition_indexes
+        tables = [model.__name__ for model in mock_db.create_tables.call_args[0][0]]
+        self.assertEqual(tables, ["Mp3", "Episode", "ArticleArchive"])
+        mock_create_indexes.assert_called_once_with(mock_db)
+        mock_create_partitions.assert_called_once_with(mock_db)
@@ -19,8 +19,11 @@ class TestSocialPost(unittest.TestCase):
         self.digest_dir = os.path.join(self.temp_dir, today_iso_fmt)
         os.makedirs(self.digest_dir, exist_ok=True)
         post.digest_file_path = os.path.join(self.digest_dir, f"{today_iso_fmt}_digest.json")
+        self.patcher_llm_cache = patch("app.core.llm_cache.LLM_CACHE_ENABLED", False)
+        self.patcher_llm_cache.start()
 
     def tearDown(self):
+        self.patcher_llm_cache.stop()
         shutil.rmtree(self.temp_dir)
 
     def test_get_digest_content_success(self):
@@ -0,0 +1,113 @@
+import unittest
+from unittest.mock import patch
+
+from app.core.news import prompt
+from app.core.news.prompt import (
+    CHARS_PER_TOKEN,
+    MAX_EXCERPT_TOKENS,
+    MIN_EXCERPT_TOKENS,
+    Story,
+    build_prompt,
+    count_tokens,
+    group_stories,
+    truncate_tokens,
+)
+
+TEMPLATE = "Summarise these stories:\n{digest_content}"
+
+
+def story(source, title, words, others=(), articles=1, position=0):
+    return Story(title, source, " ".join(f"w{n:03}" for n in range(words)), list(others), articles, position)
+
+
+class TestPrompt(unittest.TestCase):
+    def setUp(self):
+        # token counts are estimated from the length of the text, independently of the encoding's availability
+        self.patcher = patch.object(prompt, "_encoding", return_value=None)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_count_and_truncate_tokens(self):
+        text = "x" * (10 * CHARS_PER_TOKEN)
+        self.assertEqual(count_tokens(text), 10)
+        self.assertEqual(count_tokens(text + "x"), 11)
+        self.assertEqual(truncate_tokens(text, 10), text)
+        self.assertEqual(truncate_tokens(text, 5), "x" * (5 * CHARS_PER_TOKEN) + "…")
+
+    def test_light_day_is_sent_whole(self):
+        stories = [story("ZNBC", "Title 1", 20), story("Mwebantu", "Title 2", 30, others=["ZNBC"], articles=2)]
+
+        result = build_prompt(TEMPLATE, stories, budget=10_000)
+
+        self.assertEqual(result.stories, [0, 1])
+        self.assertEqual(
+            result.content,
+            f"1. Title 1 (source: ZNBC)\n{stories[0].text}\n\n"
+            f"2. Title 2 (source: Mwebantu; also reported by: ZNBC)\n{stories[1].text}\n\n",
+        )
+        self.assertEqual(result.text, TEMPLATE.format(digest_content=result.content))
+        self.assertEqual(result.tokens, count_tokens(result.text))
+
+    def test_long_excerpts_are_capped(self):
+        result = build_prompt(TEMPLATE, [story("ZNBC", "Title", 2 * MAX_EXCERPT_TOKENS)], budget=100_000)
+
+        excerpt = result.content.split("\n")[1]
+        self.assertTrue(excerpt.endswith("…"))
+        self.assertEqual(count_tokens(excerpt.removesuffix("…")), MAX_EXCERPT_TOKENS)
+
+    def test_busy_day_fits_the_budget(self):
+        stories = [story(f"Source {n % 3}", f"Title {n}", 400, position=n // 3) for n in range(30)]
+        # a widely reported story
+        stories[20] = story("Source 2", "Title 20", 400, others=["Source 0", "Source 1"], articles=4, position=6)
+
+        result = build_prompt(TEMPLATE, stories, budget=4000)
+
+        self.assertLessEqual(result.tokens, 4000)
+        self.assertEqual(result.stories, list(range(30)))
+        excerpts = dict(zip(result.stories, result.content.split("\n\n"), strict=False))
+        # it keeps more of its text than the stories around it, and the newest story more than the oldest
+        self.assertGreater(len(excerpts[20]), len(excerpts[19]))
+        self.assertGreater(len(excerpts[0]), len(excerpts[27]))
+        self.assertTrue(all(count_tokens(excerpt) > MIN_EXCERPT_TOKENS for excerpt in excerpts.values()))
+
+    def test_stories_are_left_out_by_source_in_turn(self):
+        # one prolific source, and two with a single story each
+        stories = [story("ZNBC", f"ZNBC {n}", 200, position=n) for n in range(10)]
+        stories += [story("Mwebantu", "Mwebantu 0", 200), story("Diggers", "Diggers 0", 200)]
+
+        result = build_prompt(TEMPLATE, stories, budget=600)
+
+        self.assertLessEqual(result.tokens, 600)
+        self.assertIn(10, result.stories)
+        self.assertIn(11, result.stories)
+        self.assertIn(0, result.stories)
+        self.assertLess(len(result.stories), len(stories))
+        # the kept stories are numbered in their original order
+        self.assertEqual(result.stories, sorted(result.stories))
+        self.assertIn("1. ZNBC 0 (source: ZNBC)", result.content)
+
+    def test_nothing_fits(self):
+        result = build_prompt(TEMPLATE, [story("ZNBC", "Title", 200)], budget=5)
+
+        self.assertEqual(result.stories, [])
+        self.assertEqual(result.text, TEMPLATE.format(digest_content=""))
+
+    def test_numbering_from(self):
+        result = build_prompt(TEMPLATE, [story("ZNBC", "Title", 20)], budget=10_000, first=7)
+
+        self.assertTrue(result.content.startswith("7. Title (source: ZNBC)\n"))
+
+    def test_group_stories(self):
+        # about 100 tokens each, with its heading
+        stories = [story("ZNBC" if n < 5 else "Mwebantu", f"Title {n}", 70) for n in range(7)]
+        stories.insert(2, story("ZNBC", "Long", 3 * MAX_EXCERPT_TOKENS))
+
+        groups = group_stories(stories, budget=250)
+
+        self.assertEqual(groups, [[0, 1], [2], [3, 4], [5], [6, 7]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import requests
+from requests.adapters import BaseAdapter
+
+from app.core import http_client, recording
+from app.core.cache import DiskCache
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.news.other import extract_mwebantu_article, get_mwebantu_article_detail
+from app.core.news.parsing import make_soup
+from app.core.recording import HttpArchive, NotRecordedError
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "html"
+
+
+class StubAdapter(BaseAdapter):
+    """Answers every request with the next of the given (status, body) pairs"""
+
+    def __init__(self, responses):
+        super().__init__()
+        self.responses = list(responses)
+
+    def send(self, request, **kwargs):
+        status, body = self.responses.pop(0)
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        response.status_code = status
+        response.headers["Content-Type"] = "text/html; charset=utf-8"
+        response.headers["Content-Length"] = str(len(body))
+        response._content = body
+        return response
+
+    def close(self):
+        pass
+
+
+class TestHttpArchive(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / "run.zip"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def record(self, responses, urls):
+        archive = HttpArchive({"date": "2026-10-17"})
+        session = requests.Session()
+        session.mount("https://", StubAdapter(responses))
+        recording.install(session, archive, recording.RECORD)
+        for url in urls:
+            session.get(url)
+        archive.save(self.path)
+        return archive
+
+    def test_record_and_replay(self):
+        self.record(
+            [(503, b"down"), (200, b"<p>Muli shani</p>"), (200, b"<p>Muli shani</p>")],
+            ["https://www.times.co.zm/?p=1", "https://www.times.co.zm/?p=1#top", "https://www.times.co.zm/?p=2"],
+        )
+
+        archive = HttpArchive.load(self.path)
+        self.assertEqual(archive.meta, {"date": "2026-10-17"})
+        self.assertEqual(len(archive), 3)
+
+        session = requests.Session()
+        recording.install(session, archive, recording.REPLAY)
+
+        # a request sent several times gets its responses in turn, then the last one
+        self.assertEqual(session.get("https://www.times.co.zm/?p=1").status_code, 503)
+        response = session.get("https://www.times.co.zm/?p=1")
+        self.assertEqual((response.status_code, response.text), (200, "<p>Muli shani</p>"))
+        self.assertEqual(response.headers["Content-Type"], "text/html; charset=utf-8")
+        self.assertNotIn("Content-Length", response.headers)
+        self.assertEqual(session.get("https://www.times.co.zm/?p=1").status_code, 200)
+
+        archive.rewind()
+        self.assertEqual(session.get("https://www.times.co.zm/?p=1").status_code, 503)
+
+        with self.assertRaises(NotRecordedError):
+            session.get("https://www.times.co.zm/?p=3")
+
+    def test_bodies_are_stored_once(self):
+        archive = self.record([(200, b"same"), (200, b"same")], ["https://a.example/", "https://b.example/"])
+        self.assertEqual(len(archive._bodies), 1)
+
+    def test_pages(self):
+        archive = self.record(
+            [(200, b"<p>1</p>"), (503, b"Unavailable"), (200, b"<p>2</p>")],
+            ["https://a.example/", "https://b.example/", "https://b.example/"],
+        )
+        pages = [("https://a.example/", b"<p>1</p>"), ("https://b.example/", b"<p>2</p>")]
+        self.assertEqual(list(archive.pages()), pages)
+        self.assertEqual(list(HttpArchive.load(self.path).pages()), pages)
+
+    def test_replay_through_http_client(self):
+        url = "https://www.mwebantu.com/story/"
+        html = (FIXTURES_DIR / "mwebantu.html").read_bytes()
+        self.record([(200, html)], [url])
+
+        with (
+            patch(
+                "app.core.http_client.page_cache",
+                DiskCache(Path(self.temp_dir.name) / "http", max_bytes=1024 * 1024, ttl=60),
+            ),
+            patch("app.core.http_client.breaker", CircuitBreaker(self.path.with_suffix(".json"), 3, 60)),
+        ):
+            http_client.use_archive(HttpArchive.load(self.path), recording.REPLAY)
+            try:
+                content = get_mwebantu_article_detail(url)
+            finally:
+                http_client.use_archive(None)
+
+        self.assertEqual(content, extract_mwebantu_article(make_soup(html)))
+        self.assertTrue(content)
+
+
+if __name__ == "__main__":
+    unittest.main()
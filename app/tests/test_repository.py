@@ -0,0 +1,94 @@
+import datetime
+import unittest
+from unittest.mock import patch
+
+from peewee import SqliteDatabase
+
+from app.core.db import repository
+from app.core.db.models import Article, Episode, Mp3
+
+MODELS = [Mp3, Episode, Article]
+test_db = SqliteDatabase(":memory:")
+
+DAY_1 = datetime.date(2026, 10, 15)
+DAY_2 = datetime.date(2026, 10, 16)
+DAY_3 = datetime.date(2026, 10, 17)
+
+
+class TestRepository(unittest.TestCase):
+    def setUp(self):
+        test_db.bind(MODELS, bind_refs=False, bind_backrefs=False)
+        test_db.connect()
+        test_db.create_tables(MODELS)
+
+        rows = [
+            (DAY_1, "ZNBC", "https://znbc.co.zm/1"),
+            (DAY_1, "Mwebantu", "https://www.mwebantu.com/1"),
+            (DAY_2, "ZNBC", "https://znbc.co.zm/2"),
+            (DAY_2, "ZNBC", "https://znbc.co.zm/3"),
+            (DAY_3, "Mwebantu", "https://www.mwebantu.com/2"),
+        ]
+        for date, source, url in rows:
+            Article.create(date=date, source=source, url=url, title=url, content=f"Content of {url}")
+
+    def tearDown(self):
+        test_db.drop_tables(MODELS)
+        test_db.close()
+
+    def test_indexes(self):
+        indexes = {tuple(index.columns): index.unique for index in test_db.get_indexes("article")}
+        self.assertEqual(indexes[("url",)], True)
+        self.assertEqual(indexes[("date",)], False)
+        self.assertEqual(indexes[("source", "date")], False)
+        self.assertIn(["date"], [index.columns for index in test_db.get_indexes("episode")])
+
+    def test_articles_between(self):
+        articles = repository.articles_between(DAY_1, DAY_2)
+        self.assertEqual(
+            [a.url for a in articles],
+            ["https://znbc.co.zm/1", "https://www.mwebantu.com/1", "https://znbc.co.zm/2", "https://znbc.co.zm/3"],
+        )
+        self.assertEqual(articles[0].content, "Content of https://znbc.co.zm/1")
+
+        articles = repository.articles_between(DAY_1, DAY_3, source="Mwebantu", with_content=False)
+        self.assertEqual([a.url for a in articles], ["https://www.mwebantu.com/1", "https://www.mwebantu.com/2"])
+        self.assertIsNone(articles[0].content)
+
+    def test_daily_counts_by_source(self):
+        self.assertEqual(
+            repository.daily_counts_by_source(DAY_1, DAY_3),
+            {
+                DAY_1: {"Mwebantu": 1, "ZNBC": 1},
+                DAY_2: {"ZNBC": 2},
+                DAY_3: {"Mwebantu": 1},
+            },
+        )
+        self.assertEqual(repository.daily_counts_by_source(DAY_3, DAY_3), {DAY_3: {"Mwebantu": 1}})
+
+    @patch("app.core.db.repository.LOOKUP_BATCH_SIZE", 2)
+    def test_seen_urls(self):
+        urls = ["https://znbc.co.zm/1", "https://znbc.co.zm/4", "https://znbc.co.zm/3", "https://znbc.co.zm/1"]
+        self.assertEqual(repository.seen_urls(urls), {"https://znbc.co.zm/1", "https://znbc.co.zm/3"})
+        self.assertEqual(repository.seen_urls([]), set())
+
+        self.assertTrue(repository.is_seen("https://www.mwebantu.com/2"))
+        self.assertFalse(repository.is_seen("https://www.mwebantu.com/3"))
+
+    def test_episode_for(self):
+        self.assertIsNone(repository.episode_for(DAY_3))
+
+        mp3 = Mp3.create(url="https://example.com/1.mp3", filesize=1, duration=1)
+        episode = Episode.create(
+            date=DAY_3,
+            title="Episode",
+            description="",
+            presenter="",
+            mp3=mp3,
+            time_to_produce=1,
+            word_count=1,
+        )
+        self.assertEqual(repository.episode_for(DAY_3), episode)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -16,6 +16,7 @@ class TestRun(unittest.TestCase):
         self.patcher_data_dir.stop()
         shutil.rmtree(self.temp_dir)
 
+    @patch("app.core.run.check_database", return_value=True)
     @patch("app.core.run.close_database")
     @patch("app.core.run.render_jinja_template")
     @patch("app.core.run.subprocess.run")
@@ -40,10 +41,14 @@ class TestRun(unittest.TestCase):
         mock_subprocess,
         mock_render,
         mock_close_db,
+        mock_check_db,
     ):
         # Mock return values
         mock_get_news.return_value = [{"title": "Test News"}]
         mock_create_digest.return_value = {"content": "Test Digest"}
+        calls = []
+        mock_save_file.side_effect = lambda *args: calls.append("save_news_to_file")
+        mock_init_db.side_effect = lambda: calls.append("initialize_database")
 
         # Run the main function
         run.main()
@@ -57,6 +62,8 @@ class TestRun(unittest.TestCase):
         mock_init_db.assert_called_once()
         mock_save_db.assert_called_once()
         mock_create_digest.assert_called_once()
+        # the news is saved before anything can fail with the database
+        self.assertEqual(calls, ["save_news_to_file", "initialize_database"])
 
         # Assert subprocess calls for moving files
         self.assertEqual(mock_subprocess.call_count, 4)
@@ -64,6 +71,19 @@ class TestRun(unittest.TestCase):
         mock_render.assert_called_once()
         mock_close_db.assert_called_once()
 
+    @patch("app.core.run.check_database", return_value=False)
+    @patch("app.core.run.get_latest_news")
+    @patch("app.core.run.configure_logging")
+    @patch("app.core.run.init")
+    def test_main_stops_early_without_a_database(self, mock_init, mock_logging, mock_get_news, mock_check_db):
+        with self.assertRaises(SystemExit) as cm:
+            run.main()
+
+        # the run fails, so that cron reports it
+        self.assertEqual(cm.exception.code, 1)
+        mock_check_db.assert_called_once()
+        mock_get_news.assert_not_called()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,94 @@
+import threading
+import time
+import unittest
+from itertools import pairwise
+
+from app.core.news.scheduler import _interleave_by_host, run_concurrently
+
+
+class TestRunConcurrently(unittest.TestCase):
+    def test_results_preserve_input_order(self):
+        items = [3, 1, 2]
+
+        def slow_double(x):
+            time.sleep(x / 100)
+            return x * 2
+
+        result = run_concurrently(items, slow_double, host=lambda x: f"host-{x}")
+        self.assertEqual(result, [6, 2, 4])
+
+    def test_empty_input(self):
+        self.assertEqual(run_concurrently([], lambda x: x, host=str), [])
+
+    def test_per_host_limit(self):
+        lock = threading.Lock()
+        active = {"a": 0, "b": 0}
+        peak = {"a": 0, "b": 0}
+
+        def fetch(item):
+            host = item[0]
+            with lock:
+                active[host] += 1
+                peak[host] = max(peak[host], active[host])
+            time.sleep(0.02)
+            with lock:
+                active[host] -= 1
+            return item
+
+        items = [f"a{i}" for i in range(8)] + [f"b{i}" for i in range(8)]
+        result = run_concurrently(items, fetch, host=lambda item: item[0], max_workers=16, per_host_limit=2)
+
+        self.assertEqual(result, items)
+        self.assertEqual(peak["a"], 2)
+        self.assertEqual(peak["b"], 2)
+
+    def test_per_host_limits_and_intervals(self):
+        starts = {"a": [], "b": []}
+
+        def fetch(item):
+            starts[item[0]].append(time.monotonic())
+            return item
+
+        items = ["a1", "a2", "a3", "b1", "b2", "b3"]
+        result = run_concurrently(
+            items,
+            fetch,
+            host=lambda item: item[0],
+            per_host_limit=lambda host: 1 if host == "a" else 3,
+            min_interval=lambda host: 0.05 if host == "a" else 0.0,
+        )
+
+        self.assertEqual(result, items)
+        gaps = [later - earlier for earlier, later in pairwise(starts["a"])]
+        self.assertTrue(all(gap >= 0.045 for gap in gaps), gaps)
+
+    def test_interleave_by_host(self):
+        items = ["a1", "a2", "a3", "b1", "c1", "c2"]
+        order = _interleave_by_host(items, host=lambda item: item[0])
+        self.assertEqual([items[i] for i in order], ["a1", "b1", "c1", "a2", "c2", "a3"])
+
+    def test_errors_are_isolated(self):
+        def fetch(x):
+            if x == 2:
+                raise ValueError("boom")
+            return x
+
+        with self.assertLogs("app.core.news.scheduler", level="ERROR"):
+            result = run_concurrently([1, 2, 3], fetch, host=str)
+        self.assertEqual(result, [1, None, 3])
+
+    def test_deadline(self):
+        def fetch(x):
+            if x == "slow":
+                time.sleep(0.5)
+            return x
+
+        start = time.monotonic()
+        with self.assertLogs("app.core.news.scheduler", level="WARNING"):
+            result = run_concurrently(["fast", "slow"], fetch, host=str, deadline=0.1)
+        self.assertLess(time.monotonic() - start, 0.4)
+        self.assertEqual(result, ["fast", None])
+
+
+if __name__ == "__main__":
+    unittest.main()
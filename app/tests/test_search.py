@@ -0,0 +1,81 @@
+import datetime
+import unittest
+from collections import namedtuple
+from unittest.mock import MagicMock, patch
+
+from peewee import PostgresqlDatabase
+
+from app.core.db.models import Article
+from app.core.db.search import create_search_index, search_articles, search_query
+
+# never connected to: the queries are only compiled
+test_db = PostgresqlDatabase("zednews_test")
+
+
+class TestSearch(unittest.TestCase):
+    def setUp(self):
+        self.database = Article._meta.database
+        test_db.bind([Article], bind_refs=False, bind_backrefs=False)
+
+    def tearDown(self):
+        self.database.bind([Article], bind_refs=False, bind_backrefs=False)
+
+    @patch("app.core.db.search.index_archived_articles", return_value=0)
+    def test_create_search_index(self, mock_index_archived):
+        mock_db = MagicMock()
+        mock_db.execute_sql.return_value.fetchone.return_value = None
+
+        create_search_index(mock_db)
+
+        statements = [call.args[0] for call in mock_db.execute_sql.call_args_list]
+        self.assertIn("ALTER TABLE article ADD COLUMN search_vector tsvector", statements)
+        function = next(sql for sql in statements if "FUNCTION article_search_vector()" in sql)
+        self.assertIn("setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A')", function)
+        self.assertIn("setweight(to_tsvector('english', coalesce(NEW.content, '')), 'B')", function)
+        # archiving keeps the words of the content that moves to cold storage
+        self.assertIn("coalesce(OLD.content, '')", function)
+        self.assertTrue(any(sql.startswith("CREATE TRIGGER article_search_vector BEFORE INSERT") for sql in statements))
+        # the vectors of the articles already stored are filled in
+        self.assertIn("UPDATE article SET search_vector = ", statements[-2])
+        mock_index_archived.assert_called_once_with(mock_db)
+        self.assertEqual(
+            statements[-1], "CREATE INDEX IF NOT EXISTS article_search_vector ON article USING GIN (search_vector)"
+        )
+
+    def test_search_query(self):
+        sql, params = search_query(
+            "kwacha -fuel", start=datetime.date(2026, 1, 1), source="ZNBC", limit=10, offset=20
+        ).sql()
+
+        # matches are found through the index, filtered, ranked and limited before being highlighted
+        inner = sql[sql.index("FROM (") :]
+        self.assertIn("search_vector @@ websearch_to_tsquery(%s, %s)", inner)
+        self.assertIn('"t1"."date" >= %s', inner)
+        self.assertNotIn('"t1"."date" <= %s', inner)
+        self.assertIn('"t1"."source" = %s', inner)
+        self.assertIn("ORDER BY rank DESC", inner)
+        self.assertIn("LIMIT %s OFFSET %s", inner)
+        self.assertNotIn("ts_headline", inner)
+        self.assertIn('ts_headline(%s, "top"."content"', sql)
+
+        self.assertIn("kwacha -fuel", params)
+        self.assertEqual(params[-4:], [datetime.date(2026, 1, 1), "ZNBC", 10, 20])
+
+    @patch("app.core.db.search.archived_headlines", return_value={2: "the <mark>kwacha</mark>"})
+    @patch("app.core.db.search.search_query")
+    def test_archived_results_get_headlines(self, mock_search_query, mock_archived_headlines):
+        Result = namedtuple("Result", ["id", "archived", "headline"])
+        mock_search_query.return_value.namedtuples.return_value = [
+            Result(1, False, "<mark>kwacha</mark>"),
+            Result(2, True, ""),
+        ]
+
+        results = search_articles("kwacha")
+
+        # the content of archived articles is in cold storage, so their headlines are made from it
+        self.assertEqual([r.headline for r in results], ["<mark>kwacha</mark>", "the <mark>kwacha</mark>"])
+        mock_archived_headlines.assert_called_once_with("kwacha", [2])
+
+
+if __name__ == "__main__":
+    unittest.main()
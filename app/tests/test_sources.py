@@ -0,0 +1,68 @@
+import unittest
+from unittest.mock import MagicMock
+
+from app.core.news.other import SOURCES, URLs
+from app.core.news.sources import Source, SourceRegistry
+from app.core.utilities import FETCH_PER_HOST_LIMIT
+
+
+class TestSourceRegistry(unittest.TestCase):
+    def setUp(self):
+        self.extractor = MagicMock(return_value="content")
+        self.registry = SourceRegistry(
+            [
+                Source(host="daily-mail.co.zm", name="Zambia Daily Mail", extractor=self.extractor),
+                Source(
+                    host="diggers.news",
+                    name="News Diggers!",
+                    feed_url="https://diggers.news/rss/",
+                    extractor=self.extractor,
+                    max_concurrency=1,
+                    min_interval=2.0,
+                ),
+            ]
+        )
+
+    def test_lookup(self):
+        self.assertEqual(self.registry.lookup("https://diggers.news/story").name, "News Diggers!")
+        self.assertEqual(self.registry.lookup("http://www.daily-mail.co.zm/story").name, "Zambia Daily Mail")
+        # subdomains resolve to their parent domain
+        self.assertEqual(self.registry.lookup("https://enews.daily-mail.co.zm/story").name, "Zambia Daily Mail")
+        # ... but unrelated domains with a shared suffix don't
+        self.assertIsNone(self.registry.lookup("https://notdiggers.news/story"))
+        self.assertIsNone(self.registry.lookup("https://example.com/daily-mail.co.zm"))
+
+    def test_feed_urls(self):
+        self.assertEqual(self.registry.feed_urls(), ["https://diggers.news/rss/"])
+
+    def test_limits(self):
+        self.assertEqual(self.registry.max_concurrency("diggers.news"), 1)
+        self.assertEqual(self.registry.min_interval("diggers.news"), 2.0)
+        self.assertEqual(self.registry.max_concurrency("daily-mail.co.zm"), FETCH_PER_HOST_LIMIT)
+        self.assertEqual(self.registry.max_concurrency("example.com"), FETCH_PER_HOST_LIMIT)
+        self.assertEqual(self.registry.min_interval("example.com"), 0.0)
+
+    def test_clean(self):
+        source = Source(host="example.com", name="Example", extractor=self.extractor, cleanup=(("READ MORE", "..."),))
+        self.assertEqual(source.clean("Story. READ MORE"), "Story. ...")
+
+    def test_clean_cuts_and_drops_trailers(self):
+        source = Source(
+            host="example.com", name="Example", extractor=self.extractor, cut_at=("Views:",), trailers=("(Example, ",)
+        )
+        self.assertEqual(source.clean("Story.\nViews: 12\nShare"), "Story.\n")
+        self.assertEqual(source.clean("Story.\n(Example, Monday)"), "Story.")
+        # only a closing line is dropped
+        self.assertEqual(source.clean("(Example, Monday)\nStory."), "(Example, Monday)\nStory.")
+
+
+class TestRegisteredSources(unittest.TestCase):
+    def test_every_feed_is_registered(self):
+        self.assertEqual(len(URLs), len(SOURCES))
+        for url in URLs:
+            with self.subTest(url=url):
+                self.assertEqual(SOURCES.lookup(url).feed_url, url)
+
+
+if __name__ == "__main__":
+    unittest.main()
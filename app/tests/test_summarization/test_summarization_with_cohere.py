@@ -12,6 +12,12 @@ class TestCohere(unittest.TestCase):
         self.content = "This is a test article content that needs to be summarized. " * 10
         self.title = "Test Article"
         self.mock_summary = "This is a summarized version of the test article."
+        # every call goes to the (mocked) model
+        self.patcher_llm_cache = patch("app.core.llm_cache.LLM_CACHE_ENABLED", False)
+        self.patcher_llm_cache.start()
+
+    def tearDown(self):
+        self.patcher_llm_cache.stop()
 
     @patch("app.core.summarization.backends.cohere.logging")
     @patch("app.core.summarization.backends.cohere.co")
@@ -11,6 +11,12 @@ class TestTogether(unittest.TestCase):
         self.content = "This is a test article content that needs to be summarized."
         self.title = "Test Article"
         self.mock_summary = "A brief summary of the test article."
+        # every call goes to the (mocked) model
+        self.patcher_llm_cache = patch("app.core.llm_cache.LLM_CACHE_ENABLED", False)
+        self.patcher_llm_cache.start()
+
+    def tearDown(self):
+        self.patcher_llm_cache.stop()
 
     @patch("app.core.summarization.backends.together.time.sleep")
     @patch("app.core.summarization.backends.together.logging")
@@ -3,7 +3,7 @@ import unittest
 from datetime import datetime
 from unittest.mock import patch
 
-from app.core.utilities import custom_strftime, suffix
+from app.core.utilities import custom_strftime, host_of, suffix
 
 
 class TestUtilities(unittest.TestCase):
@@ -51,6 +51,11 @@ class TestUtilities(unittest.TestCase):
             formatted_date = custom_strftime("%Y-%m-{S}", datetime(2023, 6, 4))
             self.assertEqual(formatted_date, "2023-06-4th")
 
+    def test_host_of(self):
+        self.assertEqual(host_of("https://www.mwebantu.com/article?x=1"), "mwebantu.com")
+        self.assertEqual(host_of("http://Diggers.News/rss/"), "diggers.news")
+        self.assertEqual(host_of("not a url"), "")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,16 +1,16 @@
 import unittest
 from unittest.mock import MagicMock, patch
 
-from app.core.news.znbc import get_article_detail, get_news
-from app.core.utilities import today_human_readable
+from app.core.news.znbc import Candidate, get_article_detail, get_news, select_candidates
+from app.core.utilities import today_human_readable, today_iso_fmt
 
 
 class TestGetArticleDetail(unittest.TestCase):
     def setUp(self):
         self.url = "https://example.com/article"
 
-    @patch("app.core.news.znbc.requests")
-    def test_get_article_detail(self, mock_requests):
+    @patch("app.core.news.znbc.http_client")
+    def test_get_article_detail(self, mock_http_client):
         mock_response = MagicMock()
         mock_response.text = """
             <div class="elementor-widget-theme-post-content">
@@ -18,16 +18,16 @@ class TestGetArticleDetail(unittest.TestCase):
                 <p>Paragraph 2</p>
             </div>
         """
-        mock_requests.get.return_value = mock_response
+        mock_http_client.fetch_page.return_value = mock_response
 
         expected_content = "Paragraph 1\nParagraph 2"
         result = get_article_detail(self.url)
 
         self.assertEqual(result, expected_content)
-        mock_requests.get.assert_called_once_with(self.url, verify=False)
+        mock_http_client.fetch_page.assert_called_once_with(self.url, verify=False)
 
-    @patch("app.core.news.znbc.requests")
-    def test_get_article_detail_with_post_views(self, mock_requests):
+    @patch("app.core.news.znbc.http_client")
+    def test_get_article_detail_with_post_views(self, mock_http_client):
         mock_response = MagicMock()
         mock_response.text = """
             <div class="elementor-widget-theme-post-content">
@@ -36,14 +36,14 @@ class TestGetArticleDetail(unittest.TestCase):
                 <p>Post Views: 100</p>
             </div>
         """
-        mock_requests.get.return_value = mock_response
+        mock_http_client.fetch_page.return_value = mock_response
 
         result = get_article_detail(self.url)
         self.assertEqual(result, "Paragraph 1\nParagraph 2")
-        mock_requests.get.assert_called_once_with(self.url, verify=False)
+        mock_http_client.fetch_page.assert_called_once_with(self.url, verify=False)
 
-    @patch("app.core.news.znbc.requests")
-    def test_get_article_detail_none(self, mock_requests):
+    @patch("app.core.news.znbc.http_client")
+    def test_get_article_detail_none(self, mock_http_client):
         """
         If elementor-widget-theme-post-content is not found, return None.
         """
@@ -53,16 +53,16 @@ class TestGetArticleDetail(unittest.TestCase):
                 <p>Paragraph 1</p>
             </div>
         """
-        mock_requests.get.return_value = mock_response
+        mock_http_client.fetch_page.return_value = mock_response
 
         result = get_article_detail(self.url)
         self.assertIsNone(result)
-        mock_requests.get.assert_called_once_with(self.url, verify=False)
+        mock_http_client.fetch_page.assert_called_once_with(self.url, verify=False)
 
 
 class TestGetNews(unittest.TestCase):
     @patch("app.core.news.znbc.get_article_detail")
-    @patch("app.core.news.znbc.requests.get")
+    @patch("app.core.news.znbc.http_client.get")
     def test_get_news(self, mock_get, mock_get_article_detail):
         mock_response = MagicMock()
         mock_response.text = f"""
@@ -100,7 +100,42 @@ class TestGetNews(unittest.TestCase):
         ]
         self.assertEqual(result, expected_result)
 
-    @patch("app.core.news.znbc.requests.get")
+    @patch("app.core.news.znbc.get_article_detail")
+    @patch("app.core.news.znbc.http_client.get")
+    def test_get_news_only_fetches_todays_distinct_articles(self, mock_get, mock_get_article_detail):
+        mock_response = MagicMock()
+        mock_response.text = f"""
+            <html>
+                <body>
+                    <article class="elementor-post elementor-grid-item">
+                        <h3 class="elementor-post__title"><a href="https://znbc.co.zm/?p=3">Story 3</a></h3>
+                        <span class="elementor-post-date">{today_human_readable}</span>
+                    </article>
+                    <article class="elementor-post">
+                        <h3 class="elementor-post__title"><a href="https://ZNBC.co.zm/?p=2#respond">Story 2</a></h3>
+                        <span class="elementor-post-date">{today_human_readable}</span>
+                    </article>
+                    <article class="elementor-post">
+                        <h3 class="elementor-post__title"><a href="https://znbc.co.zm/?p=2">Story 2 (updated)</a></h3>
+                        <span class="elementor-post-date">{today_human_readable}</span>
+                    </article>
+                    <article class="elementor-post">
+                        <h3 class="elementor-post__title"><a href="https://znbc.co.zm/?p=1">Story 1</a></h3>
+                        <span class="elementor-post-date">January 1, 2020</span>
+                    </article>
+                </body>
+            </html>
+        """
+        mock_get.return_value = mock_response
+        mock_get_article_detail.side_effect = lambda url: None if url.endswith("p=3") else f"Content of {url}"
+
+        result = get_news()
+
+        fetched = sorted(call.args[0] for call in mock_get_article_detail.call_args_list)
+        self.assertEqual(fetched, ["https://znbc.co.zm/?p=2", "https://znbc.co.zm/?p=3"])
+        self.assertEqual([item["title"] for item in result], ["Story 2 (updated)"])
+
+    @patch("app.core.news.znbc.http_client.get")
     def test_get_news_no_articles(self, mock_get):
         mock_response = MagicMock()
         mock_response.text = """
@@ -119,5 +154,24 @@ class TestGetNews(unittest.TestCase):
         self.assertEqual(result, [])
 
 
+class TestSelectCandidates(unittest.TestCase):
+    def test_select_candidates(self):
+        candidates = [
+            Candidate(today_iso_fmt, "Budget  Presented", "https://znbc.co.zm/?p=5"),
+            Candidate(today_iso_fmt, "Rains expected", "https://znbc.co.zm/?p=4"),
+            Candidate(today_iso_fmt, "Budget presented", "https://znbc.co.zm/?p=3"),
+            Candidate(today_iso_fmt, "Rains expected in the north", "https://znbc.co.zm/?p=4#comments"),
+            Candidate("2020-01-01", "Old news", "https://znbc.co.zm/?p=1"),
+        ]
+
+        result = select_candidates(candidates)
+
+        self.assertEqual(result, [candidates[2], candidates[3]])
+
+    def test_select_candidates_for_another_date(self):
+        candidate = Candidate("2020-01-01", "Old news", "https://znbc.co.zm/?p=1")
+        self.assertEqual(select_candidates([candidate], date="2020-01-01"), [candidate])
+
+
 if __name__ == "__main__":
     unittest.main()
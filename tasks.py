@@ -339,6 +339,48 @@ def test(c):
     c.run("coverage report -m", pty=True)
 
 
+@task(
+    help={
+        "name": "The benchmark to run, i.e. a module in app/benchmarks (e.g. parsing)",
+        "args": "Arguments to pass to the benchmark (e.g. the recording to replay, for fetch)",
+    }
+)
+def benchmark(c, name, args=""):
+    """run a benchmark"""
+    c.run(f"python -m app.benchmarks.{name} {args}", pty=True)
+
+
+@task(help={"days": "Archive articles older than this many days (default: $ARTICLE_ARCHIVE_AFTER_DAYS, or 90)"})
+def archive(c, days=None):
+    """Move old articles' content to compressed cold storage"""
+    c.run(f"python -m app.core.db.archive {f'--days {days}' if days else ''}", pty=True)
+
+
+@task(
+    help={
+        "convert": "Partition an existing, unpartitioned article table",
+        "detach_before": "Detach the partitions of the months before this one (YYYY-MM)",
+        "drop": "Drop the detached partitions, rather than keep them",
+    }
+)
+def partitions(c, convert=False, detach_before=None, drop=False):
+    """Create upcoming article partitions, and detach old ones"""
+    args = []
+    if convert:
+        args.append("--convert")
+    if detach_before:
+        args.append(f"--detach-before {detach_before}")
+    if drop:
+        args.append("--drop")
+    c.run(f"python -m app.core.db.partitions {' '.join(args)}", pty=True)
+
+
+@task(help={"start": "The first date to rebuild (YYYY-MM-DD)", "end": "The last date (default: start)"})
+def backfill(c, start, end=""):
+    """Rebuild the digests of a range of past dates"""
+    c.run(f"python -m app.core.backfill {start} {end}", pty=True)
+
+
 @task
 def fx_update(c):
     """Update foreign exchange rates data"""